@@ -1,20 +1,63 @@
+import sys
+
 from livekit.agents import (
     WorkerOptions,
     cli,
 )
 
+from helpers.config import (
+    AGENT_LOAD_THRESHOLD,
+    AGENT_NAME,
+    METRICS_PORT,
+)
 from helpers.entrypoint import entrypoint
+from helpers.heartbeat import start_heartbeat
+from helpers.metrics_registry import start_metrics_server
+from helpers.post_call import start_post_call_workers
 from helpers.setup_session import prewarm
+from helpers.worker_load import IdlePoolTarget, WorkerLoad
+
+# CLI subcommands that run a worker (not `download-files`, `console`, ...)
+WORKER_COMMANDS = ("start", "dev", "connect")
 
 # --------------------------
 #   CLI Runner
 # --------------------------
 
 if __name__ == "__main__":
+    runs_worker = len(sys.argv) > 1 and sys.argv[1] in WORKER_COMMANDS
+
+    if runs_worker:
+        # Prometheus scrape endpoint aggregating every job process on this host
+        start_metrics_server(METRICS_PORT)
+
+        # Summary / persistence / upload / evaluation, off the call path
+        start_post_call_workers()
+
+    idle_pool = IdlePoolTarget()
+    worker_load = WorkerLoad()
+
+    def _load(worker=None) -> float:
+        # runs in the worker's load loop, so the process pool (and its ceiling) already exists
+        idle_pool.apply(worker_options)
+        return worker_load(worker)
+
     # Run the worker app with entrypoint and optional prewarm function
-    cli.run_app(
-        WorkerOptions(
-            entrypoint_fnc=entrypoint,
-            prewarm_fnc=prewarm
-        )
+    worker_options = WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
+        # With AGENT_NAME set, jobs are only explicitly dispatched (server.py routes them)
+        agent_name=AGENT_NAME,
+        # Sessions, CPU and job event-loop lag; no new jobs above the threshold
+        load_fnc=_load,
+        load_threshold=AGENT_LOAD_THRESHOLD,
+        # Fixed ceiling of the process pool; the target below it follows dialer demand
+        num_idle_processes=idle_pool.ceiling,
     )
+
+    if runs_worker:
+        # Liveness, capacity and live sessions for the control server (server.py);
+        # the reply carries the prewarmed-process count for the current dialer demand
+        start_heartbeat(on_idle_target=idle_pool.resize)
+
+    cli.run_app(worker_options)
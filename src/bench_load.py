@@ -0,0 +1,140 @@
+"""
+Sessions-per-core benchmark for agent worker job acceptance.
+
+Runs N simulated sessions, one process each like LiveKit job processes,
+and steps N up. Each session does the per-call local audio work for our
+provider mix in real time:
+  - 48 kHz caller audio resampled to 16 kHz for Silero VAD and Sarvam STT
+  - Silero VAD inference (same settings as prewarm)
+  - Sarvam TTS audio (22.05 kHz) resampled to 48 kHz while the agent speaks
+For every step it reports host CPU and the p95 event-loop lag of the
+sessions, and recommends AGENT_SESSIONS_PER_CORE: the most sessions per
+core that stay below the load threshold and LOOP_LAG_BUDGET.
+
+BVC noise cancellation and the turn detector run inside the LiveKit room
+pipeline / inference executor and are not simulated; keep --headroom for them.
+
+Usage:
+    uv run src/bench_load.py [--max-sessions 16] [--duration 20] [--headroom 0.8]
+"""
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import statistics
+import time
+
+import numpy as np
+import psutil
+from livekit import rtc
+from livekit.plugins import silero
+
+from helpers.config import AGENT_LOAD_THRESHOLD, LOOP_LAG_BUDGET
+
+FRAME_MS = 20
+CALLER_RATE = 48000
+VAD_RATE = 16000
+TTS_RATE = 22050      # Sarvam TTS output
+TURN_SECONDS = 4.0    # caller and agent alternate turns of this length
+
+
+def _frame(rate: int, t: float, speech: bool = True) -> rtc.AudioFrame:
+    """20 ms of speech-like audio (noise-modulated tone), or silence."""
+    samples = rate * FRAME_MS // 1000
+    if speech:
+        tone = np.sin(2 * np.pi * 220 * (t + np.arange(samples) / rate)) * np.random.uniform(0.2, 1.0, samples)
+        data = (tone * 8000).astype(np.int16)
+    else:
+        data = np.zeros(samples, dtype=np.int16)
+    return rtc.AudioFrame(data=data.tobytes(), sample_rate=rate, num_channels=1, samples_per_channel=samples)
+
+
+async def _session(duration: float, warmup: float) -> list[float]:
+    """Lag of every 20 ms audio tick after the warm-up."""
+    vad = silero.VAD.load(
+        min_speech_duration=0.1,
+        min_silence_duration=0.35,
+        prefix_padding_duration=0.2,
+        max_buffered_speech=45.0,
+        activation_threshold=0.6,
+        sample_rate=VAD_RATE,
+        force_cpu=True,
+    )
+    stream = vad.stream()
+    inbound = rtc.AudioResampler(CALLER_RATE, VAD_RATE)
+    outbound = rtc.AudioResampler(TTS_RATE, CALLER_RATE)
+
+    async def _drain():
+        async for _ in stream:
+            pass
+
+    drain = asyncio.create_task(_drain())
+    loop = asyncio.get_running_loop()
+    interval = FRAME_MS / 1000
+    lags: list[float] = []
+    started = loop.time()
+    next_tick = started
+    while (t := (now := loop.time()) - started) < warmup + duration:
+        if t >= warmup:
+            lags.append(max(0.0, now - next_tick))
+        caller_speaking = int(t / TURN_SECONDS) % 2 == 0
+        for frame in inbound.push(_frame(CALLER_RATE, t, speech=caller_speaking)):
+            stream.push_frame(frame)
+        if not caller_speaking:
+            outbound.push(_frame(TTS_RATE, t))
+        next_tick += interval
+        await asyncio.sleep(max(0.0, next_tick - loop.time()))
+    stream.end_input()
+    drain.cancel()
+    return lags
+
+
+def _run_session(duration: float, warmup: float, results: mp.Queue) -> None:
+    results.put(asyncio.run(_session(duration, warmup)))
+
+
+def _step(sessions: int, duration: float, warmup: float) -> tuple[float, float]:
+    """Run `sessions` in parallel; returns (mean CPU fraction, p95 loop lag seconds)."""
+    results: mp.Queue = mp.Queue()
+    procs = [mp.Process(target=_run_session, args=(duration, warmup, results)) for _ in range(sessions)]
+    for proc in procs:
+        proc.start()
+    # model loading happens before the warm-up window; CPU is sampled after it
+    time.sleep(warmup + 2.0)
+    cpu = [psutil.cpu_percent(interval=1.0) / 100 for _ in range(max(1, int(duration) - 2))]
+    lags = [lag for _ in procs for lag in results.get()]
+    for proc in procs:
+        proc.join()
+    p95 = statistics.quantiles(lags, n=20)[-1] if len(lags) > 1 else 0.0
+    return statistics.mean(cpu) if cpu else 0.0, p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-sessions", type=int, default=4 * (os.cpu_count() or 1))
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--headroom", type=float, default=0.8, help="share of the measured limit to recommend")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(f"cores: {cores}, load threshold: {AGENT_LOAD_THRESHOLD:.0%}, loop lag budget: {LOOP_LAG_BUDGET * 1000:.0f} ms")
+    print(f"{'sessions':>8} {'per core':>9} {'cpu':>6} {'p95 lag':>9}")
+
+    safe = 0
+    sessions = 1
+    while sessions <= args.max_sessions:
+        cpu, lag = _step(sessions, args.duration, args.warmup)
+        ok = cpu < AGENT_LOAD_THRESHOLD and lag < LOOP_LAG_BUDGET
+        print(f"{sessions:>8} {sessions / cores:>9.2f} {cpu:>6.0%} {lag * 1000:>7.1f}ms {'' if ok else ' over'}")
+        if not ok:
+            break
+        safe = sessions
+        sessions = sessions + 1 if sessions < cores else sessions + max(1, cores // 2)
+
+    per_core = safe / cores * args.headroom
+    print(f"safe sessions: {safe} → AGENT_SESSIONS_PER_CORE={per_core:.2f} (with {args.headroom:.0%} headroom)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Microbenchmark for the pronunciation rewrite on the LLM → TTS hot path.
+
+Compares the previous per-term `re.sub` loop with the compiled single-pass
+PronunciationRewriter on realistic streamed chunks.
+
+Usage:
+    uv run src/bench_tts_utils.py [--iterations 20000]
+"""
+import argparse
+import re
+import time
+
+from class_mod.tts_utils import PronunciationRewriter, get_pronunciations
+
+# Typical LLM deltas for our Hinglish bank script
+SAMPLE_CHUNKS = [
+    "जी सर -- ",
+    "आपकी Car Loan की EMI ",
+    "HDFC Bank से ",
+    "Balance Transfer पर ROI कम है, ",
+    "बस PAN और Aadhar चाहिए। ",
+    "Salaried हैं या Businessman? ",
+    "Tenure कितना चाहिए सर? ",
+    "ok",
+]
+
+
+def legacy_rewrite(text: str, pronunciations: dict) -> str:
+    """The previous implementation: one regex compile + pass per term."""
+    cleaned = text
+    for term, replacement in pronunciations.items():
+        cleaned = re.sub(
+            rf"(?<!\w){re.escape(term)}(?!\w)",
+            replacement,
+            cleaned,
+            flags=re.IGNORECASE
+        )
+    return cleaned
+
+
+def _time_per_chunk(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for chunk in SAMPLE_CHUNKS:
+            fn(chunk)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(SAMPLE_CHUNKS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--provider", default="sarvam_anushka")
+    args = parser.parse_args()
+
+    pronunciations = get_pronunciations(args.provider)
+    rewriter = PronunciationRewriter(pronunciations)
+
+    legacy = _time_per_chunk(lambda c: legacy_rewrite(c, pronunciations), args.iterations)
+    compiled = _time_per_chunk(rewriter.rewrite, args.iterations)
+
+    print(f"terms: {len(pronunciations)}, chunks/iteration: {len(SAMPLE_CHUNKS)}")
+    print(f"legacy per-term re.sub : {legacy * 1e6:8.2f} µs/chunk")
+    print(f"compiled single pass   : {compiled * 1e6:8.2f} µs/chunk")
+    print(f"speedup                : {legacy / compiled:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
 import asyncio
-import json
 import logging
+import time
 from collections.abc import AsyncIterable
-from pathlib import Path
 
 from dotenv import load_dotenv
 from langfuse import observe
@@ -15,44 +14,81 @@ from livekit.agents import (
     function_tool,
     llm,
     stt,
+    utils,
 )
 from livekit.agents.llm import ChatChunk
+from livekit.agents.metrics import TTSMetrics
 from livekit.agents.voice import ModelSettings
 
-from class_mod.assistant_helpers import extract_conversation, hangup_current_room
-from class_mod.summary import generate_summary_llm
-from class_mod.tts_utils import adjust_text_for_tts, get_pronunciations
-from helpers.config import (
-    LLM_PROVIDER,
-    SESSION_ID,
-    SESSION_LOGS,
-    STT_PROVIDER,
-    TTS_PROVIDER,
+from class_mod.assistant_helpers import (
+    extract_conversation,
+    extract_dialogue,
+    hangup_current_room,
+    wait_for_call_answered,
 )
-from helpers.customer_helper import load_customer_profile
-from helpers.log_usage import log_usage
-from helpers.metrics import setup_metrics
+from class_mod.greeting import PreRenderedGreeting, iter_frames
+from class_mod.thinking_sounds import ThinkingSoundPlayer
+from class_mod.tts_cache import CACHE_METRICS_LABEL, get_tts_cache
+from class_mod.tts_utils import (
+    adjust_text_for_tts,
+    get_pronunciation_rewriter,
+    split_leading_phrase,
+)
+from helpers.config import TTS_CACHE_PHRASE_CHARS
+from helpers.customer_helper import CustomerProfileType, load_customer_profile
+from helpers.post_call_queue import PostCallQueue
+from helpers.session_context import SessionContext
+from helpers.setup_tts_stt import TTS_VOICE_SETTINGS
 from instructions import get_instructions
 
 load_dotenv(".env.local")
 logger = logging.getLogger("agent")
 
+async def _single_segment(segment: str) -> AsyncIterable[str]:
+    yield segment
+
+
 class MyAssistant(Agent):
-    def __init__(self, session : AgentSession, **kwargs):
-        customer_profile=load_customer_profile()
+    def __init__(
+        self,
+        session : AgentSession,
+        session_ctx: SessionContext | None = None,
+        customer_profile: CustomerProfileType | None = None,
+        greeting: PreRenderedGreeting | None = None,
+        thinking_sounds: ThinkingSoundPlayer | None = None,
+        **kwargs,
+    ):
+        # Per-job context; console runs and tests may only pass a profile
+        if session_ctx is None:
+            session_ctx = SessionContext.from_profile(customer_profile or load_customer_profile())
+        customer_profile = session_ctx.customer_profile
         instructions = get_instructions(customer_profile)
         super().__init__(instructions=instructions)
+        self.session_ctx = session_ctx
         self.customer_profile = customer_profile
         self.session_ref = session
+        self.greeting = greeting
+        self.thinking_sounds = thinking_sounds
         self.call_started = False
-        self.summary_generated = False
+        self.post_call_enqueued = False
 
     async def on_enter(self):
         """Called when the agent first joins the LiveKit room."""
         logger.info("Agent joined the session, sending greeting...")
-        await self.session_ref.generate_reply(
-            instructions="Greet the customer with 'Namaste' and briefly introduce yourself with your name and bank name. Keep it very short and polite"
-        )
+
+        # Pre-rendered greeting: play the buffered audio as soon as the callee answers,
+        # the LLM is only engaged from the second turn
+        frames = await self.greeting.frames() if self.greeting else None
+        if frames:
+            if await wait_for_call_answered() is None:
+                # Nobody picked up: greeting an empty line would only mark the call as started
+                logger.info("Call was never answered, skipping the greeting.")
+                return
+            await self.session_ref.say(self.greeting.text, audio=iter_frames(frames))
+        else:
+            await self.session_ref.generate_reply(
+                instructions="Greet the customer with 'Namaste' and briefly introduce yourself with your name and bank name. Keep it very short and polite"
+            )
         self.call_started = True
         logger.info("Greeting sent successfully.")
 
@@ -83,68 +119,45 @@ class MyAssistant(Agent):
     #         logger.exception(f"Error during on_exit summary generation: {e}")
 
     async def on_exit(self):
-        """Triggered when session is ending — ensure summary and customer data are saved."""
-        logger.info("Session ending. Ensuring summary and data storage...")
+        """
+        Triggered when session is ending — hang up first, then hand the
+        summary/persistence/upload work to the post-call queue (helpers/post_call).
+        """
+        logger.info("Session ending. Hanging up and queueing post-call work...")
 
         try:
             if not self.call_started:
                 logger.info("Call never started (user didn't pick up). Skipping summary.")
                 return
 
-            # ✅ Always extract conversation
-            history_text = extract_conversation(self.session_ref)
-            customer_data = {
-                "customer_profile": dict(self.customer_profile)
-            }
-
-            # ✅ Generate summary if not already done
-            summary = None
-            if not self.summary_generated:
-                summary = await generate_summary_llm(history_text, customer_data)
-                logger.info("✅ Summary generated at call end.")
-                self.summary_generated = True
-            else:
-                logger.info("Summary already generated earlier.")
-                summary = "Already generated earlier."
-
-            # ✅ Prepare file save path
-            session_id = SESSION_ID
-            participant_id = self.customer_profile.get("customer_id", "unknown_participant")
+            if self.post_call_enqueued:
+                logger.info("Post-call job already queued earlier.")
+                return
 
-            base_dir = Path(__file__).resolve().parent.parent / "temp"
-            base_dir.mkdir(parents=True, exist_ok=True)
-            filepath = base_dir / f"{session_id}_{participant_id}.json"
+            # ✅ Hang up before any slow work so the SIP leg stops billing
+            await hangup_current_room()
 
-            # ✅ Prepare data to save
-            data = {
+            # ✅ Snapshot the conversation while the session is still in memory
+            session_id = self.session_ctx.session_id
+            call_state = self.session_ctx.call_state
+            payload = {
                 "session_id": session_id,
-                "participant_id": participant_id,
-                "customer_profile": self.customer_profile,
-                "summary": summary,
+                "participant_id": self.customer_profile.get("customer_id", "unknown_participant"),
+                "customer_profile": dict(self.customer_profile),
+                "history_text": extract_conversation(self.session_ref),
+                "dialogue": extract_dialogue(self.session_ctx.logs),
+                "call_state": call_state.to_summary({"session_id": session_id}),
+                "missing_fields": call_state.missing_fields(),
             }
 
-            # ✅ Save JSON file
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
-
-            logger.info(f"💾 Session data saved to {filepath}")
-            usage_collector, cost_calc = setup_metrics(self.session, SESSION_LOGS)
-            await log_usage(
-                usage_collector=usage_collector,
-                cost_calc=cost_calc,
-                SESSION_LOGS=SESSION_LOGS,
-                SESSION_ID=SESSION_ID,
-                customer_profile=self.customer_profile,
-                TTS_PROVIDER=TTS_PROVIDER,
-                STT_PROVIDER=STT_PROVIDER,
-                LLM_PROVIDER=LLM_PROVIDER
-            )
-
-            # ✅ Hang up gracefully
-            await hangup_current_room()
+            # ✅ Enqueue and return; workers in the agent process do the rest
+            job_id = await asyncio.to_thread(PostCallQueue().enqueue, session_id, payload)
+            self.post_call_enqueued = True
+            logger.info(f"📥 Post-call job {job_id} queued for session {session_id}")
+            # Usage and cost are flushed by the job shutdown callback (helpers/entrypoint)
 
         except Exception as e:
-            logger.exception(f"❌ Error during on_exit summary/data save: {e}")
+            logger.exception(f"❌ Error during on_exit hangup/post-call enqueue: {e}")
 
 
     @observe(name="stt_node")
@@ -187,9 +200,108 @@ class MyAssistant(Agent):
             raise
 
     async def tts_node(self, text: AsyncIterable[str], model_settings: ModelSettings):
-        pronunciations = get_pronunciations(TTS_PROVIDER)
-        async for frame in Agent.default.tts_node(self, adjust_text_for_tts(text, pronunciations), model_settings):
-            yield frame
+        """
+        Speak the turn's leading phrase (fillers like "जी सर --", goodbyes) from the
+        TTS audio cache when possible, and the rest of the turn through one
+        streaming TTS request that starts while the phrase plays.
+        """
+        provider = self.session_ctx.tts_provider
+        rewriter = get_pronunciation_rewriter(provider)
+        cache = get_tts_cache()
+        segments = adjust_text_for_tts(text, rewriter)
+
+        # Collect text up to the first pause; the first flushes are only a few words
+        head, ended = "", False
+        while split_leading_phrase(head, TTS_CACHE_PHRASE_CHARS) is None and len(head) <= TTS_CACHE_PHRASE_CHARS:
+            try:
+                head += await segments.__anext__()
+            except StopAsyncIteration:
+                ended = True
+                break
+        if not head.strip():
+            return
+        started = time.perf_counter()
+        split = split_leading_phrase(head, TTS_CACHE_PHRASE_CHARS)
+        if split is None and ended and len(head) <= TTS_CACHE_PHRASE_CHARS:
+            split = (head, "")     # the whole turn is one short phrase
+
+        async def _rest_text(rest: str) -> AsyncIterable[str]:
+            if rest.strip():
+                yield rest
+            async for segment in segments:
+                yield segment
+
+        if split is None:
+            # no short leading phrase: the whole turn is one live request
+            first_audio = True
+            async for frame in Agent.default.tts_node(self, _rest_text(head), model_settings):
+                if first_audio:
+                    first_audio = False
+                    self._on_tts_audio()
+                yield frame
+            return
+
+        phrase, rest = split
+        key = cache.key(phrase, provider, TTS_VOICE_SETTINGS.get(provider, {}))
+        rest_frames: asyncio.Queue[rtc.AudioFrame | None] = asyncio.Queue()
+
+        async def _render_rest() -> None:
+            try:
+                async for frame in Agent.default.tts_node(self, _rest_text(rest), model_settings):
+                    rest_frames.put_nowait(frame)
+            finally:
+                rest_frames.put_nowait(None)
+
+        rest_task = None if ended and not rest.strip() else asyncio.create_task(_render_rest())
+        try:
+            cached = await cache.get(key)
+            if cached is not None:
+                logger.debug(f"TTS cache hit: {phrase[:40]}")
+                self._emit_cache_metrics(phrase, started, cached)
+                self._on_tts_audio()
+                for frame in cached:
+                    yield frame
+            else:
+                rendered = []
+                async for frame in Agent.default.tts_node(self, _single_segment(phrase), model_settings):
+                    if not rendered:
+                        self._on_tts_audio()
+                    rendered.append(frame)
+                    yield frame
+                # only reached when the phrase was fully synthesized (not interrupted)
+                await cache.put(key, rendered)
+
+            if rest_task is not None:
+                while (frame := await rest_frames.get()) is not None:
+                    yield frame
+                await rest_task     # surface a failed rest request
+        finally:
+            if rest_task is not None:
+                rest_task.cancel()
+
+    def _emit_cache_metrics(self, text: str, started: float, frames: list[rtc.AudioFrame]) -> None:
+        """Report cached audio like a TTS request, so the turn's latency is still recorded."""
+        tts_engine = self.session_ref.tts
+        if tts_engine is None:
+            return
+        elapsed = time.perf_counter() - started
+        # the session tags it with the current speech_id and emits metrics_collected
+        tts_engine.emit("metrics_collected", TTSMetrics(
+            label=CACHE_METRICS_LABEL,
+            request_id=utils.shortuuid(),
+            timestamp=time.time(),
+            ttfb=elapsed,
+            duration=elapsed,
+            audio_duration=sum(frame.duration for frame in frames),
+            cancelled=False,
+            characters_count=len(text),
+            streamed=False,
+        ))
+
+    def _on_tts_audio(self) -> None:
+        """Real audio is ready: stop any thinking sound masking the wait."""
+        if self.thinking_sounds is not None:
+            self.thinking_sounds.on_tts_audio()
 
     async def _end_call(self, context: RunContext, goodbye_instructions: str) -> None:
         """Ends the call gracefully (without generating summary)."""
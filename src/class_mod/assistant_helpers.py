@@ -1,8 +1,12 @@
+import asyncio
 import logging
 from datetime import datetime
 
-from livekit import api
-from livekit.agents import AgentSession, get_job_context
+from livekit import api, rtc
+from livekit.agents import AgentSession, ConversationItemAddedEvent, get_job_context
+from livekit.agents.llm import ChatMessage
+
+from class_mod.call_state import CallState
 
 logger = logging.getLogger("assistant_helpers")
 
@@ -18,6 +22,42 @@ async def hangup_current_room():
     except Exception as e:
         logger.error("Failed to delete room: %s", e)
 
+async def wait_for_call_answered(timeout: float = 60.0) -> rtc.RemoteParticipant | None:
+    """
+    Wait until the remote participant is in the room and, for SIP callers,
+    until the call is actually answered (sip.callStatus == "active").
+    Returns None if there is no job or `timeout` (for both steps) expires.
+    """
+    ctx = get_job_context()
+    if not ctx or not ctx.room:
+        logger.warning("No active room found. Cannot wait for participant.")
+        return None
+
+    answered = asyncio.Event()
+    participant: rtc.RemoteParticipant | None = None
+
+    def _check_status(*_):
+        if participant is None:
+            return
+        if participant.kind != rtc.ParticipantKind.PARTICIPANT_KIND_SIP or \
+                participant.attributes.get("sip.callStatus", "active") == "active":
+            answered.set()
+
+    # one deadline for joining and answering together
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    ctx.room.on("participant_attributes_changed", _check_status)
+    try:
+        participant = await asyncio.wait_for(ctx.wait_for_participant(), timeout)
+        _check_status()
+        await asyncio.wait_for(answered.wait(), max(0.0, deadline - loop.time()))
+        return participant
+    except asyncio.TimeoutError:
+        logger.warning("Timed out waiting for the call to be answered.")
+        return None
+    finally:
+        ctx.room.off("participant_attributes_changed", _check_status)
+
 def extract_conversation(session: AgentSession, *, max_messages: int = 5000, max_chars: int = 800000) -> str:
     """
     Extract conversation history as a clean, readable text block.
@@ -103,3 +143,26 @@ def extract_conversation(session: AgentSession, *, max_messages: int = 5000, max
 
     return result
 
+
+def extract_dialogue(session_logs: dict) -> list[dict]:
+    """
+    Turn the session transcript log into [{"role", "content"}] for evaluation.py.
+    Keeps assistant messages and final user transcripts only (same filter as
+    evaluation.load_and_prepare_dataset_from_logs).
+    """
+    dialogue = []
+    for item in session_logs.get("transcript", []):
+        if item.get("role") == "assistant":
+            dialogue.append({"role": "assistant", "content": item["text"]})
+        elif item.get("role") == "user" and item.get("is_final", False):
+            dialogue.append({"role": "user", "content": item["text"]})
+    return dialogue
+
+
+def track_call_state(session: AgentSession, call_state: CallState) -> None:
+    """Feed every finished chat message into the incremental call state."""
+
+    @session.on("conversation_item_added")
+    def _on_conversation_item(ev: ConversationItemAddedEvent):
+        if isinstance(ev.item, ChatMessage) and ev.item.text_content:
+            call_state.update(ev.item.role, ev.item.text_content)
@@ -0,0 +1,369 @@
+# assistants/call_state.py
+import re
+from dataclasses import dataclass, field
+
+# Devanagari digits → ASCII, so one set of number patterns covers both scripts
+_DEVANAGARI_DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+
+# Spoken Hindi numbers that commonly precede लाख/हज़ार/साल
+_HINDI_NUMBER_WORDS = {
+    "एक": 1, "दो": 2, "तीन": 3, "चार": 4, "पांच": 5, "पाँच": 5, "छह": 6, "छः": 6,
+    "सात": 7, "आठ": 8, "नौ": 9, "दस": 10, "बारह": 12, "पंद्रह": 15, "बीस": 20,
+    "पच्चीस": 25, "तीस": 30, "चालीस": 40, "पचास": 50, "साठ": 60, "सत्तर": 70,
+    "अस्सी": 80, "नब्बे": 90, "डेढ़": 1.5, "ढाई": 2.5,
+}
+# Devanagari matras are not \w, so \b does not separate Hindi words
+_WORD_START = r"(?<![\u0900-\u097F\w])"
+_WORD_END = r"(?![\u0900-\u097F\w])"
+
+
+def _words(patterns: dict[str, str]) -> dict[str, str]:
+    """Keyword patterns matched as whole words ("कार" but not inside "सरकारी")."""
+    return {value: f"{_WORD_START}(?:{pattern}){_WORD_END}" for value, pattern in patterns.items()}
+
+
+_NUMBER = r"(\d+(?:\.\d+)?|" + "|".join(sorted(_HINDI_NUMBER_WORDS, key=len, reverse=True)) + r")"
+
+_MULTIPLIERS = {
+    "करोड़": 10_000_000, "crore": 10_000_000,
+    "लाख": 100_000, "lakh": 100_000, "lac": 100_000,
+    "हज़ार": 1_000, "हजार": 1_000, "thousand": 1_000, "k": 1_000,
+}
+_AMOUNT = re.compile(_NUMBER + r"\s*(" + "|".join(_MULTIPLIERS) + r")(?![a-z])", re.IGNORECASE)
+_PLAIN_AMOUNT = re.compile(r"(?<![\d.])(\d{5,8})(?![\d.])")
+_TENURE = re.compile(_NUMBER + r"\s*(साल|वर्ष|years?|yrs?|महीने|महीनों|months?)(?![a-z])", re.IGNORECASE)
+_CIBIL = re.compile(r"(?:सिबिल|cibil|credit\s*score|क्रेडिट\s*स्कोर)\D{0,20}([3-9]\d{2})", re.IGNORECASE)
+_YEAR = re.compile(r"(?<!\d)(19[89]\d|20[0-3]\d)(?!\d)")
+
+_LOAN_CONTEXT = re.compile(r"लोन|loan|अमाउंट|amount|चाहिए|रकम", re.IGNORECASE)
+_TENURE_CONTEXT = re.compile(r"लोन|loan|के\s*लिए|tenure|टेन्योर|अवधि|\bemi\b|किस्त", re.IGNORECASE)
+_TENURE_QUESTION = re.compile(r"कितने\s*(?:साल|महीने|वर्ष)\s*के\s*लिए|अवधि|टेन्योर|tenure|how\s*long", re.IGNORECASE)
+_VEHICLE_AGE = re.compile(r"पुरानी|पुराना|old", re.IGNORECASE)
+_PINCODE = re.compile(r"पिन|\bpin|पोस्टल|postal|\bzip", re.IGNORECASE)
+_INCOME_CONTEXT = re.compile(r"सैलरी|salary|इनकम|income|कमाई|कमाता|कमाती|तनख्वाह|महीने\s*के", re.IGNORECASE)
+_EMI_CONTEXT = re.compile(r"\bemi\b|ई-?एम-?आई|किस्त", re.IGNORECASE)
+_YEAR_CONTEXT = re.compile(r"मॉडल|model|रजिस्ट्रेशन|registration|ली\s*थी|खरीदी", re.IGNORECASE)
+
+# keyword → canonical value; first match wins, so more specific phrases come first
+_DOCUMENTS = _words({
+    "Salary Slip": r"सैलरी\s*स्लिप|salary\s*slip|पे\s*स्लिप|pay\s*slip",
+    "Bank Statement": r"बैंक\s*स्टेटमेंट|bank\s*statement|स्टेटमेंट",
+    "PAN": r"पैन|\bpan\b",
+    "Aadhaar": r"आधार|aadha?a?r",
+    "RC": r"आरसी|\brc\b",
+    "ITR": r"आईटीआर|\bitr\b",
+})
+_VEHICLE_TYPES = _words({
+    "SUV": r"एसयूवी|\bsuv\b",
+    "Commercial": r"ट्रक|टेम्पो|commercial|कमर्शियल",
+    "Car": r"कार|गाड़ी|गाडी|\bcar\b",
+})
+_MAKES = _words({
+    "Maruti": r"मारुति|मारुती|maruti|suzuki|सुज़ुकी",
+    "Hyundai": r"ह्युंडई|हुंडई|ह्यूंदै|hyundai",
+    "Tata": r"टाटा|\btata\b",
+    "Mahindra": r"महिंद्रा|mahindra",
+    "Honda": r"होंडा|honda",
+    "Toyota": r"टोयोटा|toyota",
+    "Kia": r"किआ|\bkia\b",
+    "MG": r"एमजी|\bmg\b",
+})
+_OCCUPATIONS = {
+    "Self-Employed": r"self[\s-]*employed|खुद\s*का\s*काम|अपना\s*काम|फ्रीलांस",
+    "Business Owner": r"बिज़नेस|बिजनेस|business|दुकान|व्यापार",
+    "Salaried": r"नौकरी|job|salaried|सैलरी|प्राइवेट\s*कंपनी|कंपनी\s*में",
+}
+_LENDERS = _words({
+    "HDFC": r"hdfc|एचडीएफसी|एच-डी-एफ-सी",
+    "ICICI": r"icici|आईसीआईसीआई",
+    "SBI": r"\bsbi\b|एसबीआई|स्टेट\s*बैंक",
+    "Axis": r"axis|एक्सिस",
+    "Kotak": r"kotak|कोटक",
+    "Bajaj": r"bajaj|बजाज",
+})
+
+_NOT_INTERESTED = re.compile(
+    r"not\s*interested|इंटरेस्ट(?:ेड)?\s*नहीं|नहीं\s*चाहिए|नही\s*चाहिए|ज़रूरत\s*नहीं|जरूरत\s*नहीं|मत\s*करो|don'?t\s*call"
+    r"|नहीं[\s,।]*अभी\s*नहीं|अभी\s*(?:तो\s*)?नहीं\s*(?:चाहिए|लेना|करना)",
+    re.IGNORECASE,
+)
+# "चाहिए" alone is not a yes ("सोचने के लिए टाइम चाहिए"); it must be about the loan or money
+_INTERESTED = re.compile(
+    r"interested|इंटरेस्टेड|ले\s*लूंगा|ले\s*लूँगा|ले\s*लेंगे|अप्लाई|apply"
+    r"|(?:लोन|loan|पैसे|पैसा|अमाउंट|रकम|लाख|हज़ार|हजार)[^।.?!,]{0,15}चाहिए",
+    re.IGNORECASE,
+)
+_MAYBE = re.compile(
+    r"सोच\s*के|सोचकर|सोच\s*कर|सोचना|सोचने|देखते\s*हैं|शायद|maybe|think\s*about|(?:टाइम|time|समय)\s*चाहिए",
+    re.IGNORECASE,
+)
+# Bare yes/no only count as intent when the agent just asked about the loan
+_INTEREST_QUESTION = re.compile(
+    r"इंटरेस्टेड|interested|रुचि|लेना\s*चाहेंगे|(?:लोन|loan)[^।.?!]{0,20}(?:चाहिए|चाहेंगे)\s*\?",
+    re.IGNORECASE,
+)
+_YES = re.compile(r"^\s*(?:जी\s*)?(?:हाँ|हां|हा|yes|haan?|बिल्कुल|ठीक\s*है)" + _WORD_END, re.IGNORECASE)
+_NO = re.compile(r"^\s*(?:जी\s*)?(?:नहीं|नही|ना|no|nahi)" + _WORD_END, re.IGNORECASE)
+_WHATSAPP = re.compile(r"व्हाट्सएप|व्हाट्सऐप|whats\s*app", re.IGNORECASE)
+_SENT = re.compile(r"भेज\s*दिया|भेज\s*दिए|भेज\s*दी|\bsent\b", re.IGNORECASE)
+_FOLLOW_UP = re.compile(
+    r"((?:कल|परसों|सोमवार|मंगलवार|बुधवार|गुरुवार|शुक्रवार|शनिवार|रविवार|अगले\s*हफ्ते|tomorrow|next\s*week)"
+    r"(?:\s*(?:सुबह|दोपहर|शाम|रात|morning|evening))?(?:\s*\d{1,2}\s*बजे)?)"
+    r"|(बाद\s*में|later|call\s*back)",
+    re.IGNORECASE,
+)
+_OWNED = re.compile(r"मेरे\s*पास|मेरी\s*(?:कार|गाड़ी|गाडी)|i\s*have|my\s*car", re.IGNORECASE)
+_NEW_PURCHASE = re.compile(r"नई\s*(?:कार|गाड़ी|गाडी)|new\s*car|खरीदनी|लेनी\s*है", re.IGNORECASE)
+_RUDE = re.compile(r"बकवास|बेवकूफ|पागल|shut\s*up|stupid", re.IGNORECASE)
+_POLITE = re.compile(r"धन्यवाद|शुक्रिया|thank|प्लीज़|please|जी\s*हाँ|जी\s*हां", re.IGNORECASE)
+
+# Fields that the final summary pass should fill if still unknown
+REQUIRED_FIELDS = (
+    "vehicle_information.vehicle_type",
+    "vehicle_information.make_model",
+    "financial_information.monthly_income_bracket",
+    "financial_information.loan_amount_requested",
+    "intent_and_qualification.interested_in_loan",
+)
+
+
+def _to_number(token: str) -> float:
+    token = token.translate(_DEVANAGARI_DIGITS)
+    if token in _HINDI_NUMBER_WORDS:
+        return _HINDI_NUMBER_WORDS[token]
+    return float(token)
+
+
+def _match_first(patterns: dict[str, str], text: str) -> str | None:
+    for value, pattern in patterns.items():
+        if re.search(pattern, text, re.IGNORECASE):
+            return value
+    return None
+
+
+def parse_amounts(text: str) -> list[int]:
+    """Rupee amounts mentioned in `text` ("5 लाख", "पाँच लाख", "40 हज़ार", "500000")."""
+    text = text.translate(_DEVANAGARI_DIGITS)
+    amounts = [int(_to_number(n) * _MULTIPLIERS[m.lower()]) for n, m in _AMOUNT.findall(text)]
+    if not amounts:
+        amounts = [int(n) for n in _PLAIN_AMOUNT.findall(text)]
+    return amounts
+
+
+def _money_topic(text: str) -> str | None:
+    if _INCOME_CONTEXT.search(text):
+        return "income"
+    if _EMI_CONTEXT.search(text):
+        return "emi"
+    if _LOAN_CONTEXT.search(text):
+        return "loan"
+    return None
+
+
+def income_bracket(monthly_income: int) -> str:
+    if monthly_income < 25_000:
+        return "Below 25k"
+    if monthly_income < 50_000:
+        return "25k-50k"
+    if monthly_income < 100_000:
+        return "50k-1L"
+    return "Above 1L"
+
+
+# --------------------------
+#   Call State
+# --------------------------
+
+@dataclass
+class CallState:
+    """
+    Structured call summary filled in turn by turn from the transcript.
+
+    Mirrors the JSON schema of class_mod/summary.SUMMARY_PROMPT. Cheap
+    regex/keyword extractors run on every user message, so at hangup most
+    fields are already known and the final LLM pass only fills the gaps and
+    writes summary_text (see class_mod/summary.finalize_summary).
+    """
+
+    customer_profile: dict = field(default_factory=lambda: {
+        "name": None, "gender": "unknown", "age_estimate": None,
+        "location_city": None, "occupation_type": "Unknown",
+    })
+    vehicle_information: dict = field(default_factory=lambda: {
+        "vehicle_type": "Unknown", "make_model": None, "registration_year": None,
+        "ownership_status": "Not Mentioned", "current_loan_provider": None,
+    })
+    financial_information: dict = field(default_factory=lambda: {
+        "monthly_income_bracket": "Unknown", "existing_emi_burden": "Unknown",
+        "cibil_score_discussed": "No", "approximate_cibil_score": None,
+        "loan_amount_requested": None, "tenure_requested_months": None,
+    })
+    intent_and_qualification: dict = field(default_factory=lambda: {
+        "interested_in_loan": "Maybe", "reason_if_not_interested": None,
+        "shared_documents_on_whatsapp": "No", "documents_mentioned": [],
+        "communication_tone": "Polite", "follow_up_needed": "No",
+        "preferred_follow_up_time": None,
+    })
+    user_turns: int = 0
+    agent_turns: int = 0
+    # field path → user text it was extracted from (for debugging extractors)
+    evidence: dict = field(default_factory=dict)
+    # fields set by an extractor, as opposed to schema defaults
+    filled: set = field(default_factory=set)
+    # last agent message: what the next user turn is answering
+    last_question: str = ""
+
+    @classmethod
+    def from_profile(cls, profile: dict) -> "CallState":
+        """Seed the state with what the dialer already knows about the customer."""
+        state = cls()
+        gender = str(profile.get("gender") or "").lower()
+        state.customer_profile.update({
+            "name": profile.get("customer_name"),
+            "gender": gender if gender in ("male", "female") else "unknown",
+            "age_estimate": profile.get("age"),
+            "location_city": profile.get("city"),
+        })
+        return state
+
+    def _set(self, section: str, key: str, value, text: str) -> None:
+        getattr(self, section)[key] = value
+        path = f"{section}.{key}"
+        self.filled.add(path)
+        self.evidence[path] = text
+
+    # --------------------------
+    #   Turn Updates
+    # --------------------------
+
+    def update(self, role: str, text: str) -> None:
+        """Apply all extractors to one finished message."""
+        if not text:
+            return
+        if role != "user":
+            self.agent_turns += 1
+            self.last_question = text
+            return
+        self.user_turns += 1
+        self._extract_vehicle(text)
+        self._extract_finance(text)
+        self._extract_intent(text)
+
+    def _extract_vehicle(self, text: str) -> None:
+        if vehicle_type := _match_first(_VEHICLE_TYPES, text):
+            self._set("vehicle_information", "vehicle_type", vehicle_type, text)
+        if make := _match_first(_MAKES, text):
+            self._set("vehicle_information", "make_model", make, text)
+        if _YEAR_CONTEXT.search(text) and (year := _YEAR.search(text.translate(_DEVANAGARI_DIGITS))):
+            self._set("vehicle_information", "registration_year", int(year.group(1)), text)
+        if _NEW_PURCHASE.search(text):
+            self._set("vehicle_information", "ownership_status", "New Purchase", text)
+        elif _OWNED.search(text) and self.vehicle_information["ownership_status"] == "Not Mentioned":
+            self._set("vehicle_information", "ownership_status", "Owned", text)
+        if _EMI_CONTEXT.search(text) or re.search(r"लोन\s*(?:चल|पर)", text):
+            self._set("vehicle_information", "ownership_status", "Financed", text)
+            if lender := _match_first(_LENDERS, text):
+                self._set("vehicle_information", "current_loan_provider", lender, text)
+
+    def _extract_finance(self, text: str) -> None:
+        if occupation := _match_first(_OCCUPATIONS, text):
+            self._set("customer_profile", "occupation_type", occupation, text)
+
+        if match := _CIBIL.search(text.translate(_DEVANAGARI_DIGITS)):
+            self._set("financial_information", "cibil_score_discussed", "Yes", text)
+            self._set("financial_information", "approximate_cibil_score", int(match.group(1)), text)
+        elif re.search(r"सिबिल|cibil|credit\s*score|क्रेडिट\s*स्कोर", text, re.IGNORECASE):
+            self._set("financial_information", "cibil_score_discussed", "Yes", text)
+
+        digits = text.translate(_DEVANAGARI_DIGITS)
+        topic = self._amount_topic(text)
+        tenure_asked = topic == "tenure" or _TENURE_CONTEXT.search(text)
+        # "गाड़ी 5 साल पुरानी है" is the car's age, not a tenure
+        if tenure_asked and not _VEHICLE_AGE.search(text) and (match := _TENURE.search(digits)):
+            value = _to_number(match.group(1))
+            months = value * 12 if re.match(r"साल|वर्ष|y", match.group(2), re.IGNORECASE) else value
+            if 6 <= months <= 120:
+                self._set("financial_information", "tenure_requested_months", int(months), text)
+
+        amounts = parse_amounts(text)
+        if not amounts or topic in (None, "tenure"):
+            return
+        # a bare number without लाख/हज़ार may be a PIN code rather than rupees
+        if not _AMOUNT.search(digits) and (_PINCODE.search(text) or _PINCODE.search(self.last_question)):
+            return
+        if topic == "income":
+            self._set("financial_information", "monthly_income_bracket", income_bracket(amounts[0]), text)
+        elif topic == "emi":
+            burden = "Low" if amounts[0] < 10_000 else "Moderate" if amounts[0] < 25_000 else "High"
+            self._set("financial_information", "existing_emi_burden", burden, text)
+        else:
+            self._set("financial_information", "loan_amount_requested", amounts[0], text)
+
+    def _amount_topic(self, text: str) -> str | None:
+        """What a number in `text` is about: the user's own words first, else the agent's question."""
+        if topic := _money_topic(text):
+            return topic
+        if _TENURE_QUESTION.search(self.last_question):
+            return "tenure"
+        return _money_topic(self.last_question)
+
+    def _extract_intent(self, text: str) -> None:
+        intent = self.intent_and_qualification
+        for document, pattern in _DOCUMENTS.items():
+            if re.search(pattern, text, re.IGNORECASE) and document not in intent["documents_mentioned"]:
+                intent["documents_mentioned"].append(document)
+                self.filled.add("intent_and_qualification.documents_mentioned")
+
+        if _NOT_INTERESTED.search(text):
+            self._set("intent_and_qualification", "interested_in_loan", "No", text)
+            self._set("intent_and_qualification", "reason_if_not_interested", text.strip(), text)
+        elif _MAYBE.search(text):
+            self._set("intent_and_qualification", "interested_in_loan", "Maybe", text)
+        elif _INTERESTED.search(text):
+            self._set("intent_and_qualification", "interested_in_loan", "Yes", text)
+        elif _INTEREST_QUESTION.search(self.last_question):
+            if _YES.search(text):
+                self._set("intent_and_qualification", "interested_in_loan", "Yes", text)
+            elif _NO.search(text):
+                self._set("intent_and_qualification", "interested_in_loan", "No", text)
+                self._set("intent_and_qualification", "reason_if_not_interested", text.strip(), text)
+
+        if _WHATSAPP.search(text) or (intent["shared_documents_on_whatsapp"] == "Pending" and _SENT.search(text)):
+            status = "Yes" if _SENT.search(text) else "Pending"
+            self._set("intent_and_qualification", "shared_documents_on_whatsapp", status, text)
+
+        if match := _FOLLOW_UP.search(text):
+            self._set("intent_and_qualification", "follow_up_needed", "Yes", text)
+            if match.group(1):
+                self._set("intent_and_qualification", "preferred_follow_up_time", match.group(1).strip(), text)
+
+        if _RUDE.search(text):
+            self._set("intent_and_qualification", "communication_tone", "Rude", text)
+        elif _POLITE.search(text) and intent["communication_tone"] != "Rude":
+            self._set("intent_and_qualification", "communication_tone", "Cooperative", text)
+
+    # --------------------------
+    #   Output
+    # --------------------------
+
+    def missing_fields(self) -> list[str]:
+        """REQUIRED_FIELDS no extractor has filled yet."""
+        return [path for path in REQUIRED_FIELDS if path not in self.filled]
+
+    def to_summary(self, call_metadata: dict | None = None) -> dict:
+        """Current state in the SUMMARY_PROMPT schema (summary_text left empty)."""
+        return {
+            "call_metadata": {
+                **(call_metadata or {}),
+                "user_turns": self.user_turns,
+                "agent_turns": self.agent_turns,
+            },
+            "customer_profile": dict(self.customer_profile),
+            "vehicle_information": dict(self.vehicle_information),
+            "financial_information": dict(self.financial_information),
+            "intent_and_qualification": {
+                **self.intent_and_qualification,
+                "documents_mentioned": list(self.intent_and_qualification["documents_mentioned"]),
+            },
+            "summary_text": None,
+        }
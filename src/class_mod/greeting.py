@@ -0,0 +1,78 @@
+# assistants/greeting.py
+import asyncio
+import logging
+from collections.abc import AsyncIterable
+
+from livekit import rtc
+from livekit.agents import tts
+
+from class_mod.tts_utils import PronunciationRewriter
+from helpers.customer_helper import CustomerProfileType
+
+logger = logging.getLogger("greeting")
+
+# How long on_enter waits for a still-rendering greeting before falling back to the LLM
+GREETING_RENDER_TIMEOUT = 5.0
+
+
+def build_greeting_text(customer_profile: CustomerProfileType) -> str:
+    """Deterministic opening line built from the customer's name, gender and bank."""
+    salutation = "मैम" if str(customer_profile.get("gender", "")).lower() == "female" else "सर"
+    customer_name = customer_profile.get("customer_name") or ""
+    bank_name = customer_profile.get("bank_name") or ""
+    return (
+        f"नमस्ते {salutation}, मैं काजल बोल रही हूँ {bank_name} से, "
+        f"क्या मेरी बात {customer_name} जी से हो रही है?"
+    )
+
+
+class PreRenderedGreeting:
+    """
+    Greeting audio synthesized ahead of time.
+
+    `start()` renders the text into PCM frames in the background (the agent job
+    is dispatched when the dialer creates the room, i.e. while the phone is
+    still ringing). `frames()` waits for that render and returns the buffer so
+    it can be played the moment the callee answers.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._task: asyncio.Task | None = None
+
+    def start(self, tts_engine: tts.TTS, rewriter: PronunciationRewriter | None = None) -> None:
+        """Begin rendering in the background (idempotent)."""
+        if self._task is None:
+            spoken = rewriter.rewrite(self.text) if rewriter else self.text
+            self._task = asyncio.create_task(self._render(tts_engine, spoken))
+
+    async def _render(self, tts_engine: tts.TTS, spoken: str) -> list[rtc.AudioFrame]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        frames: list[rtc.AudioFrame] = []
+        async with tts_engine.synthesize(spoken) as stream:
+            async for audio in stream:
+                frames.append(audio.frame)
+        logger.info("Greeting pre-rendered: %d frames in %.3fs", len(frames), loop.time() - started)
+        return frames
+
+    async def frames(self, timeout: float = GREETING_RENDER_TIMEOUT) -> list[rtc.AudioFrame] | None:
+        """Rendered frames, or None if rendering failed or did not finish in time."""
+        if self._task is None:
+            return None
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except Exception as e:
+            logger.warning("Pre-rendered greeting unavailable: %s", e)
+            return None
+
+    async def aclose(self) -> None:
+        """Cancel a render that is still running (job shutdown)."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+
+async def iter_frames(frames: list[rtc.AudioFrame]) -> AsyncIterable[rtc.AudioFrame]:
+    """Replay a buffered list of frames as an async stream (for AgentSession.say)."""
+    for frame in frames:
+        yield frame
@@ -1,6 +1,8 @@
 # assistants/summary.py
+import asyncio
 import json
 import logging
+import time
 
 from dotenv import load_dotenv
 from langchain_core.output_parsers import JsonOutputParser
@@ -64,11 +66,63 @@ _prompt = ChatPromptTemplate.from_messages([
 ])
 _summary_chain = _prompt | _summarizer_llm | _parser
 
+# Short gap-filling pass over the incrementally extracted call state (class_mod/call_state.py)
+FINALIZE_PROMPT = """
+        You are completing a car loan call summary.
+        The JSON below was extracted turn by turn during the call. Keep every value
+        unless the conversation clearly contradicts it. Fill the fields listed as
+        missing if the conversation tells you, otherwise keep them as they are.
+        Write "summary_text" as 2-3 natural sentences.
+        Output ONLY the complete JSON object with the same keys.
+        """
+_finalize_prompt = ChatPromptTemplate.from_messages([
+    ("system", FINALIZE_PROMPT),
+    ("user", "{input}")
+])
+_finalize_chain = _finalize_prompt | _summarizer_llm | _parser
+
+# Only the end of the transcript is sent to the finalize pass
+FINALIZE_TRANSCRIPT_CHARS = 4000
+
+
+# Upper bound for one summarizer round-trip (seconds)
+SUMMARY_TIMEOUT = 45.0
+
+# Batch mode defaults: parallel requests and request starts per minute (Groq rate limit)
+SUMMARY_BATCH_CONCURRENCY = 4
+SUMMARY_REQUESTS_PER_MINUTE = 30
+
+
+# ---------------- Rate Limiting ----------------
+class SummaryRateLimiter:
+    """Spaces summarizer requests evenly so at most `per_minute` start per minute."""
+
+    def __init__(self, per_minute: float = SUMMARY_REQUESTS_PER_MINUTE):
+        self.interval = 60.0 / per_minute
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
 
 # ---------------- Summary Function ----------------
-async def generate_summary_llm(history_text: str, customer_data: dict) -> dict:
+async def generate_summary_llm(
+    history_text: str,
+    customer_data: dict,
+    timeout: float = SUMMARY_TIMEOUT,
+    rate_limiter: SummaryRateLimiter | None = None,
+) -> dict:
     """
     Generate a structured JSON summary from the call transcript and customer metadata.
+    Uses the chain's async path, so the event loop (and live audio of other
+    sessions in the process) is never blocked. Cancelling the caller cancels
+    the request; a timeout is reported in-band like a parse failure.
     """
     logger.info("Generating call summary via independent LLM...")
 
@@ -81,11 +135,112 @@ async def generate_summary_llm(history_text: str, customer_data: dict) -> dict:
     {history_text}
     """
 
+    if rate_limiter is not None:
+        await rate_limiter.acquire()
+
     try:
-        result = _summary_chain.invoke({"input": llm_input})
+        result = await asyncio.wait_for(_summary_chain.ainvoke({"input": llm_input}), timeout)
         summary_json = json.loads(json.dumps(result))
         logger.info("Summary Successfully Generated")
         return summary_json
+    except asyncio.TimeoutError:
+        logger.error("Summary generation timed out after %.0fs", timeout)
+        return {"error": "Summary generation timed out", "exception": f"timeout after {timeout}s"}
     except Exception as e:
         logger.error("Failed to parse summary JSON: %s", e)
         return {"error": "Invalid JSON generated", "exception": str(e)}
+
+
+# ---------------- Batch Mode ----------------
+async def generate_summaries_batch(
+    transcripts: list[tuple[str, dict]],
+    max_concurrent: int = SUMMARY_BATCH_CONCURRENCY,
+    rate_limiter: SummaryRateLimiter | None = None,
+    timeout: float = SUMMARY_TIMEOUT,
+) -> list[dict]:
+    """
+    Summarize many (history_text, customer_data) pairs concurrently.
+    At most `max_concurrent` requests are in flight and starts are spaced by
+    the rate limiter; results are returned in input order.
+    """
+    rate_limiter = rate_limiter or SummaryRateLimiter()
+    sem = asyncio.Semaphore(max_concurrent)
+
+    async def _one(history_text: str, customer_data: dict) -> dict:
+        async with sem:
+            return await generate_summary_llm(history_text, customer_data, timeout=timeout, rate_limiter=rate_limiter)
+
+    return await asyncio.gather(*(_one(h, c) for h, c in transcripts))
+
+
+# ---------------- Incremental Summary ----------------
+def build_summary_text(summary: dict) -> str:
+    """Template summary_text from extracted fields (used when no LLM pass is needed or it fails)."""
+    profile = summary["customer_profile"]
+    vehicle = summary["vehicle_information"]
+    finance = summary["financial_information"]
+    intent = summary["intent_and_qualification"]
+
+    sentences = [f"Customer {profile.get('name') or 'unknown'} interest in a car loan: {intent['interested_in_loan']}."]
+    details = []
+    if vehicle.get("make_model") or vehicle.get("vehicle_type") != "Unknown":
+        details.append(f"vehicle {vehicle.get('make_model') or vehicle['vehicle_type']}")
+    if finance.get("loan_amount_requested"):
+        details.append(f"requested amount {finance['loan_amount_requested']}")
+    if finance.get("tenure_requested_months"):
+        details.append(f"tenure {finance['tenure_requested_months']} months")
+    if intent.get("documents_mentioned"):
+        details.append(f"documents {', '.join(intent['documents_mentioned'])}")
+    if details:
+        sentences.append("Discussed " + "; ".join(details) + ".")
+    if intent.get("follow_up_needed") == "Yes":
+        sentences.append(f"Follow up {intent.get('preferred_follow_up_time') or 'needed'}.")
+    return " ".join(sentences)
+
+
+async def finalize_summary(
+    call_state: dict,
+    missing_fields: list[str],
+    history_text: str,
+    timeout: float = SUMMARY_TIMEOUT,
+    rate_limiter: SummaryRateLimiter | None = None,
+) -> dict:
+    """
+    Turn the incrementally extracted call state into the final summary.
+
+    If every required field was extracted during the call no LLM is used.
+    Otherwise one short pass sees the pre-filled JSON, the missing fields and
+    only the tail of the transcript. If that pass fails the extracted state is
+    still returned, with a template summary_text.
+    """
+    summary = json.loads(json.dumps(call_state))
+    if not missing_fields:
+        summary["summary_text"] = build_summary_text(summary)
+        logger.info("Summary built from call state (no LLM pass needed)")
+        return summary
+
+    llm_input = f"""
+    EXTRACTED CALL STATE:
+    {json.dumps(summary, indent=2, ensure_ascii=False)}
+
+    MISSING FIELDS:
+    {", ".join(missing_fields)}
+
+    END OF CONVERSATION:
+    {history_text[-FINALIZE_TRANSCRIPT_CHARS:]}
+    """
+
+    if rate_limiter is not None:
+        await rate_limiter.acquire()
+
+    try:
+        result = await asyncio.wait_for(_finalize_chain.ainvoke({"input": llm_input}), timeout)
+        for section, values in result.items():
+            if isinstance(values, dict) and isinstance(summary.get(section), dict):
+                summary[section].update(values)
+        summary["summary_text"] = result.get("summary_text") or build_summary_text(summary)
+        logger.info("Summary finalized from call state (%d missing fields)", len(missing_fields))
+    except Exception as e:
+        logger.error("Finalize pass failed, using extracted call state: %s", e)
+        summary["summary_text"] = build_summary_text(summary)
+    return summary
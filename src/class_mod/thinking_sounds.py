@@ -0,0 +1,167 @@
+# assistants/thinking_sounds.py
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+
+from livekit import rtc
+from livekit.agents import (
+    AgentSession,
+    AgentStateChangedEvent,
+    AudioConfig,
+    BackgroundAudioPlayer,
+    tts,
+)
+
+from class_mod.greeting import iter_frames
+from class_mod.tts_cache import get_tts_cache
+from helpers.config import IST, THINKING_SOUND_THRESHOLD, THINKING_SOUND_VOLUME
+from helpers.session_context import SessionContext
+from helpers.setup_tts_stt import TTS_VOICE_SETTINGS
+
+logger = logging.getLogger("thinking_sounds")
+
+# Short Hindi backchannels that fit before any reply
+THINKING_PHRASES = ["अच्छा जी", "हम्म", "जी"]
+
+# BackgroundAudioPlayer mixes at 48kHz mono
+MIXER_SAMPLE_RATE = 48000
+
+
+def _resample(frames: list[rtc.AudioFrame]) -> list[rtc.AudioFrame]:
+    """Convert clip frames to the background mixer's format."""
+    if not frames or (frames[0].sample_rate == MIXER_SAMPLE_RATE and frames[0].num_channels == 1):
+        return frames
+    resampler = rtc.AudioResampler(frames[0].sample_rate, MIXER_SAMPLE_RATE, num_channels=frames[0].num_channels)
+    out: list[rtc.AudioFrame] = []
+    for frame in frames:
+        out.extend(resampler.push(frame))
+    out.extend(resampler.flush())
+    return out
+
+
+def load_thinking_clips(tts_provider: str) -> dict[str, list[rtc.AudioFrame]]:
+    """
+    Load pre-rendered backchannel clips from the TTS audio cache (blocking; used in prewarm).
+    Phrases that were never rendered are simply missing and get rendered on first use.
+    """
+    cache = get_tts_cache()
+    voice_settings = TTS_VOICE_SETTINGS.get(tts_provider, {})
+    clips = {}
+    for phrase in THINKING_PHRASES:
+        frames = cache.load(cache.key(phrase, tts_provider, voice_settings))
+        if frames:
+            clips[phrase] = _resample(frames)
+    logger.info("Loaded %d/%d thinking clips", len(clips), len(THINKING_PHRASES))
+    return clips
+
+
+class ThinkingSoundPlayer:
+    """
+    Masks slow replies with a backchannel clip.
+
+    When the agent starts thinking (end of the user's utterance) a timer is
+    armed; if no TTS frame has been produced after `threshold` seconds, one
+    clip is played on a separate background track. The clip is stopped as
+    soon as real audio arrives or the agent state changes. Each use is
+    recorded in the session logs and attached to the current turn's metrics.
+    """
+
+    def __init__(
+        self,
+        session_ctx: SessionContext,
+        clips: dict[str, list[rtc.AudioFrame]],
+        threshold: float = THINKING_SOUND_THRESHOLD,
+        volume: float = THINKING_SOUND_VOLUME,
+    ):
+        self.session_ctx = session_ctx
+        self.clips = clips
+        self.threshold = threshold
+        self._player = BackgroundAudioPlayer()
+        self._volume = volume
+        self._timer: asyncio.TimerHandle | None = None
+        self._handle = None
+        self._current: dict | None = None
+        self._thinking_since = 0.0
+        self._render_task: asyncio.Task | None = None
+
+    async def start(self, room: rtc.Room, session: AgentSession, tts_engine: tts.TTS) -> None:
+        """Publish the background track and follow the agent's state."""
+        await self._player.start(room=room, agent_session=session)
+        session.on("agent_state_changed", self._on_agent_state_changed)
+        if len(self.clips) < len(THINKING_PHRASES):
+            self._render_task = asyncio.create_task(self._render_missing(tts_engine))
+
+    async def aclose(self) -> None:
+        self.on_tts_audio()
+        if self._render_task is not None and not self._render_task.done():
+            self._render_task.cancel()
+        await self._player.aclose()
+
+    async def _render_missing(self, tts_engine: tts.TTS) -> None:
+        """Render absent clips once and persist them in the TTS cache for the next prewarm."""
+        provider = self.session_ctx.tts_provider
+        cache = get_tts_cache()
+        for phrase in THINKING_PHRASES:
+            if phrase in self.clips:
+                continue
+            try:
+                frames = []
+                async with tts_engine.synthesize(phrase) as stream:
+                    async for audio in stream:
+                        frames.append(audio.frame)
+                await cache.put(cache.key(phrase, provider, TTS_VOICE_SETTINGS.get(provider, {})), frames)
+                self.clips[phrase] = _resample(frames)
+            except Exception as e:
+                logger.warning("Failed to render thinking clip %r: %s", phrase, e)
+
+    # --------------------------
+    #   Triggers
+    # --------------------------
+
+    def _on_agent_state_changed(self, ev: AgentStateChangedEvent):
+        if ev.new_state == "thinking":
+            self._arm()
+        else:
+            self.on_tts_audio()
+
+    def _arm(self) -> None:
+        self._disarm_timer()
+        if not self.clips:
+            return
+        self._thinking_since = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(self.threshold, self._play)
+
+    def _play(self) -> None:
+        self._timer = None
+        phrase = random.choice(list(self.clips))
+        delay = time.perf_counter() - self._thinking_since
+        logger.info("Reply slow (%.2fs), playing thinking sound %r", delay, phrase)
+        self._handle = self._player.play(AudioConfig(iter_frames(self.clips[phrase]), volume=self._volume))
+        self._current = {
+            "phrase": phrase,
+            "delay_seconds": delay,
+            "started_at": time.perf_counter(),
+            "timestamp": datetime.now(IST).isoformat(),
+        }
+
+    def on_tts_audio(self) -> None:
+        """Real audio is available: cancel a pending timer and stop a playing clip."""
+        self._disarm_timer()
+        if self._handle is not None:
+            if not self._handle.done():
+                self._handle.stop()
+            self._handle = None
+        if self._current is not None:
+            record = self._current
+            record["played_seconds"] = time.perf_counter() - record.pop("started_at")
+            self.session_ctx.logs.setdefault("thinking_sounds", []).append(record)
+            self.session_ctx.turn_annotations["thinking_sound"] = record
+            self._current = None
+
+    def _disarm_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
@@ -0,0 +1,187 @@
+# assistants/tts_cache.py
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import wave
+from functools import cache
+from pathlib import Path
+
+from livekit import rtc
+
+from helpers.config import TTS_CACHE_MAX_BYTES, TTS_CACHE_MAX_CHARS, TTS_CACHE_PATH
+
+logger = logging.getLogger("tts_cache")
+
+# Cached audio is replayed in 20ms frames, like the live TTS output
+FRAME_DURATION_MS = 20
+# Serialises eviction between the job processes sharing the cache directory
+EVICT_LOCK = "evict.lock"
+# TTSMetrics label of audio served from the cache (no provider usage or cost)
+CACHE_METRICS_LABEL = "tts_cache"
+
+
+def normalize_tts_text(text: str) -> str:
+    """Normalize text for cache lookups (whitespace and case)."""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class TTSAudioCache:
+    """
+    Content-addressed, size-bounded on-disk cache of synthesized PCM audio.
+
+    Entries are keyed by the normalized text plus the provider and voice
+    settings (speaker, pace, language), stored as WAV files, and evicted
+    least-recently-used first once `max_bytes` is exceeded. The directory is
+    shared by every job process, so it is the only index: file mtimes carry
+    the recency and eviction re-scans it under a file lock.
+    """
+
+    def __init__(self, directory: Path = TTS_CACHE_PATH, max_bytes: int = TTS_CACHE_MAX_BYTES, max_chars: int = TTS_CACHE_MAX_CHARS):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._evict()
+
+    # --------------------------
+    #   Keys
+    # --------------------------
+
+    def key(self, text: str, provider: str, voice_settings: dict) -> str | None:
+        """Cache key for a segment, or None if the segment should not be cached."""
+        normalized = normalize_tts_text(text)
+        if not normalized or len(normalized) > self.max_chars:
+            return None
+        payload = json.dumps(
+            {"text": normalized, "provider": provider, "voice": voice_settings},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.wav"
+
+    def contains(self, key: str | None) -> bool:
+        """Cheap existence check, without reading the audio."""
+        return key is not None and self._path(key).exists()
+
+    # --------------------------
+    #   Lookup / Store
+    # --------------------------
+
+    async def get(self, key: str | None) -> list[rtc.AudioFrame] | None:
+        """Return cached frames for `key`, or None on a miss."""
+        if key is None:
+            return None
+        try:
+            frames = await asyncio.to_thread(self._read, self._path(key))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, wave.Error) as e:
+            logger.warning("Dropping unreadable TTS cache entry %s: %s", key, e)
+            self._path(key).unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return frames
+
+    def load(self, key: str | None) -> list[rtc.AudioFrame] | None:
+        """Blocking lookup for process start-up (prewarm), where no event loop runs yet."""
+        if key is None:
+            return None
+        try:
+            return self._read(self._path(key))
+        except FileNotFoundError:
+            return None
+        except (OSError, wave.Error) as e:
+            logger.warning("Dropping unreadable TTS cache entry %s: %s", key, e)
+            self._path(key).unlink(missing_ok=True)
+            return None
+
+    async def put(self, key: str | None, frames: list[rtc.AudioFrame]) -> None:
+        """Store the complete audio for `key` (partial/interrupted audio must not be passed)."""
+        if key is None or not frames or self.contains(key):
+            return
+        sample_rate, num_channels = frames[0].sample_rate, frames[0].num_channels
+        if any(f.sample_rate != sample_rate or f.num_channels != num_channels for f in frames):
+            logger.debug("Skipping TTS cache store: mixed audio formats")
+            return
+        pcm = b"".join(bytes(f.data) for f in frames)
+        try:
+            await asyncio.to_thread(self._write, self._path(key), pcm, sample_rate, num_channels)
+            await asyncio.to_thread(self._evict)
+        except OSError as e:
+            logger.warning("Failed to store TTS cache entry: %s", e)
+
+    # --------------------------
+    #   Disk I/O (runs in a worker thread)
+    # --------------------------
+
+    @staticmethod
+    def _read(path: Path) -> list[rtc.AudioFrame]:
+        with wave.open(str(path), "rb") as wav:
+            sample_rate = wav.getframerate()
+            num_channels = wav.getnchannels()
+            pcm = wav.readframes(wav.getnframes())
+        os.utime(path)  # keep LRU order across restarts
+
+        samples_per_frame = sample_rate * FRAME_DURATION_MS // 1000
+        bytes_per_frame = samples_per_frame * num_channels * 2
+        frames = []
+        for offset in range(0, len(pcm), bytes_per_frame):
+            chunk = pcm[offset:offset + bytes_per_frame]
+            frames.append(rtc.AudioFrame(
+                data=chunk,
+                sample_rate=sample_rate,
+                num_channels=num_channels,
+                samples_per_channel=len(chunk) // (2 * num_channels),
+            ))
+        return frames
+
+    @staticmethod
+    def _write(path: Path, pcm: bytes, sample_rate: int, num_channels: int) -> None:
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with wave.open(str(tmp_path), "wb") as wav:
+            wav.setnchannels(num_channels)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(pcm)
+        os.replace(tmp_path, path)  # atomic for other worker processes
+
+    # --------------------------
+    #   Eviction
+    # --------------------------
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the directory fits in `max_bytes`."""
+        with open(self.directory / EVICT_LOCK, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)    # other job processes evict from the same directory
+            entries = []
+            for path in self.directory.glob("*.wav"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                logger.debug("Evicted TTS cache entry %s", path.stem)
+
+
+@cache
+def get_tts_cache() -> TTSAudioCache:
+    """Process-wide TTS audio cache."""
+    return TTSAudioCache()
@@ -2,9 +2,17 @@
 import logging
 import re
 from collections.abc import AsyncIterable
+from functools import cache
 
 logger = logging.getLogger("tts_utils")
 
+# Streaming flush tuning (characters of LLM text)
+FIRST_FLUSH_CHARS = 8    # first TTS request goes out after the first few words
+MIN_FLUSH_CHARS = 40     # later requests wait for a pause or a longer phrase
+
+# Sentence ends (Devanagari danda included), newlines and "--" pauses
+_PAUSE_BOUNDARY = re.compile(r"(?:[.!?।]+|--+|\n)\s*")
+
 def get_pronunciations(tts_provider: str) -> dict:
     """Return a mapping of words → phonetic replacements based on provider."""
     pronunciations = {
@@ -46,58 +54,164 @@ def get_pronunciations(tts_provider: str) -> dict:
     return pronunciations
 
 
+class PronunciationRewriter:
+    """
+    Single-pass pronunciation rewriter.
+
+    All dictionary terms are compiled once into one case-insensitive
+    alternation (longest term first, so "Personal Loan" wins over "Loan"),
+    and each chunk is rewritten with a single regex scan.
+    """
+
+    def __init__(self, pronunciations: dict):
+        # Lowercased term → replacement; the first spelling of a term wins
+        self._replacements: dict[str, str] = {}
+        for term, replacement in pronunciations.items():
+            self._replacements.setdefault(term.lower(), replacement)
+
+        terms = sorted(self._replacements, key=len, reverse=True)
+        # Every prefix of every term, used to decide what a stream must hold back
+        self._prefixes = {t[:i] for t in terms for i in range(1, len(t) + 1)}
+        self._max_term_len = len(terms[0]) if terms else 0
+        self._pattern = re.compile(
+            r"(?<!\w)(?:" + "|".join(re.escape(t) for t in terms) + r")(?!\w)",
+            flags=re.IGNORECASE,
+        ) if terms else None
+
+    def rewrite(self, text: str) -> str:
+        """Replace every dictionary term in `text` in one pass."""
+        if self._pattern is None or not text:
+            return text
+        return self._pattern.sub(self._replace, text)
+
+    def spans(self, text: str) -> list[tuple[int, int]]:
+        """Return (start, end) of every dictionary term found in `text`."""
+        if self._pattern is None:
+            return []
+        return [m.span() for m in self._pattern.finditer(text)]
+
+    def holdback_start(self, text: str) -> int:
+        """
+        Index where the trailing text that could still grow into a term begins
+        (len(text) if nothing needs holding back). Used when `text` is the tail
+        of a stream and more characters may follow.
+        """
+        for start in range(max(0, len(text) - self._max_term_len), len(text)):
+            if start and (text[start - 1].isalnum() or text[start - 1] == "_"):
+                continue
+            if text[start:].lower() in self._prefixes:
+                return start
+        return len(text)
+
+    def _replace(self, match: re.Match) -> str:
+        return self._replacements[match.group(0).lower()]
+
+
+@cache
+def get_pronunciation_rewriter(tts_provider: str) -> PronunciationRewriter:
+    """Return the compiled rewriter for a provider (built once per process)."""
+    return PronunciationRewriter(get_pronunciations(tts_provider))
+
+
 async def adjust_text_for_tts(
     input_text: AsyncIterable[str],
-    pronunciations: dict
+    pronunciations: dict | PronunciationRewriter,
+    first_flush_chars: int = FIRST_FLUSH_CHARS,
+    min_flush_chars: int = MIN_FLUSH_CHARS,
 ) -> AsyncIterable[str]:
     """
     Process text for TTS:
-    - Removes <think> / reasoning markers (¤, ¶)
-    - Applies pronunciation replacements
+    - Removes <think> / reasoning markers (¤, ¶), even when split across deltas
+    - Holds back only the trailing text that could still become a dictionary
+      term, so terms split across LLM deltas ("Balance" + " Transfer") are
+      still replaced
+    - Flushes at sentence or `--` pause boundaries, or at a word boundary once
+      enough text is buffered (a smaller threshold for the first flush keeps
+      first audio fast)
     - Yields cleaned text for speech synthesis
     """
+    rewriter = (
+        pronunciations if isinstance(pronunciations, PronunciationRewriter)
+        else PronunciationRewriter(pronunciations)
+    )
     in_think = False
+    think_chars = 0
     buffer = ""
-    think_buffer = ""
+    flushed = False
 
     async for chunk in input_text:
-        buffer += chunk
-
-        # Detect start of think section
-        if "¤" in buffer:
-            before, _, after = buffer.partition("¤")
-            buffer = before
-            in_think = True
-            think_buffer = ""
-            logger.debug("Think section started.")
-            continue
-
-        # Inside think
-        if in_think:
-            if "¶" in buffer:
-                pre_think, _, after = buffer.partition("¶")
-                think_buffer += pre_think
-                token_count = len(think_buffer.strip())
-                logger.debug("Think section ended. Tokens (chars): %d", token_count)
-                buffer = after
+        pending = chunk
+        while pending:
+            if in_think:
+                end = pending.find("¶")
+                if end < 0:
+                    think_chars += len(pending)
+                    break
+                think_chars += end
+                logger.debug("Think section ended. Tokens (chars): %d", think_chars)
                 in_think = False
-                think_buffer = ""
+                pending = pending[end + 1:]
             else:
-                think_buffer += buffer
-                buffer = ""
-                continue
+                start = pending.find("¤")
+                if start < 0:
+                    buffer += pending
+                    break
+                buffer += pending[:start]
+                in_think = True
+                think_chars = 0
+                logger.debug("Think section started.")
+                pending = pending[start + 1:]
 
-        # Apply pronunciation replacements
-        cleaned = buffer
-        for term, replacement in pronunciations.items():
-            cleaned = re.sub(
-                rf"(?<!\w){re.escape(term)}(?!\w)",
-                replacement,
-                cleaned,
-                flags=re.IGNORECASE
-            )
+        min_chars = min_flush_chars if flushed else first_flush_chars
+        cut = _find_flush_point(buffer, rewriter, min_chars)
+        if cut <= 0:
+            continue
 
+        cleaned = rewriter.rewrite(buffer[:cut])
+        buffer = buffer[cut:]
         if cleaned.strip():
+            flushed = True
             yield cleaned
 
-        buffer = ""
+    # End of stream: nothing can extend the remaining text any more
+    cleaned = rewriter.rewrite(buffer)
+    if cleaned.strip():
+        yield cleaned
+
+
+def split_leading_phrase(text: str, max_chars: int) -> tuple[str, str] | None:
+    """
+    Split `text` after its first pause or sentence end ("जी सर -- ", "ठीक है सर।")
+    into (phrase, rest). None if no boundary ends within `max_chars`.
+    """
+    match = _PAUSE_BOUNDARY.search(text)
+    if match is None or match.end() > max_chars or not text[:match.start()].strip():
+        return None
+    return text[:match.end()], text[match.end():]
+
+
+def _find_flush_point(text: str, rewriter: PronunciationRewriter, min_chars: int) -> int:
+    """
+    Return how many leading characters of `text` can be rewritten and sent to
+    TTS now (0 = keep buffering).
+    Prefers the last sentence/pause boundary; otherwise the last word boundary
+    once at least `min_chars` are ready. Never cuts through a dictionary term.
+    """
+    safe_end = rewriter.holdback_start(text)
+    if safe_end <= 0:
+        return 0
+
+    ready = text[:safe_end]
+    cut = 0
+    for match in _PAUSE_BOUNDARY.finditer(ready):
+        cut = match.end()
+    if not cut and safe_end >= min_chars:
+        cut = ready.rfind(" ") + 1
+    if cut <= 0:
+        return 0
+
+    # Do not split a complete multi-word term such as "Balance Transfer"
+    for span_start, span_end in rewriter.spans(ready):
+        if span_start < cut < span_end:
+            return span_start
+    return cut
@@ -1,33 +1,38 @@
 import asyncio
 import logging
 import os
+import socket
 import uuid
+from collections.abc import Awaitable, Callable
 from pathlib import Path
 
 from dotenv import load_dotenv
 from google.cloud import storage
-from livekit import api
 from livekit.api import (
+    CreateAgentDispatchRequest,
     EncodedFileOutput,
     GCPUpload,
     RoomCompositeEgressRequest,
     StopEgressRequest,
 )
-from livekit.protocol.room import ListParticipantsRequest
-from livekit.protocol.sip import (
-    CreateSIPOutboundTrunkRequest,
-    CreateSIPParticipantRequest,
-    ListSIPOutboundTrunkRequest,
-    SIPOutboundTrunkInfo,
-)
+from livekit.protocol.room import CreateRoomRequest, UpdateRoomMetadataRequest
+from livekit.protocol.sip import CreateSIPParticipantRequest
 
+from helpers.call_lifecycle import CALL_TRACKER
+from helpers.campaign import CampaignCheckpoint, iter_customers, run_campaign
+from helpers.config import AGENT_SESSION_CAPACITY, HEARTBEAT_INTERVAL, SIP_TRUNK_LIMITS
+from helpers.control_client import CONTROL
 from helpers.customer_helper import (
     CustomerProfileType,
-    save_customer_profile,
+    encode_customer_profile,
     update_customer_profile,
 )
-
-#from helpers.entrypoint import room_name_str
+from helpers.dial_pacer import DialPacer
+from helpers.livekit_client import livekit_api
+from helpers.metrics_registry import collect_snapshots, gauge_total
+from helpers.post_call_queue import wait_for_post_call_capacity
+from helpers.sip_trunks import TRUNK_REGISTRY, dial_outcome
+from helpers.trunk_pool import SIPTrunkPool
 
 # --------------------------
 # Configure Logging
@@ -51,83 +56,120 @@ LIVEKIT_API_SECRET = os.environ["LIVEKIT_API_SECRET"]
 LIVEKIT_URL = os.environ["LIVEKIT_URL"]
 GCP_BUCKET = os.environ["GCP_BUCKET"]
 
-TRUNK_NAME = os.environ.get("TRUNK_NAME", "My outbound trunk")
-TRUNK_ADDRESS = os.environ.get("TRUNK_ADDRESS", "livekit-sip-outbound-trunk.pstn.twilio.com")
-TRUNK_NUMBER = os.environ.get("TRUNK_NUMBER", "+17473503389")
-TRUNK_USERNAME = os.environ["TRUNK_USERNAME"]
-TRUNK_PASSWORD = os.environ["TRUNK_PASSWORD"]
+# Named trunk from helpers/sip_trunks ("tata" or "twilio")
+SIP_TRUNK = os.environ.get("SIP_TRUNK", "tata")
+# Trunks the dialer balances over, e.g. "tata,twilio" (limits in SIP_TRUNK_LIMITS)
+SIP_TRUNKS = [t.strip() for t in os.environ.get("SIP_TRUNKS", SIP_TRUNK).split(",") if t.strip()]
+TRUNK_POOL = SIPTrunkPool({name: SIP_TRUNK_LIMITS[name] for name in SIP_TRUNKS})
+
+
+def _agent_load() -> float:
+    """Share of agent session capacity in use on this host (agent workers' metrics snapshots)."""
+    active = gauge_total(collect_snapshots(include_self=False), "voice_agent_active_sessions")
+    return active / AGENT_SESSION_CAPACITY
+
+
+# Calls-per-second and adaptive concurrency for every dial path, including the API server
+DIAL_PACER = DialPacer(load_probe=_agent_load)
 
 
 # --------------------------
 # Create or Get SIP Trunk
 # --------------------------
-async def create_or_get_trunk():
-    """Get existing SIP trunk or create a new one if not found."""
-    logger.info("🔄 Checking for existing SIP trunk...")
-    async with api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET) as lkapi:
-        try:
-            request = ListSIPOutboundTrunkRequest()
-            trunks_response = await lkapi.sip.list_sip_outbound_trunk(request)
-            for t in getattr(trunks_response, "trunks", []):
-                if t.name == TRUNK_NAME:
-                    logger.info(f"✅ Using existing trunk: {t.sip_trunk_id}")
-                    return t.sip_trunk_id
-
-            logger.info("📞 No existing trunk found, creating a new one...")
-            trunk = SIPOutboundTrunkInfo(
-                name="tata-sip",
-                address="27.107.220.6:5101",
-                numbers=["00919240908350"],
-                auth_username="00919240908350",
-                auth_password="1234",
-            )
-            create_request = CreateSIPOutboundTrunkRequest(trunk=trunk)
-            created_trunk = await lkapi.sip.create_sip_outbound_trunk(create_request)
-            logger.info(f"✅ Created new trunk: {created_trunk.sip_trunk_id}")
-            return created_trunk.sip_trunk_id
-        except Exception as e:
-            logger.error(f"❌ Failed to create/get SIP trunk: {e}", exc_info=True)
-            raise
+async def create_or_get_trunk(trunk: str = SIP_TRUNK) -> str:
+    """Trunk ID for the named trunk (cached per process, created if not found)."""
+    try:
+        return await TRUNK_REGISTRY.resolve(trunk)
+    except Exception as e:
+        logger.error(f"❌ Failed to create/get SIP trunk: {e}", exc_info=True)
+        raise
 
 
 # --------------------------
 # Make SIP Call
 # --------------------------
-async def make_call(phone_number: str, name: str, gender: str, sip_trunk_id: str, room_name: str, participant_identity: str):
-    """Dial the phone number via SIP trunk and join to LiveKit room."""
+async def make_call(
+    phone_number: str,
+    name: str,
+    gender: str,
+    sip_trunk_id: str,
+    room_name: str,
+    participant_identity: str,
+    customer: CustomerProfileType | None = None,
+    trunk: str = SIP_TRUNK,
+    agent_name: str | None = None,
+):
+    """
+    Dial the phone number via SIP trunk and join to LiveKit room.
+    If `customer` is given, it is attached as room and participant metadata
+    so the agent job reads the profile from LiveKit instead of a shared file.
+    With `agent_name`, the job is explicitly dispatched to that worker.
+    """
     participant_name = f"{name} ({gender.upper()})"
     logger.info(f"📤 Creating SIP request for {participant_name} → {phone_number}")
 
-    async with api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET) as lkapi:
+    async with livekit_api() as lkapi:
+        metadata = encode_customer_profile(customer) if customer else ""
         request = CreateSIPParticipantRequest(
             sip_trunk_id=sip_trunk_id,
-            sip_number="00919240908350",
+            sip_number=TRUNK_REGISTRY.spec(trunk).number,
             sip_call_to=phone_number,
             room_name=room_name,
             participant_identity=participant_identity,
             participant_name=participant_name,
+            participant_metadata=metadata,
             wait_until_answered=True,
         )
 
+        try:
+            if metadata:
+                # Room metadata is part of the job the agent receives on dispatch
+                room = await lkapi.room.create_room(CreateRoomRequest(name=room_name, metadata=metadata))
+                if room.metadata != metadata:
+                    # create_room returns an existing room unchanged; don't leave the previous customer's profile
+                    logger.warning(f"⚠️ Room {room_name} already existed, replacing its metadata")
+                    await lkapi.room.update_room_metadata(UpdateRoomMetadataRequest(room=room_name, metadata=metadata))
+                CALL_TRACKER.begin(room_name, room.sid)
+            else:
+                CALL_TRACKER.begin(room_name)
+            if agent_name:
+                await lkapi.agent_dispatch.create_dispatch(
+                    CreateAgentDispatchRequest(agent_name=agent_name, room=room_name, metadata=metadata)
+                )
+        except Exception as e:
+            # Nothing was dialed: not a trunk outcome, so trunk health and pacing are untouched
+            logger.error(f"❌ Failed to prepare room {room_name} for {participant_name}: {e}", exc_info=True)
+            return None
+
         try:
             participant = await lkapi.sip.create_sip_participant(request)
             if participant:
                 logger.info(f"📞 Call connected: {participant_name} ({phone_number}) in room {room_name}")
+                _record_dial(trunk, "answered")
                 return participant
             logger.warning(f"⚠️ Call to {participant_name} was not answered.")
+            _record_dial(trunk, "no_answer")
             return None
         except Exception as e:
             logger.error(f"❌ Failed to make call to {participant_name}: {e}", exc_info=True)
+            TRUNK_REGISTRY.invalidate_on_error(trunk, e)
+            _record_dial(trunk, dial_outcome(e))
             return None
 
 
+def _record_dial(trunk: str, outcome: str) -> None:
+    DIAL_PACER.record(outcome)
+    if trunk in TRUNK_POOL.trunks:
+        TRUNK_POOL.record(trunk, outcome)
+
+
 # --------------------------
 # Start Audio Recording
 # --------------------------
 async def start_audio_recording(room_name: str, base_name: str):
     """Start GCP audio recording."""
     logger.info(f"🎙️ Starting recording for room {room_name}...")
-    async with api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET) as lkapi:
+    async with livekit_api() as lkapi:
         try:
             file_output = EncodedFileOutput(filepath=f"{base_name}" ,gcp=GCPUpload(bucket=GCP_BUCKET))
             egress_req = RoomCompositeEgressRequest(
@@ -149,7 +191,7 @@ async def start_audio_recording(room_name: str, base_name: str):
 async def stop_audio_recording(egress_id: str):
     """Stop an active egress recording."""
     logger.info(f"🛑 Stopping recording for egress {egress_id}...")
-    async with api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET) as lkapi:
+    async with livekit_api() as lkapi:
         try:
             await lkapi.egress.stop_egress(StopEgressRequest(egress_id=egress_id))
             logger.info(f"✅ Recording stopped successfully (egress: {egress_id})")
@@ -260,87 +302,89 @@ async def run_calls_rec():
     record_choice = input("🎙️ Do you want to record the call and upload summary? (Y/N) [N]: ").strip().upper() or "N"
     do_record = record_choice == "Y"
 
-    trunk_id = await create_or_get_trunk()
-    logger.info(f"🔑 Using trunk ID: {trunk_id}")
+    # Paced admission and a trunk channel, both held until the call ends
+    async with DIAL_PACER.slot(), TRUNK_POOL.channel() as trunk:
+        trunk_id = await create_or_get_trunk(trunk)
+        logger.info(f"🔑 Using trunk {trunk} ({trunk_id})")
 
-    participant_identity = customer["customer_id"]
-    room_name = customer['phone_number']
-    base_name = f"{room_name}_{participant_identity}"
+        participant_identity = customer["customer_id"]
+        # fresh room per call: a reused room keeps its agent and metadata from the last call
+        room_name = f"{customer['phone_number']}-{uuid.uuid4().hex[:8]}"
+        base_name = f"{room_name}_{participant_identity}"
 
-    participant = await make_call(
-        phone_number=customer["phone_number"],
-        name=customer["customer_name"],
-        gender=customer["gender"],
-        sip_trunk_id=trunk_id,
-        room_name=room_name,
-        participant_identity=participant_identity
-    )
+        participant = await make_call(
+            phone_number=customer["phone_number"],
+            name=customer["customer_name"],
+            gender=customer["gender"],
+            sip_trunk_id=trunk_id,
+            room_name=room_name,
+            participant_identity=participant_identity,
+            customer=customer,
+            trunk=trunk,
+        )
 
-    if participant:
-        egress_info = None
-        if do_record:
-            egress_info = await start_audio_recording(room_name, base_name)
+        if participant:
+            egress_info = None
+            if do_record:
+                egress_info = await start_audio_recording(room_name, base_name)
 
-        async with api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET) as lkapi:
-            logger.info(f"📡 Monitoring participants in room {room_name}...")
-            while True:
-                participants_resp = await lkapi.room.list_participants(
-                    ListParticipantsRequest(room=room_name)
-                )
-                identities = [p.identity for p in participants_resp.participants]
-                if participant_identity not in identities:
-                    logger.info("📴 Participant left.")
-                    if do_record and egress_info:
-                        await stop_audio_recording(egress_info.egress_id)
-                    break
-
-        # ✅ After participant leaves, handle summary/audio upload if recording was enabled
-        if do_record:
-            try:
-                temp_dir = Path(__file__).parent / "temp"
-                summary_filename = f"{room_name}_{participant_identity}.json"
-                summary_path = temp_dir / summary_filename
-
-                # Upload summary JSON
-                if summary_path.exists():
-                    logger.info(f"📂 Found summary file: {summary_path}")
-                    gcs_uri = await upload_summary_to_gcp(GCP_BUCKET, summary_path)
-                    if gcs_uri:
-                        logger.info(f"☁️ Uploaded summary to GCP: {gcs_uri}")
-                        summary_path.unlink(missing_ok=True)
-                        logger.info("🧹 Deleted local summary file.")
-                    else:
-                        logger.warning("⚠️ Summary upload failed or skipped.")
-                else:
-                    logger.warning(f"⚠️ No summary file found at {summary_path}")
+            async with livekit_api() as lkapi:
+                logger.info(f"📡 Waiting for the call in room {room_name} to end...")
+                await CALL_TRACKER.wait_for_call_end(lkapi, room_name, participant_identity)
+                if do_record and egress_info:
+                    await stop_audio_recording(egress_info.egress_id)
 
-                # Upload audio file
-                audio_path = Path(f"{base_name}.ogg")  # same name as recording
-                if audio_path.exists():
-                    logger.info(f"📂 Found audio file: {audio_path}")
-                    gcs_audio_uri = await upload_summary_to_gcp(GCP_BUCKET, audio_path)
-                    if gcs_audio_uri:
-                        logger.info(f"☁️ Uploaded audio to GCP: {gcs_audio_uri}")
-                        audio_path.unlink(missing_ok=True)
-                        logger.info("🧹 Deleted local audio file.")
-                    else:
-                        logger.warning("⚠️ Audio upload failed or skipped.")
+    # ✅ After participant leaves, handle audio upload if recording was enabled
+    # (the call summary is written and uploaded by the agent's post-call queue)
+    if participant and do_record:
+        try:
+            # Upload audio file
+            audio_path = Path(f"{base_name}.ogg")  # same name as recording
+            if audio_path.exists():
+                logger.info(f"📂 Found audio file: {audio_path}")
+                gcs_audio_uri = await upload_summary_to_gcp(GCP_BUCKET, audio_path)
+                if gcs_audio_uri:
+                    logger.info(f"☁️ Uploaded audio to GCP: {gcs_audio_uri}")
+                    audio_path.unlink(missing_ok=True)
+                    logger.info("🧹 Deleted local audio file.")
                 else:
-                    logger.warning(f"⚠️ No audio file found at {audio_path}")
+                    logger.warning("⚠️ Audio upload failed or skipped.")
+            else:
+                logger.warning(f"⚠️ No audio file found at {audio_path}")
 
-            except Exception as e:
-                logger.error(f"❌ Failed to upload summary/audio to GCP: {e}", exc_info=True)
+        except Exception as e:
+            logger.error(f"❌ Failed to upload audio to GCP: {e}", exc_info=True)
+
+
+# -------------------------------------------
+# Dialer Demand Reports
+# -------------------------------------------
+async def _report_demand(interval: float = HEARTBEAT_INTERVAL) -> None:
+    """Queued calls and dial count, so agent workers keep enough prewarmed processes (server.py)."""
+    dialer_id = f"{socket.gethostname()}-{os.getpid()}"
+    while True:
+        await CONTROL.post("/dialer/demand", {"dialer_id": dialer_id, "pending": DIAL_PACER.waiting, "dialed": DIAL_PACER.dialed})
+        await asyncio.sleep(interval)
+
+
+async def _with_demand_reports(campaign: Awaitable[dict[str, int]]) -> dict[str, int]:
+    reporter = asyncio.create_task(_report_demand())
+    try:
+        return await campaign
+    finally:
+        reporter.cancel()
 
 
 # -------------------------------------------
-# Run Calls with Rolling Concurrency + Delay
+# Run Calls with Rolling Concurrency
 # -------------------------------------------
-async def run_parallel_calls(max_concurrent: int = 4, delay_seconds: int = 5):
+async def run_parallel_calls(max_concurrent: int = 4):
     """
     Run multiple customer calls concurrently with:
-    - Up to `max_concurrent` calls active at any time
-    - Delay between starting each call to prevent profile overlap
+    - Up to `max_concurrent` calls active at any time (fewer while DIAL_PACER backs off)
+    - Each profile dispatched with its own room metadata (no shared file)
     - Automatically starts next call as soon as a call finishes
+    For real lead lists use `run_campaign_calls` (streamed, checkpointed).
     """
 
     logger.info(f"🚀 Starting rolling call workflow (max_concurrent={max_concurrent})")
@@ -471,57 +515,65 @@ async def run_parallel_calls(max_concurrent: int = 4, delay_seconds: int = 5):
     ]
 
     logger.info(f"🧾 Loaded {len(customers)} customers for calling")
+    logger.info(f"🔑 Balancing over trunks: {', '.join(TRUNK_POOL.trunks)}")
+    return await _with_demand_reports(run_campaign(customers, dial_customer, max_in_flight=max_concurrent))
 
-    # 🔑 Get trunk once
-    logger.info("🔄 Creating or fetching trunk ID...")
-    trunk_id = await create_or_get_trunk()
-    logger.info(f"🔑 Using trunk ID: {trunk_id}")
-
-    # 🎯 Define single call routine
-    async def make_individual_call(customer: CustomerProfileType, sem: asyncio.Semaphore):
-        async with sem:  # limits concurrency
-            prefix = f"[{customer['customer_name']}]"
-            try:
-                save_customer_profile(profile=customer)
-                logger.info(f"{prefix} 💾 Profile saved")
-
-                room_name = f"room-{uuid.uuid4().hex[:4]}"
-                participant_identity = customer["customer_id"]
-                logger.info(f"{prefix} 📞 Initiating call to {customer['phone_number']}...")
-
-                participant = await make_call(
-                    phone_number=customer["phone_number"],
-                    name=customer["customer_name"],
-                    gender=customer["gender"],
-                    sip_trunk_id=trunk_id,
-                    room_name=room_name,
-                    participant_identity=participant_identity
-                )
 
-                if participant:
-                    logger.info(f"{prefix} ✅ Call successfully started (room: {room_name})")
-                else:
-                    logger.warning(f"{prefix} ⚠️ Call initiation failed or returned None")
-
-            except Exception as e:
-                logger.error(f"{prefix} ❌ Error during call: {e}", exc_info=True)
-            finally:
-                logger.info(f"{prefix} 📴 Call process ended")
+# -------------------------------------------
+# Run Campaign from a Lead File
+# -------------------------------------------
+async def run_campaign_calls(source: str | Path, max_concurrent: int = 4, table: str = "customers"):
+    """
+    Dial a lead file (CSV, or a SQLite table) with rolling concurrency.
+    Rows are streamed, and per-row outcomes are checkpointed in
+    campaigns/<file>.db, so rerunning after a crash resumes where it stopped.
+    """
+    logger.info(f"🚀 Starting campaign from {source} (max_concurrent={max_concurrent})")
+    checkpoint = CampaignCheckpoint.for_source(source)
+    totals = await _with_demand_reports(
+        run_campaign(iter_customers(source, table), dial_customer, max_in_flight=max_concurrent, checkpoint=checkpoint)
+    )
+    logger.info(f"🧾 Campaign outcomes so far: {checkpoint.counts()}")
+    return totals
 
-    # ⚙️ Use rolling concurrency with semaphore + delay
-    sem = asyncio.Semaphore(max_concurrent)
-    tasks = []
 
-    for idx, customer in enumerate(customers):
-        task = asyncio.create_task(make_individual_call(customer, sem))
-        tasks.append(task)
+# --------------------------
+# Dial One Customer
+# --------------------------
+async def dial_customer(customer: CustomerProfileType) -> str:
+    """Dial one customer and wait for the call to end; returns "answered" or "not_connected"."""
+    prefix = f"[{customer['customer_name']}]"
+    # Backpressure: don't outrun the summary/persistence workers
+    await wait_for_post_call_capacity()
+    try:
+        room_name = f"room-{uuid.uuid4().hex[:12]}"
+        participant_identity = customer["customer_id"]
+        # Paced admission and the least-loaded healthy trunk, both held until the call ends
+        async with DIAL_PACER.slot(), TRUNK_POOL.channel() as trunk:
+            trunk_id = await create_or_get_trunk(trunk)
+            logger.info(f"{prefix} 📞 Initiating call to {customer['phone_number']} via {trunk}...")
+
+            participant = await make_call(
+                phone_number=customer["phone_number"],
+                name=customer["customer_name"],
+                gender=customer["gender"],
+                sip_trunk_id=trunk_id,
+                room_name=room_name,
+                participant_identity=participant_identity,
+                customer=customer,
+                trunk=trunk,
+            )
 
-        if idx < len(customers) - 1:
-            logger.info(f"⏱️ Waiting {delay_seconds}s before starting next call...")
-            await asyncio.sleep(delay_seconds)
+            if not participant:
+                logger.warning(f"{prefix} ⚠️ Call initiation failed or returned None")
+                return "not_connected"
 
-    await asyncio.gather(*tasks)
-    logger.info("✅ All calls initiated successfully!")
+            logger.info(f"{prefix} ✅ Call successfully started (room: {room_name})")
+            async with livekit_api() as lkapi:
+                await CALL_TRACKER.wait_for_call_end(lkapi, room_name, participant_identity)
+            return "answered"
+    finally:
+        logger.info(f"{prefix} 📴 Call process ended")
 
 
 # --------------------------
@@ -622,18 +674,21 @@ async def run_calls_api(
     phone_number: str,
     room_name: str = "voice_agent_room",
     do_record: bool = False,
+    on_answered: Callable[[], None] | None = None,
+    agent_name: str | None = None,
 ):
     """
     Programmatic call workflow (for backend use):
-    1. Save customer info to JSON
+    1. Build customer profile (sent to the agent as room metadata)
     2. Create SIP trunk
-    3. Make call
+    3. Make call (`on_answered` is called once the callee picks up;
+       `agent_name` pins the job to one worker)
     4. Optionally record
     5. Upload summaries/audio
     """
     logger.info("🚀 Starting single call workflow (programmatic)")
 
-    # Normalize and persist customer info
+    # Normalize customer info
     customer: CustomerProfileType = {
         "customer_id": name.lower().replace(" ", "_"),
         "customer_name": name.strip(),
@@ -645,66 +700,49 @@ async def run_calls_api(
         "gender": gender.capitalize(),
     }
 
-    # Save to src/customer.json so entrypoint.py sees latest info
-    try:
-        save_customer_profile(customer)
-        logger.info(f"💾 Customer info saved: {customer}")
-    except Exception as e:
-        logger.warning(f"⚠️ Failed to save customer info: {e}")
+    logger.info(f"🧾 Customer profile for dispatch: {customer}")
 
     try:
-        trunk_id = await create_or_get_trunk()
-        logger.info(f"🔑 Using trunk ID: {trunk_id}")
+        # Paced admission and a trunk channel, both held until the call ends
+        async with DIAL_PACER.slot(), TRUNK_POOL.channel() as trunk:
+            trunk_id = await create_or_get_trunk(trunk)
+            logger.info(f"🔑 Using trunk {trunk} ({trunk_id})")
+
+            participant_identity = customer["customer_id"]
+            base_name = f"{room_name}_{participant_identity}"
+
+            participant = await make_call(
+                phone_number=customer["phone_number"],
+                name=customer["customer_name"],
+                gender=customer["gender"],
+                sip_trunk_id=trunk_id,
+                room_name=room_name,
+                participant_identity=participant_identity,
+                customer=customer,
+                trunk=trunk,
+                agent_name=agent_name,
+            )
 
-        participant_identity = customer["customer_id"]
-        base_name = f"{room_name}_{participant_identity}"
+            if not participant:
+                logger.error("❌ Failed to create participant / place call")
+                return {"status": "failed", "reason": "make_call failed"}
+            if on_answered:
+                on_answered()
 
-        participant = await make_call(
-            phone_number=customer["phone_number"],
-            name=customer["customer_name"],
-            gender=customer["gender"],
-            sip_trunk_id=trunk_id,
-            room_name=room_name,
-            participant_identity=participant_identity,
-        )
+            egress_info = None
+            if do_record:
+                egress_info = await start_audio_recording(room_name, base_name)
 
-        if not participant:
-            logger.error("❌ Failed to create participant / place call")
-            return {"status": "failed", "reason": "make_call failed"}
+            # Wait for the call to end (webhook / room observer, polling as fallback)
+            async with livekit_api() as lkapi:
+                logger.info(f"📡 Waiting for the call in room {room_name} to end...")
+                await CALL_TRACKER.wait_for_call_end(lkapi, room_name, participant_identity)
+                if do_record and egress_info:
+                    await stop_audio_recording(egress_info.egress_id)
 
-        egress_info = None
-        if do_record:
-            egress_info = await start_audio_recording(room_name, base_name)
-
-        # Monitor room participants
-        async with api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET) as lkapi:
-            logger.info(f"📡 Monitoring participants in room {room_name}...")
-            while True:
-                participants_resp = await lkapi.room.list_participants(
-                    ListParticipantsRequest(room=room_name)
-                )
-                identities = [p.identity for p in participants_resp.participants]
-                if participant_identity not in identities:
-                    logger.info("📴 Participant left.")
-                    if do_record and egress_info:
-                        await stop_audio_recording(egress_info.egress_id)
-                    break
-                await asyncio.sleep(2)
-
-        # Upload recorded assets
+        # Upload recorded audio (the summary is uploaded by the agent's post-call queue)
         if do_record:
             try:
-                temp_dir = Path(__file__).parent / "temp"
-                summary_filename = f"{room_name}_{participant_identity}.json"
-                summary_path = temp_dir / summary_filename
-
-                # Upload summary
-                if summary_path.exists():
-                    gcs_uri = await upload_summary_to_gcp(GCP_BUCKET, summary_path)
-                    if gcs_uri:
-                        logger.info(f"☁️ Uploaded summary: {gcs_uri}")
-                        summary_path.unlink(missing_ok=True)
-
                 # Upload audio
                 audio_path = Path(f"{base_name}.ogg")
                 if audio_path.exists():
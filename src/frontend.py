@@ -88,7 +88,9 @@
 #     call_btn.click(make_call, inputs=[name_in, number_in, gender_in, record_in], outputs=[call_output])
 
 # demo.launch(server_name="0.0.0.0", server_port=7860, share=True)
+import json
 import os
+import time
 
 import gradio as gr
 import requests
@@ -103,8 +105,17 @@ API_KEY = os.getenv("VOICE_AGENT_API_KEY", "supersecret123")
 
 HEADERS = {"X-API-Key": API_KEY}
 
-# Global state to track if call is active
-call_active = False
+# Calls shown in the live status panel
+MAX_CALLS_SHOWN = 10
+
+STATUS_EMOJI = {
+    "idle": "💤",
+    "initiated": "📞",
+    "dialing": "📲",
+    "in_progress": "🟡",
+    "completed": "✅",
+    "failed": "❌",
+}
 
 # ==========================
 # HELPERS
@@ -125,7 +136,6 @@ def check_agent_status() -> tuple[str, str]:
 
 def make_call(name, number, gender, record):
     """Trigger a new outbound call via backend."""
-    global call_active
     try:
         # Ensure +91 prefix
         if not number.startswith("+"):
@@ -148,71 +158,59 @@ def make_call(name, number, gender, record):
 
         if resp.status_code == 200:
             data = resp.json()
-            call_active = True  # Activate call tracking
-            return (
-                f"✅ Call initiated to {number}\n\n{data}",
-                gr.update(active=True),  # Activate call timer
-                "🔄 **Call In Progress** - Monitoring..."  # Update call status
-            )
+            return f"✅ Call initiated to {number}\n\n{data}"
         else:
-            return (
-                f"❌ Failed: {resp.status_code}\n{resp.text}",
-                gr.update(active=False),
-                "❌ Call Failed"
-            )
-    except Exception as e:
-        return (
-            f"⚠️ Error: {e}",
-            gr.update(active=False),
-            "⚠️ Error"
-        )
-
-
-def get_call_status() -> tuple[str, dict]:
-    """Poll backend for live call status. Only called when call is active."""
-    global call_active
-
-    if not call_active:
-        return "💤 No ongoing call", gr.update(active=False)
-
-    try:
-        resp = requests.get(f"{SERVER_URL}/latest-call-status", headers=HEADERS, timeout=5)
-        data = resp.json()
-        status = data.get("status", "idle").lower()
-        number = data.get("number") or "—"
-
-        emoji_map = {
-            "idle": "💤",
-            "initiated": "📞",
-            "in_progress": "🟡",
-            "completed": "✅",
-            "failed": "❌",
-        }
-        emoji = emoji_map.get(status, "❓")
-
-        # If call is completed or failed, stop polling
-        if status in ["completed", "failed", "idle"]:
-            call_active = False
-            status_text = f"{emoji} Call {status.capitalize()} — {number}"
-            return status_text, gr.update(active=False)
-
-        # Call still in progress
-        status_text = f"{emoji} Call {status.replace('_', ' ').title()} — {number}"
-        return status_text, gr.update(active=True)
-
+            return f"❌ Failed: {resp.status_code}\n{resp.text}"
     except Exception as e:
-        call_active = False
-        return f"⚠️ Error fetching call status: {e}", gr.update(active=False)
-
-
-def refresh_call_status():
-    """Wrapper for timer tick that only updates when call is active."""
-    global call_active
-    if call_active:
-        status, timer_update = get_call_status()
-        return status, timer_update
-    else:
-        return "💤 No ongoing call", gr.update(active=False)
+        return f"⚠️ Error: {e}"
+
+
+def _iter_events(resp: requests.Response):
+    """Parse a server-sent event stream into (event, data) pairs."""
+    event, data = None, []
+    for line in resp.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+        elif not line and event:
+            yield event, json.loads("\n".join(data))
+            event, data = None, []
+
+
+def _render_calls(calls: dict[str, dict]) -> str:
+    if not calls:
+        return "💤 No calls yet"
+    rows = []
+    for call in sorted(calls.values(), key=lambda c: c["updated_at"], reverse=True)[:MAX_CALLS_SHOWN]:
+        status = call["status"]
+        line = f"{STATUS_EMOJI.get(status, '❓')} **{status.replace('_', ' ').title()}** — {call['name']} ({call['number']})"
+        turn = call.get("last_turn")
+        if turn and status == "in_progress":
+            line += f" · last turn {turn['latency_seconds']:.2f}s"
+        rows.append(line)
+    return "\n\n".join(rows)
+
+
+def watch_calls():
+    """
+    Subscribe to the server's /events stream and re-render on every pushed
+    call transition or turn latency (no polling). Reconnects if the stream drops.
+    """
+    calls: dict[str, dict] = {}
+    while True:
+        try:
+            with requests.get(f"{SERVER_URL}/events", headers=HEADERS, stream=True, timeout=(5, 60)) as resp:
+                resp.raise_for_status()
+                for event, data in _iter_events(resp):
+                    if event == "call":
+                        calls[data["call_id"]] = {**calls.get(data["call_id"], {}), **data}
+                    elif event == "turn" and data.get("call_id") in calls:
+                        calls[data["call_id"]]["last_turn"] = data
+                    yield _render_calls(calls)
+        except Exception as e:
+            yield f"{_render_calls(calls)}\n\n⚠️ Live updates interrupted ({e}), reconnecting..."
+            time.sleep(3)
 
 # ==========================
 # UI
@@ -253,18 +251,17 @@ with gr.Blocks(theme=custom_theme, title="Voice Agent Dashboard") as demo:
 
     with gr.Row():
         with gr.Column():
-            call_status_label = gr.Markdown("💤 No ongoing call")
-            gr.Markdown("_Updates automatically during active calls_", elem_classes="text-sm text-gray-500")
+            call_status_label = gr.Markdown("💤 No calls yet")
+            gr.Markdown("_Pushed live from the server as calls change state_", elem_classes="text-sm text-gray-500")
 
-    # Create timers
-    agent_timer = gr.Timer(value=5.0, active=True)  # Always active for agent status
-    call_timer = gr.Timer(value=3.0, active=False)  # Only active during calls
+    # Agent status timer
+    agent_timer = gr.Timer(value=5.0, active=True)
 
-    # Bind call button - returns 3 outputs now
+    # Bind call button
     call_btn.click(
         make_call,
         inputs=[name_in, number_in, gender_in, record_in],
-        outputs=[call_output, call_timer, call_status_label]
+        outputs=[call_output]
     )
 
     # Bind agent status timer (always running)
@@ -273,11 +270,8 @@ with gr.Blocks(theme=custom_theme, title="Voice Agent Dashboard") as demo:
         outputs=[agent_status_label, agent_details]
     )
 
-    # Bind call status timer (only runs when call is active)
-    call_timer.tick(
-        refresh_call_status,
-        outputs=[call_status_label, call_timer]
-    )
+    # Live call status: one event-stream subscription per open page
+    demo.load(watch_calls, outputs=[call_status_label])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from livekit import api, rtc
+from livekit.protocol.room import ListParticipantsRequest
+
+logger = logging.getLogger("call_lifecycle")
+
+# Fallback polling: first check after POLL_INITIAL seconds, doubling up to POLL_MAX
+POLL_INITIAL = 5.0
+POLL_MAX = 60.0
+
+# Calls that ended before anyone waited on them (webhook raced the dialer)
+_RECENTLY_ENDED_MAX = 1000
+
+
+# --------------------------
+#   Lifecycle Tracker
+# --------------------------
+
+class CallLifecycleTracker:
+    """
+    One future per outbound call, resolved when the callee's SIP leg ends.
+
+    Sources, in order of preference:
+      - LiveKit webhooks (participant_left / room_finished), fed by the
+        API server through `handle_webhook`
+      - a hidden, subscribe-less observer in the room (CLI dialers without
+        a webhook endpoint)
+      - list_participants polling with exponential backoff, as a fallback
+    Whichever fires first resolves the call; the others are cancelled.
+    """
+
+    def __init__(self):
+        self._waiters: dict[tuple[str, str], asyncio.Future] = {}
+        self._ended: OrderedDict[tuple[str, str], str] = OrderedDict()
+        # room name -> sid of the room instance the latest call was placed into
+        self._room_sids: OrderedDict[str, str] = OrderedDict()
+        self.webhooks_enabled = False
+        self._webhook_receiver: api.WebhookReceiver | None = None
+
+    def begin(self, room_name: str, room_sid: str = "") -> None:
+        """
+        A new call is being placed into `room_name` (called before dialing).
+        Ends remembered from earlier calls in a reused room name are dropped,
+        and webhooks from other room instances (by sid) are ignored from now on.
+        """
+        for key in [k for k in self._ended if k[0] == room_name]:
+            del self._ended[key]
+        if room_sid:
+            self._room_sids[room_name] = room_sid
+            self._room_sids.move_to_end(room_name)
+            while len(self._room_sids) > _RECENTLY_ENDED_MAX:
+                self._room_sids.popitem(last=False)
+
+    def expect(self, room_name: str, identity: str) -> asyncio.Future:
+        """Future resolving to the end reason of the call (identity in room_name)."""
+        key = (room_name, identity)
+        fut = self._waiters.get(key)
+        if fut is None or fut.done():
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters[key] = fut
+        reason = self._ended.pop(key, None) or self._ended.pop((room_name, ""), None)
+        if reason and not fut.done():
+            fut.set_result(reason)
+        return fut
+
+    def resolve(self, room_name: str, identity: str = "", reason: str = "ended", remember: bool = False) -> None:
+        """
+        Mark a call (or, without identity, every call in the room) as ended.
+        With `remember`, an end nobody waits for yet is kept for a later `expect`.
+        """
+        matched = False
+        for key, fut in list(self._waiters.items()):
+            if key[0] == room_name and (not identity or key[1] == identity):
+                matched = True
+                if not fut.done():
+                    fut.set_result(reason)
+                self._waiters.pop(key, None)
+        if not matched and remember:
+            self._ended[(room_name, identity)] = reason
+            while len(self._ended) > _RECENTLY_ENDED_MAX:
+                self._ended.popitem(last=False)
+
+    # --------------------------
+    #   Webhooks
+    # --------------------------
+
+    def enable_webhooks(self) -> None:
+        """Use LiveKit webhooks as the primary source (API server only)."""
+        verifier = api.TokenVerifier(os.environ["LIVEKIT_API_KEY"], os.environ["LIVEKIT_API_SECRET"])
+        self._webhook_receiver = api.WebhookReceiver(verifier)
+        self.webhooks_enabled = True
+
+    def handle_webhook(self, body: str, auth_header: str) -> None:
+        """Verify a LiveKit webhook and resolve the matching call (raises on a bad signature)."""
+        if self._webhook_receiver is None:
+            raise RuntimeError("Webhooks are not enabled")
+        event = self._webhook_receiver.receive(body, auth_header)
+        current_sid = self._room_sids.get(event.room.name)
+        if current_sid and event.room.sid and event.room.sid != current_sid:
+            logger.debug(f"Ignoring {event.event} from an earlier instance of room {event.room.name}")
+            return
+        if event.event == "participant_left":
+            self.resolve(event.room.name, event.participant.identity, reason="participant_left", remember=True)
+        elif event.event == "room_finished":
+            self.resolve(event.room.name, reason="room_finished", remember=True)
+
+    # --------------------------
+    #   Waiting
+    # --------------------------
+
+    async def wait_for_call_end(self, lkapi: api.LiveKitAPI, room_name: str, identity: str) -> str:
+        """Block until the call ends; returns what ended it."""
+        fut = self.expect(room_name, identity)
+        started = time.monotonic()
+        sources = [asyncio.create_task(self._poll(lkapi, room_name, identity))]
+        if not self.webhooks_enabled:
+            sources.append(asyncio.create_task(self._observe(room_name, identity)))
+        try:
+            reason = await fut
+        finally:
+            for task in sources:
+                task.cancel()
+            await asyncio.gather(*sources, return_exceptions=True)
+            self._waiters.pop((room_name, identity), None)
+        logger.info(f"📴 Call {identity} in {room_name} ended ({reason}) after {time.monotonic() - started:.0f}s")
+        return reason
+
+    async def _observe(self, room_name: str, identity: str) -> None:
+        """Hidden participant that only listens for the callee leaving or the room closing."""
+        token = (
+            api.AccessToken(os.environ["LIVEKIT_API_KEY"], os.environ["LIVEKIT_API_SECRET"])
+            .with_identity(f"observer-{room_name}")
+            .with_grants(api.VideoGrants(
+                room_join=True, room=room_name, hidden=True,
+                can_publish=False, can_subscribe=False, can_publish_data=False,
+            ))
+            .to_jwt()
+        )
+        room = rtc.Room()
+        leaving = False
+
+        @room.on("participant_disconnected")
+        def _on_participant_disconnected(participant: rtc.RemoteParticipant):
+            if participant.identity == identity:
+                self.resolve(room_name, identity, reason="participant_left")
+
+        @room.on("disconnected")
+        def _on_disconnected(*_):
+            if not leaving:
+                self.resolve(room_name, identity, reason="room_closed")
+
+        try:
+            await room.connect(os.environ["LIVEKIT_URL"], token, options=rtc.RoomOptions(auto_subscribe=False))
+            # the callee may already be gone by the time we join
+            if identity not in {p.identity for p in room.remote_participants.values()}:
+                self.resolve(room_name, identity, reason="participant_left")
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Room observer for {room_name} failed, relying on polling: {e}")
+        finally:
+            leaving = True
+            await room.disconnect()
+
+    async def _poll(self, lkapi: api.LiveKitAPI, room_name: str, identity: str) -> None:
+        """Fallback: list_participants with exponential backoff."""
+        delay = POLL_INITIAL
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                resp = await lkapi.room.list_participants(ListParticipantsRequest(room=room_name))
+                if identity not in {p.identity for p in resp.participants}:
+                    self.resolve(room_name, identity, reason="poll")
+                    return
+            except api.TwirpError as e:
+                if e.code == "not_found":
+                    self.resolve(room_name, identity, reason="room_not_found")
+                    return
+                logger.warning(f"⚠️ Polling {room_name} failed: {e}")
+            delay = min(delay * 2, POLL_MAX)
+
+
+# Process-wide tracker shared by all dialers and the API server
+CALL_TRACKER = CallLifecycleTracker()
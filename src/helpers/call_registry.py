@@ -0,0 +1,134 @@
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+
+# Call lifecycle as seen by the API server
+CALL_TRANSITIONS = {
+    "initiated": ("dialing", "failed"),
+    "dialing": ("in_progress", "failed"),
+    "in_progress": ("completed", "failed"),
+    "completed": (),
+    "failed": (),
+}
+ACTIVE_STATES = ("dialing", "in_progress")
+FINAL_STATES = ("completed", "failed")
+
+MAX_RECORDS = 10_000    # finished calls beyond this are forgotten, oldest first
+
+
+@dataclass
+class CallRecord:
+    call_id: str
+    number: str
+    name: str
+    gender: str = "male"
+    room_name: str = ""
+    record: bool = False
+    batch_id: str | None = None
+    worker_id: str | None = None
+    status: str = "initiated"
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    history: list[dict] = field(default_factory=list)
+    result: dict | None = None
+    error: str | None = None
+    last_turn: dict | None = None    # latest per-turn latency reported by the agent
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class CallRegistry:
+    """
+    In-memory status of every call the API server places, keyed by call ID.
+
+    Transitions are validated against CALL_TRANSITIONS and timestamped;
+    listeners are called with the updated record on every change.
+    """
+
+    def __init__(self, max_records: int = MAX_RECORDS, clock: Callable[[], float] = time.time):
+        self.max_records = max_records
+        self._clock = clock
+        self._calls: OrderedDict[str, CallRecord] = OrderedDict()
+        self._listeners: list[Callable[[CallRecord], None]] = []
+
+    def add_listener(self, listener: Callable[[CallRecord], None]) -> None:
+        self._listeners.append(listener)
+
+    def _notify(self, call: CallRecord) -> None:
+        for listener in self._listeners:
+            listener(call)
+
+    def create(self, number: str, name: str, batch_id: str | None = None, **fields) -> CallRecord:
+        now = self._clock()
+        call = CallRecord(
+            call_id=uuid.uuid4().hex[:12],
+            number=number,
+            name=name,
+            batch_id=batch_id,
+            created_at=now,
+            updated_at=now,
+            history=[{"status": "initiated", "at": now}],
+            **fields,
+        )
+        self._calls[call.call_id] = call
+        self._evict()
+        self._notify(call)
+        return call
+
+    def transition(self, call_id: str, status: str, result: dict | None = None, error: str | None = None) -> CallRecord:
+        call = self._calls[call_id]
+        if status not in CALL_TRANSITIONS[call.status]:
+            raise ValueError(f"Call {call_id}: invalid transition {call.status} -> {status}")
+        call.status = status
+        call.updated_at = self._clock()
+        call.history.append({"status": status, "at": call.updated_at})
+        if result is not None:
+            call.result = result
+        if error is not None:
+            call.error = error
+        self._notify(call)
+        return call
+
+    def get(self, call_id: str) -> CallRecord | None:
+        return self._calls.get(call_id)
+
+    def find_by_room(self, room_name: str) -> CallRecord | None:
+        """Newest call placed into `room_name`."""
+        for call in reversed(self._calls.values()):
+            if call.room_name == room_name:
+                return call
+        return None
+
+    def latest(self) -> CallRecord | None:
+        """Most recently updated call."""
+        return max(self._calls.values(), key=lambda c: c.updated_at, default=None)
+
+    def active_count(self) -> int:
+        return sum(c.status in ACTIVE_STATES for c in self._calls.values())
+
+    def list(
+        self,
+        status: str | None = None,
+        batch_id: str | None = None,
+        number: str | None = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> tuple[list[CallRecord], int]:
+        """Newest first, filtered; returns (page, total matching)."""
+        matches = [
+            c for c in reversed(self._calls.values())
+            if (status is None or c.status == status)
+            and (batch_id is None or c.batch_id == batch_id)
+            and (number is None or c.number == number)
+        ]
+        return matches[offset:offset + limit], len(matches)
+
+    def _evict(self) -> None:
+        excess = len(self._calls) - self.max_records
+        if excess <= 0:
+            return
+        for call_id in [cid for cid, c in self._calls.items() if c.status in FINAL_STATES][:excess]:
+            del self._calls[call_id]
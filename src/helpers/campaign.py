@@ -0,0 +1,202 @@
+import asyncio
+import csv
+import hashlib
+import logging
+import re
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from contextlib import closing
+from pathlib import Path
+
+from helpers.config import CAMPAIGN_DIR
+from helpers.customer_helper import CustomerProfileType
+
+logger = logging.getLogger("campaign")
+
+# Row outcomes that are not dialed again when a campaign is resumed
+# ("in_flight" rows were interrupted by a crash and are retried)
+FINAL_OUTCOMES = ("answered", "not_connected", "error", "invalid")
+
+_PROFILE_DEFAULTS = {"age": 0, "city": "", "language": "hindi", "bank_name": "HDFC", "gender": ""}
+
+
+# --------------------------
+#   Lead Sources
+# --------------------------
+
+def _to_profile(row: dict, index: int) -> CustomerProfileType:
+    profile = {**_PROFILE_DEFAULTS, **{k: v for k, v in row.items() if v not in (None, "")}}
+    profile["customer_id"] = str(profile.get("customer_id") or f"cust_{index}")
+    profile["customer_name"] = str(profile.get("customer_name", "")).strip()
+    profile["phone_number"] = str(profile.get("phone_number", "")).strip()
+    try:
+        profile["age"] = int(profile["age"])
+    except (TypeError, ValueError):
+        profile["age"] = 0
+    return profile
+
+
+def iter_customers_csv(path: Path) -> Iterator[CustomerProfileType]:
+    """Stream profiles from a CSV with a header row (at least `phone_number`)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for index, row in enumerate(csv.DictReader(f)):
+            yield _to_profile(row, index)
+
+
+def iter_customers_sqlite(path: Path, table: str = "customers") -> Iterator[CustomerProfileType]:
+    """Stream profiles from a SQLite table, one row at a time (ordered by rowid)."""
+    if not re.fullmatch(r"\w+", table):
+        raise ValueError(f"Invalid table name: {table!r}")
+    with closing(sqlite3.connect(path)) as conn:
+        conn.row_factory = sqlite3.Row
+        for index, row in enumerate(conn.execute(f"SELECT * FROM {table} ORDER BY rowid")):
+            yield _to_profile(dict(row), index)
+
+
+def iter_customers(source: Path, table: str = "customers") -> Iterator[CustomerProfileType]:
+    """CSV or SQLite lead file, by extension."""
+    source = Path(source)
+    if source.suffix.lower() == ".csv":
+        return iter_customers_csv(source)
+    return iter_customers_sqlite(source, table)
+
+
+# --------------------------
+#   Checkpoint
+# --------------------------
+
+def _fingerprint(path: Path) -> str:
+    """Content hash of a lead file, so an edited file gets a fresh checkpoint."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+class CampaignCheckpoint:
+    """
+    Per-row progress and outcomes of one campaign in a SQLite file, keyed by
+    the row's position in the lead source so a rerun resumes where it stopped.
+    A row is only skipped if the stored customer_id and phone_number still match.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS outcomes (
+                    row_index INTEGER PRIMARY KEY,
+                    customer_id TEXT NOT NULL,
+                    phone_number TEXT NOT NULL,
+                    outcome TEXT NOT NULL,
+                    detail TEXT,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    @classmethod
+    def for_source(cls, source: Path) -> "CampaignCheckpoint":
+        """Checkpoint for this exact lead file: its resolved path and its content."""
+        source = Path(source).resolve()
+        path_key = hashlib.sha256(str(source).encode("utf-8")).hexdigest()[:8]
+        return cls(CAMPAIGN_DIR / f"{source.stem}-{path_key}-{_fingerprint(source)}.db")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def is_done(self, row_index: int, customer: CustomerProfileType) -> bool:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT outcome, customer_id, phone_number FROM outcomes WHERE row_index = ?", (row_index,)
+            ).fetchone()
+        if row is None or row[0] not in FINAL_OUTCOMES:
+            return False
+        if (row[1], row[2]) != (customer["customer_id"], customer["phone_number"]):
+            logger.warning(f"⚠️ Campaign row {row_index} changed since it was checkpointed, dialing it again")
+            return False
+        return True
+
+    def record(self, row_index: int, customer: CustomerProfileType, outcome: str, detail: str | None = None) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO outcomes (row_index, customer_id, phone_number, outcome, detail, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (row_index, customer["customer_id"], customer["phone_number"], outcome, detail, time.time()),
+            )
+
+    def counts(self) -> dict[str, int]:
+        with closing(self._connect()) as conn:
+            return dict(conn.execute("SELECT outcome, COUNT(*) FROM outcomes GROUP BY outcome").fetchall())
+
+
+# --------------------------
+#   Runner
+# --------------------------
+
+async def run_campaign(
+    customers: Iterable[CustomerProfileType],
+    dial: Callable[[CustomerProfileType], Awaitable[str]],
+    max_in_flight: int = 4,
+    checkpoint: CampaignCheckpoint | None = None,
+) -> dict[str, int]:
+    """
+    Dial every customer with at most `max_in_flight` calls running.
+
+    Rows are pulled lazily through a bounded queue, so memory stays flat for
+    any lead file size. `dial` returns the row's outcome ("answered" or
+    "not_connected"); exceptions are recorded as "error". With a
+    checkpoint, finished rows are skipped and every outcome is persisted.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_in_flight)
+    totals: dict[str, int] = {}
+
+    def count(outcome: str) -> None:
+        totals[outcome] = totals.get(outcome, 0) + 1
+
+    async def produce():
+        for index, customer in enumerate(customers):
+            if checkpoint and await asyncio.to_thread(checkpoint.is_done, index, customer):
+                count("skipped")
+                continue
+            if not customer["phone_number"]:
+                count("invalid")
+                if checkpoint:
+                    await asyncio.to_thread(checkpoint.record, index, customer, "invalid", "missing phone_number")
+                continue
+            await queue.put((index, customer))
+        for _ in range(max_in_flight):
+            await queue.put(None)
+
+    async def work():
+        while (item := await queue.get()) is not None:
+            index, customer = item
+            detail = None
+            if checkpoint:
+                await asyncio.to_thread(checkpoint.record, index, customer, "in_flight")
+            try:
+                outcome = await dial(customer)
+            except Exception as e:
+                logger.error(f"❌ Campaign row {index} ({customer['phone_number']}) failed: {e}", exc_info=True)
+                outcome, detail = "error", str(e)
+            count(outcome)
+            if checkpoint:
+                await asyncio.to_thread(checkpoint.record, index, customer, outcome, detail)
+
+    tasks = [asyncio.create_task(produce()), *(asyncio.create_task(work()) for _ in range(max_in_flight))]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # a failing lead source (or cancellation) stops the dialing workers too;
+        # their rows stay "in_flight" and are retried on resume
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    logger.info(f"📊 Campaign finished: {totals}")
+    return totals
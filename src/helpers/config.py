@@ -1,8 +1,7 @@
+import os
 from datetime import timedelta, timezone
 from pathlib import Path
 
-from helpers.customer_helper import load_customer_profile
-
 #TTS_PROVIDER = "cartesia"
 TTS_PROVIDER = "sarvam_anushka"
 #TTS_PROVIDER = "sarvam_manisha"
@@ -24,14 +23,77 @@ LOG_PATH.mkdir(exist_ok=True)
 # Define IST timezone (+5:30 from UTC)
 IST = timezone(timedelta(hours=5, minutes=30))
 
-# Unique session ID for tracking each run
-customer_profile = load_customer_profile()
-SESSION_ID = customer_profile['phone_number']
+# Sections of the structured per-session log (see helpers/session_context.py)
+SESSION_LOG_SECTIONS = (
+    "transcript", "stt", "llm", "tts", "eou", "conversation"
+)
+
+COST_PATH = Path("src/costs")
+
+# On-disk TTS audio cache for recurring agent phrases
+TTS_CACHE_PATH = BASE_DIR.parent / "tts_cache"
+TTS_CACHE_MAX_BYTES = 256 * 1024 * 1024   # total size before LRU eviction
+TTS_CACHE_MAX_CHARS = 300                 # longer segments are not worth caching
+TTS_CACHE_PHRASE_CHARS = 80               # leading phrase of a turn looked up in the cache
+
+# Thinking sounds: backchannel clip played when the reply is slow to start
+THINKING_SOUND_THRESHOLD = 0.9   # seconds after end-of-utterance with no TTS audio
+THINKING_SOUND_VOLUME = 0.8
+
+# Prometheus metrics: job processes spill snapshots here, the worker serves them
+METRICS_DIR = BASE_DIR.parent / "metrics"
+METRICS_PORT = int(os.getenv("VOICE_AGENT_METRICS_PORT", "9464"))
+
+# Post-call pipeline (summary, persistence, upload, evaluation) run off the call path
+POST_CALL_DB_PATH = BASE_DIR.parent / "post_call" / "queue.db"
+POST_CALL_OUTPUT_PATH = BASE_DIR.parent / "temp"       # summary JSON files read by the dialer
+POST_CALL_CONCURRENCY = 2       # jobs processed in parallel by the worker pool
+POST_CALL_MAX_ATTEMPTS = 5      # per job, with exponential backoff between attempts
+POST_CALL_MAX_PENDING = 50      # dialers stop placing new calls above this backlog
+POST_CALL_GCP_BUCKET = os.getenv("GCP_BUCKET")          # upload step is skipped when unset
+POST_CALL_EVALUATION = os.getenv("POST_CALL_EVALUATION", "0") == "1"
+
+# Shared LiveKit server API client (helpers/livekit_client.py)
+LIVEKIT_HTTP_POOL_SIZE = 100     # concurrent HTTP connections to the LiveKit API
+LIVEKIT_HTTP_KEEPALIVE = 60.0    # seconds an idle connection stays open for reuse
 
-# Dictionary to hold structured logs for this session
-SESSION_LOGS = {
-    "metadata": {}, "transcript": [], "stt": [],
-    "llm": [], "tts": [], "eou": [], "conversation": []
+# SIP trunk IDs are resolved once and cached (helpers/sip_trunks.py)
+SIP_TRUNK_CACHE_TTL = 600.0      # seconds before a cached trunk ID is re-checked
+
+# Per-carrier capacity for the dialer's trunk pool (helpers/trunk_pool.py)
+SIP_TRUNK_LIMITS = {
+    "tata": {"max_channels": 10, "max_cps": 1.0},
+    "twilio": {"max_channels": 20, "max_cps": 1.0},
 }
 
-COST_PATH = Path("src/costs")
+# Campaign dialer: per-campaign checkpoint databases (helpers/campaign.py)
+CAMPAIGN_DIR = BASE_DIR.parent / "campaigns"
+
+# Outbound dial pacing shared by the dialers and the API server (helpers/dial_pacer.py)
+DIAL_CPS = 1.0                   # calls per second ceiling across all trunks
+DIAL_MIN_CONCURRENCY = 1
+DIAL_MAX_CONCURRENCY = 30        # AIMD never grows past this many calls in progress
+DIAL_INITIAL_CONCURRENCY = 4
+DIAL_ANSWER_RATE_FLOOR = 0.1     # back off when fewer recent dials are answered
+DIAL_LOAD_HIGH = 0.85            # back off when agent workers are this busy
+
+# Agent worker job acceptance (helpers/worker_load.py); calibrate with src/bench_load.py
+AGENT_SESSIONS_PER_CORE = float(os.getenv("AGENT_SESSIONS_PER_CORE", "2.0"))
+AGENT_SESSION_CAPACITY = int(os.getenv("AGENT_SESSION_CAPACITY", "0")) or max(1, int(AGENT_SESSIONS_PER_CORE * (os.cpu_count() or 1)))
+AGENT_LOAD_THRESHOLD = float(os.getenv("AGENT_LOAD_THRESHOLD", "0.75"))   # stop taking jobs above this load score
+LOOP_LAG_BUDGET = 0.1            # seconds of event-loop lag in a job that counts as full load
+
+# Control server (server.py) that agent processes report to; empty disables reporting
+CONTROL_SERVER_URL = os.getenv("VOICE_AGENT_SERVER", "http://127.0.0.1:8000")
+CONTROL_API_KEY = os.getenv("VOICE_AGENT_API_KEY", "supersecret123")
+
+# Agent worker heartbeats to the control server (helpers/heartbeat.py)
+AGENT_NAME = os.getenv("AGENT_NAME", "")   # set per worker to enable explicit, least-loaded dispatch
+HEARTBEAT_INTERVAL = 5.0         # seconds between worker heartbeats
+WORKER_STALE_AFTER = 15.0        # a worker without a heartbeat this long is considered gone
+
+# Prewarmed idle job processes per worker, sized from dialer demand (helpers/dial_demand.py)
+IDLE_PROCESSES_MIN = 1
+IDLE_PROCESSES_MAX = 8
+PROCESS_WARMUP_SECONDS = 6.0     # process start + prewarm; dials in this window need a warm process
+DIAL_DEMAND_WINDOW = 60.0        # seconds of recent dials used for the arrival rate
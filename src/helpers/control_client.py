@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from helpers.config import CONTROL_API_KEY, CONTROL_SERVER_URL
+
+logger = logging.getLogger("control_client")
+
+
+class ControlClient:
+    """
+    Fire-and-forget reports from agent processes to the control server
+    (server.py). Never blocks or fails the call: after an error, reports are
+    dropped for `backoff` seconds instead of retried.
+    """
+
+    def __init__(self, base_url: str = CONTROL_SERVER_URL, api_key: str = CONTROL_API_KEY, timeout: float = 2.0, backoff: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.backoff = backoff
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._suspended_until = 0.0
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.base_url)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                headers={"X-API-Key": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._loop = loop
+        return self._session
+
+    async def post(self, path: str, payload: dict) -> dict | None:
+        """The server's JSON reply, or None if the report was not delivered."""
+        if not self.enabled or time.monotonic() < self._suspended_until:
+            return None
+        try:
+            async with self._get_session().post(f"{self.base_url}{path}", json=payload) as resp:
+                resp.raise_for_status()
+                return await resp.json(content_type=None) or {}
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self._suspended_until = time.monotonic() + self.backoff
+            logger.debug(f"Control server unreachable ({e}), pausing reports for {self.backoff:.0f}s")
+            return None
+
+    def post_nowait(self, path: str, payload: dict) -> None:
+        """Schedule a report on the running loop without awaiting it."""
+        if not self.enabled or time.monotonic() < self._suspended_until:
+            return
+        task = asyncio.get_running_loop().create_task(self.post(path, payload))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def aclose(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+CONTROL = ControlClient()
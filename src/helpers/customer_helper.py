@@ -47,6 +47,25 @@ def save_customer_profile(profile: CustomerProfileType, file_path=CUSTOMER_FILE)
         json.dump(profile, f, indent=2)
     print(f"💾 Customer profile saved to {file_path}")
 
+# --------------------------
+# Job metadata (dialer → agent)
+# --------------------------
+def encode_customer_profile(profile: CustomerProfileType) -> str:
+    """Serialize a profile for LiveKit room/participant/dispatch metadata."""
+    return json.dumps(profile, ensure_ascii=False)
+
+def decode_customer_profile(raw: str | None) -> CustomerProfileType | None:
+    """Parse a profile from LiveKit metadata; None if missing or not a profile."""
+    if not raw:
+        return None
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict) or "phone_number" not in data:
+        return None
+    return data
+
 # --------------------------
 # Interactive updates
 # --------------------------
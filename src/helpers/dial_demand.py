@@ -0,0 +1,69 @@
+import math
+import time
+from collections import deque
+from collections.abc import Callable
+
+from helpers.config import (
+    DIAL_DEMAND_WINDOW,
+    IDLE_PROCESSES_MAX,
+    IDLE_PROCESSES_MIN,
+    PROCESS_WARMUP_SECONDS,
+    WORKER_STALE_AFTER,
+)
+
+
+class DialerDemand:
+    """
+    Outbound demand seen by the control server, used to size the agent
+    workers' pools of prewarmed idle job processes.
+
+    Every dialer (the API server itself, CLI campaign runs) reports its
+    pending calls and a running count of dials. Warm processes needed =
+    pending calls + calls expected to arrive while a new process warms up.
+    """
+
+    def __init__(
+        self,
+        window: float = DIAL_DEMAND_WINDOW,
+        stale_after: float = WORKER_STALE_AFTER,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.window = window
+        self.stale_after = stale_after
+        self._clock = clock
+        self._pending: dict[str, tuple[int, float]] = {}    # dialer -> (pending, reported at)
+        self._dialed: dict[str, int] = {}
+        self._arrivals: deque[tuple[float, int]] = deque()
+
+    def report(self, dialer_id: str, pending: int, dialed: int) -> None:
+        """`dialed` is the dialer's running total; a drop means it restarted."""
+        now = self._clock()
+        previous = self._dialed.get(dialer_id, dialed)
+        new = dialed - previous if dialed >= previous else dialed
+        if new:
+            self._arrivals.append((now, new))
+        self._dialed[dialer_id] = dialed
+        self._pending[dialer_id] = (pending, now)
+
+    def pending(self) -> int:
+        cutoff = self._clock() - self.stale_after
+        for dialer_id in [d for d, (_, at) in self._pending.items() if at < cutoff]:
+            del self._pending[dialer_id]
+            self._dialed.pop(dialer_id, None)
+        return sum(p for p, _ in self._pending.values())
+
+    def rate(self) -> float:
+        """Dials per second over the last `window` seconds."""
+        cutoff = self._clock() - self.window
+        while self._arrivals and self._arrivals[0][0] < cutoff:
+            self._arrivals.popleft()
+        return sum(n for _, n in self._arrivals) / self.window
+
+    def idle_target(self, workers: int) -> int:
+        """Prewarmed idle processes each of `workers` should keep."""
+        demand = self.pending() + self.rate() * PROCESS_WARMUP_SECONDS
+        per_worker = math.ceil(demand / max(1, workers))
+        return min(IDLE_PROCESSES_MAX, max(IDLE_PROCESSES_MIN, per_worker))
+
+    def stats(self) -> dict:
+        return {"pending": self.pending(), "rate": round(self.rate(), 3)}
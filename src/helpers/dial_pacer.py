@@ -0,0 +1,189 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+
+from helpers.config import (
+    DIAL_ANSWER_RATE_FLOOR,
+    DIAL_CPS,
+    DIAL_INITIAL_CONCURRENCY,
+    DIAL_LOAD_HIGH,
+    DIAL_MAX_CONCURRENCY,
+    DIAL_MIN_CONCURRENCY,
+)
+
+logger = logging.getLogger("dial_pacer")
+
+DECREASE_FACTOR = 0.5
+DECREASE_COOLDOWN = 10.0     # seconds; one back-off per congestion episode
+OUTCOME_WINDOW = 50          # recent dial outcomes used for the answer rate
+MIN_ANSWER_SAMPLES = 20
+LOAD_PROBE_INTERVAL = 5.0    # seconds between worker-load probes
+
+
+# --------------------------
+#   Token Bucket
+# --------------------------
+
+class TokenBucket:
+    """Calls-per-second limiter; `rate` can be changed on the fly."""
+
+    def __init__(self, rate: float, burst: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self) -> float:
+        """Take a token; returns 0, or the seconds to wait before one is available."""
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        async with self._lock:  # FIFO: waiters are served in arrival order
+            while (wait := self.try_take()) > 0:
+                await asyncio.sleep(wait)
+
+
+# --------------------------
+#   AIMD Pacer
+# --------------------------
+
+class DialPacer:
+    """
+    Dial admission for every outbound path: a token bucket caps calls per
+    second and an AIMD limit caps calls in progress.
+
+    Answered calls grow the limit (and the dial rate, up to `max_cps`)
+    additively; trunk/SIP failures, a collapsing answer rate or high worker
+    load cut both multiplicatively, at most once per DECREASE_COOLDOWN.
+    """
+
+    def __init__(
+        self,
+        max_cps: float = DIAL_CPS,
+        min_concurrency: int = DIAL_MIN_CONCURRENCY,
+        max_concurrency: int = DIAL_MAX_CONCURRENCY,
+        initial_concurrency: int = DIAL_INITIAL_CONCURRENCY,
+        load_probe: Callable[[], float | None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_cps = max_cps
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.limit = float(initial_concurrency)
+        self.in_flight = 0
+        self.waiting = 0     # calls queued for admission
+        self.dialed = 0      # running total, reported as dialer demand
+        self.bucket = TokenBucket(max_cps, clock=clock)
+        self.load_probe = load_probe
+        self._clock = clock
+        self._outcomes: deque[str] = deque(maxlen=OUTCOME_WINDOW)
+        self._last_decrease = float("-inf")
+        self._last_probe = float("-inf")
+        self._changed = asyncio.Condition()
+        self._wake_tasks: set[asyncio.Task] = set()
+
+    def saturated(self) -> bool:
+        return self.in_flight >= int(self.limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Admit one call (dial through hangup) once concurrency and CPS allow it."""
+        await self._probe_load()
+        self.waiting += 1
+        try:
+            async with self._changed:
+                await self._changed.wait_for(lambda: not self.saturated())
+                self.in_flight += 1
+        finally:
+            self.waiting -= 1
+        try:
+            await self.bucket.acquire()
+            self.dialed += 1
+            yield
+        finally:
+            async with self._changed:
+                self.in_flight -= 1
+                self._changed.notify_all()
+
+    # --------------------------
+    #   Feedback
+    # --------------------------
+
+    def record(self, outcome: str) -> None:
+        """Dial outcome: "answered", "no_answer" (neutral) or "failed"."""
+        self._outcomes.append(outcome)
+        if outcome == "answered":
+            self._increase()
+        elif outcome == "failed":
+            self._decrease("SIP/trunk error")
+        rate = self.answer_rate()
+        if rate is not None and rate < DIAL_ANSWER_RATE_FLOOR:
+            self._decrease(f"answer rate {rate:.0%}")
+
+    def observe_load(self, load: float | None) -> None:
+        """Worker load as a fraction of capacity (1.0 = full)."""
+        if load is not None and load > DIAL_LOAD_HIGH:
+            self._decrease(f"worker load {load:.0%}")
+
+    def answer_rate(self) -> float | None:
+        if len(self._outcomes) < MIN_ANSWER_SAMPLES:
+            return None
+        return sum(o == "answered" for o in self._outcomes) / len(self._outcomes)
+
+    def _increase(self) -> None:
+        self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+        self.bucket.rate = min(self.max_cps, self.bucket.rate + self.max_cps / 20)
+        self._notify()
+
+    def _decrease(self, reason: str) -> None:
+        now = self._clock()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_concurrency, self.limit * DECREASE_FACTOR)
+        self.bucket.rate = max(self.max_cps / 10, self.bucket.rate * DECREASE_FACTOR)
+        logger.warning(f"🐢 Backing off dialing ({reason}): limit {self.limit:.1f} calls, {self.bucket.rate:.2f} cps")
+
+    def _notify(self) -> None:
+        # a raised limit may admit waiters; wake them without blocking the caller
+        async def _wake():
+            async with self._changed:
+                self._changed.notify_all()
+
+        with contextlib.suppress(RuntimeError):
+            task = asyncio.get_running_loop().create_task(_wake())
+            self._wake_tasks.add(task)
+            task.add_done_callback(self._wake_tasks.discard)
+
+    async def _probe_load(self) -> None:
+        if self.load_probe is None or self._clock() - self._last_probe < LOAD_PROBE_INTERVAL:
+            return
+        self._last_probe = self._clock()
+        try:
+            self.observe_load(await asyncio.to_thread(self.load_probe))
+        except Exception as e:
+            logger.debug(f"Worker load probe failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "cps": round(self.bucket.rate, 3),
+            "answer_rate": self.answer_rate(),
+        }
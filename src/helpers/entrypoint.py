@@ -2,6 +2,7 @@ import asyncio
 
 # import json
 import logging
+import time
 
 from dotenv import load_dotenv
 from langfuse import get_client
@@ -12,44 +13,71 @@ from livekit.agents import (
 from livekit.plugins import noise_cancellation
 
 from class_mod.assistant import MyAssistant
+from class_mod.assistant_helpers import track_call_state
+from class_mod.greeting import PreRenderedGreeting, build_greeting_text
+from class_mod.thinking_sounds import ThinkingSoundPlayer
+from class_mod.tts_utils import get_pronunciation_rewriter
 from helpers.config import (
     LLM_PROVIDER,
-    SESSION_ID,
-    # SESSION_LOGS,
     STT_PROVIDER,
     TTS_PROVIDER,
 )
-
-# Import customer functions
-# from helpers.customer_helper import load_customer_profile
-# from helpers.log_usage import log_usage
-# from helpers.metrics import setup_metrics
-from helpers.setup_session import setup_session
+from helpers.control_client import CONTROL
+from helpers.heartbeat import worker_id
+from helpers.log_usage import log_usage
+from helpers.metrics import setup_metrics
+from helpers.metrics_registry import REGISTRY
+from helpers.session_context import SessionContext
+from helpers.setup_session import setup_session, warm_up_session
 from helpers.setup_tts_stt import setup_llm, setup_stt, setup_tts
+from helpers.worker_load import monitor_loop_lag
 
 tracker = get_client()
 
 logger = logging.getLogger("agent")
 load_dotenv(".env.local")  # Load environment variables
 
-# customer_profile = load_customer_profile()
-room_name_str = f"{SESSION_ID}"
-
 async def entrypoint(ctx: JobContext):
     """
     Main entrypoint for the assistant.
-    - Loads customer profile via load_customer.py
-    - Optionally updates name, gender, phone interactively based on user input
+    - Builds a per-job SessionContext (customer profile, session ID, log buffer)
     - Sets up session, metrics, and starts assistant
     """
     try:
         logging.basicConfig(level=logging.DEBUG)
+
+        # Per-job state: nothing customer-specific lives at module level
+        session_ctx = SessionContext.from_job(ctx)
+        logger.info(f"Session context created: {session_ctx.session_id}")
+
+        # Live session gauge for the worker's /metrics endpoint and heartbeats,
+        # tagged with the worker that owns this job process
+        session_labels = {"worker": worker_id(), "room": ctx.job.room.name}
+        REGISTRY.add_gauge("voice_agent_active_sessions", 1, **session_labels)
+        REGISTRY.inc("voice_agent_sessions_total")
+        REGISTRY.flush(force=True)
+
+        async def _end_session_gauge():
+            REGISTRY.add_gauge("voice_agent_active_sessions", -1, **session_labels)
+            REGISTRY.flush(force=True)
+
+        ctx.add_shutdown_callback(_end_session_gauge)
+
+        # Event-loop lag of this job, read by the worker's load function
+        lag_monitor = asyncio.create_task(monitor_loop_lag())
+
+        async def _stop_lag_monitor():
+            lag_monitor.cancel()
+
+        ctx.add_shutdown_callback(_stop_lag_monitor)
+
         # Store profile metadata into the job for tracking
         # ctx.job.metadata = json.dumps(customer_profile)
         # metadata = json.loads(ctx.job.metadata)
         # logger.info(f"User profile loaded: {metadata}")
 
-        # Setup session with STT, TTS, LLM
+        # Setup session with STT, TTS, LLM (built in prewarm, so this is near-zero)
+        setup_started = time.perf_counter()
         session = setup_session(
             ctx,
             setup_llm,
@@ -59,36 +87,50 @@ async def entrypoint(ctx: JobContext):
             STT_PROVIDER,
             TTS_PROVIDER
         )
+        logger.info(f"⏱️ Session setup took {(time.perf_counter() - setup_started) * 1000:.0f}ms")
 
-        # Setup usage metrics
-        #usage_collector, cost_calc = setup_metrics(session, SESSION_LOGS)
-
-        # Shutdown callback to log usage
-        # ctx.add_shutdown_callback(
-        #     lambda: log_usage(
-        #         usage_collector=usage_collector,
-        #         cost_calc=cost_calc,
-        #         SESSION_LOGS=SESSION_LOGS,
-        #         SESSION_ID=SESSION_ID,
-        #         customer_profile=customer_profile,
-        #         TTS_PROVIDER=TTS_PROVIDER,
-        #         STT_PROVIDER=STT_PROVIDER,
-        #         LLM_PROVIDER=LLM_PROVIDER
-        #     )
-        # )
+        # Setup usage metrics before session.start so the first turn is captured
+        setup_metrics(session, session_ctx)
+
+        # Shutdown callback: flush usage, cost and latency to the session log
+        async def _log_usage():
+            await log_usage(session_ctx)
+
+        ctx.add_shutdown_callback(_log_usage)
+        # Close the connection used for live turn reports to the control server
+        ctx.add_shutdown_callback(CONTROL.aclose)
+
+        # Extract summary fields turn by turn so the summary is ready at hangup
+        track_call_state(session, session_ctx.call_state)
+
+        # Render the greeting while the callee's phone is still ringing
+        greeting = PreRenderedGreeting(build_greeting_text(session_ctx.customer_profile))
+        greeting.start(session.tts, get_pronunciation_rewriter(session_ctx.tts_provider))
+        ctx.add_shutdown_callback(greeting.aclose)
+
+        # Backchannel clips ("अच्छा जी", "हम्म") that mask slow replies
+        thinking_sounds = ThinkingSoundPlayer(session_ctx, ctx.proc.userdata.setdefault("thinking_clips", {}))
 
         # Create assistant
-        #assistant = MyAssistant(customer_profile, session=session)
-        assistant = MyAssistant(session=session)
-        # Connect to LiveKit room
-        await ctx.connect()
+        assistant = MyAssistant(
+            session=session,
+            session_ctx=session_ctx,
+            greeting=greeting,
+            thinking_sounds=thinking_sounds,
+        )
+        # Connect to LiveKit room; provider connections and the turn detector warm up meanwhile
+        await asyncio.gather(ctx.connect(), warm_up_session(session))
 
         # Start session with assistant and noise cancellation
         await session.start(
             agent=assistant,
             room=ctx.room,
-            room_input_options=RoomInputOptions(noise_cancellation=noise_cancellation.BVC()),
+            room_input_options=RoomInputOptions(
+                noise_cancellation=ctx.proc.userdata.get("noise_cancellation") or noise_cancellation.BVC()
+            ),
         )
+        await thinking_sounds.start(ctx.room, session, session.tts)
+        ctx.add_shutdown_callback(thinking_sounds.aclose)
 
         await asyncio.sleep(3)
 
@@ -0,0 +1,48 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+# Comment line sent when nothing happened, so proxies keep the stream open
+KEEPALIVE_SECONDS = 15.0
+
+
+def format_sse(event: str, data: dict) -> str:
+    """One server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class EventBroadcaster:
+    """
+    Fan-out of server events to SSE subscribers. Each subscriber has a bounded
+    queue; a slow client loses its oldest events instead of slowing others.
+    """
+
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._subscribers: set[asyncio.Queue] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: str, data: dict) -> None:
+        message = format_sse(event, data)
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def stream(self, initial: list[str] | None = None) -> AsyncIterator[str]:
+        """Subscribe until the client disconnects; `initial` messages are sent first."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers.add(queue)
+        try:
+            for message in initial or []:
+                yield message
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self._subscribers.discard(queue)
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import os
+import socket
+import threading
+from collections.abc import Callable
+
+from helpers.config import AGENT_NAME, AGENT_SESSION_CAPACITY, HEARTBEAT_INTERVAL
+from helpers.control_client import ControlClient
+from helpers.metrics_registry import collect_snapshots, gauge_values
+
+logger = logging.getLogger("heartbeat")
+
+
+def worker_id() -> str:
+    """
+    ID of the agent worker this process belongs to. Set in the worker's
+    environment so its job processes inherit it and tag their sessions.
+    """
+    return os.environ.setdefault("VOICE_AGENT_WORKER_ID", f"{socket.gethostname()}-{os.getpid()}")
+
+
+def heartbeat_payload() -> dict:
+    """
+    Liveness, capacity and live sessions of this worker. Job processes report
+    sessions via metrics snapshots; only those tagged with this worker count,
+    other workers on the same host report their own.
+    """
+    own_id = worker_id()
+    rooms = [
+        labels.get("room", "")
+        for labels, value in gauge_values(collect_snapshots(), "voice_agent_active_sessions")
+        if value > 0 and labels.get("worker") == own_id
+    ]
+    return {
+        "worker_id": own_id,
+        "host": socket.gethostname(),
+        "pid": os.getpid(),
+        "agent_name": AGENT_NAME,
+        "capacity": AGENT_SESSION_CAPACITY,
+        "active_sessions": len(rooms),
+        "rooms": rooms,
+    }
+
+
+async def _heartbeat_loop(interval: float, on_idle_target: Callable[[int], None] | None) -> None:
+    client = ControlClient(backoff=interval)
+    idle_target = None
+    while True:
+        try:
+            payload = await asyncio.to_thread(heartbeat_payload)
+            reply = await client.post("/workers/heartbeat", payload)
+            if reply and on_idle_target and reply.get("idle_processes", idle_target) != idle_target:
+                idle_target = int(reply["idle_processes"])
+                logger.info(f"🔥 Keeping {idle_target} prewarmed idle processes (dialer demand)")
+                on_idle_target(idle_target)
+        except Exception as e:
+            logger.warning(f"Heartbeat failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def start_heartbeat(
+    interval: float = HEARTBEAT_INTERVAL,
+    on_idle_target: Callable[[int], None] | None = None,
+) -> threading.Thread:
+    """
+    Report to the control server from a daemon thread (used by the agent worker).
+    `on_idle_target` receives the prewarmed-process count the server asks for.
+    """
+    worker_id()  # pin the ID in the environment before job processes are started
+    thread = threading.Thread(target=lambda: asyncio.run(_heartbeat_loop(interval, on_idle_target)), name="heartbeat", daemon=True)
+    thread.start()
+    logger.info(f"Heartbeats every {interval:.0f}s to the control server")
+    return thread
@@ -0,0 +1,166 @@
+import math
+from dataclasses import dataclass, field
+
+# Latency series tracked per turn (seconds)
+LATENCY_METRICS = ("eou_delay", "llm_ttft", "tts_ttfb", "turn_latency")
+
+# Percentiles reported in session logs
+REPORTED_PERCENTILES = (50, 95, 99)
+
+
+# --------------------------
+#   Log-bucketed Histogram
+# --------------------------
+
+class LogHistogram:
+    """
+    Streaming fixed-memory histogram with logarithmic buckets (HDR-style).
+
+    Values between `min_value` and `max_value` land in buckets whose width
+    grows by `precision` each step, so every percentile is accurate to about
+    `precision` relative error no matter how many samples are recorded.
+    Out-of-range values are clamped into the first/last bucket; exact min and
+    max are tracked separately.
+    """
+
+    def __init__(self, min_value: float = 1e-4, max_value: float = 120.0, precision: float = 0.02):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.precision = precision
+        self._log_growth = math.log1p(precision)
+        self._num_buckets = int(math.log(max_value / min_value) / self._log_growth) + 2
+        self.counts = [0] * self._num_buckets
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _bucket(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        index = int(math.log(value / self.min_value) / self._log_growth) + 1
+        return min(index, self._num_buckets - 1)
+
+    def _bucket_value(self, index: int) -> float:
+        """Representative value of a bucket (geometric midpoint of its bounds)."""
+        if index == 0:
+            return self.min_value
+        lower = self.min_value * math.exp((index - 1) * self._log_growth)
+        return lower * math.sqrt(1 + self.precision)
+
+    def record(self, value: float | None) -> None:
+        """Add one sample; None/NaN/negative values are ignored."""
+        if value is None or math.isnan(value) or value < 0:
+            return
+        self.counts[self._bucket(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LogHistogram") -> None:
+        """Add all samples of a histogram with the same bucket layout."""
+        if (other.min_value, other.max_value, other.precision) != (self.min_value, self.max_value, self.precision):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        """Value at percentile `p` (0-100); 0.0 when empty."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(max(self._bucket_value(i), self.min), self.max)
+        return self.max
+
+    def count_at_or_below(self, bound: float) -> int:
+        """Samples whose bucket lies entirely at or below `bound` (for Prometheus `le` buckets)."""
+        total = 0
+        for i, c in enumerate(self.counts):
+            if c and self._bucket_upper(i) <= bound:
+                total += c
+        return total
+
+    def _bucket_upper(self, index: int) -> float:
+        return self.min_value * math.exp(index * self._log_growth)
+
+    def to_dict(self) -> dict:
+        """Compact JSON-serializable form (only non-empty buckets)."""
+        return {
+            "buckets": {str(i): c for i, c in enumerate(self.counts) if c},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LogHistogram":
+        hist = cls()
+        for i, c in data.get("buckets", {}).items():
+            hist.counts[int(i)] = c
+        hist.count = data.get("count", 0)
+        hist.total = data.get("total", 0.0)
+        if hist.count:
+            hist.min, hist.max = data["min"], data["max"]
+        return hist
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self, percentiles=REPORTED_PERCENTILES) -> dict:
+        """Count, mean, min/max and percentiles, rounded for logs."""
+        result = {
+            "count": self.count,
+            "mean": round(self.mean, 4),
+            "min": round(self.min, 4) if self.count else 0.0,
+            "max": round(self.max, 4) if self.count else 0.0,
+        }
+        for p in percentiles:
+            result[f"p{p}"] = round(self.percentile(p), 4)
+        return result
+
+
+# --------------------------
+#   Named Histogram Set
+# --------------------------
+
+@dataclass
+class LatencyHistograms:
+    """One LogHistogram per latency series (see LATENCY_METRICS)."""
+
+    histograms: dict[str, LogHistogram] = field(
+        default_factory=lambda: {name: LogHistogram() for name in LATENCY_METRICS}
+    )
+
+    def record(self, name: str, value: float | None) -> None:
+        self.histograms.setdefault(name, LogHistogram()).record(value)
+
+    def merge(self, other: "LatencyHistograms") -> None:
+        for name, hist in other.histograms.items():
+            self.histograms.setdefault(name, LogHistogram()).merge(hist)
+
+    def percentiles(self) -> dict[str, dict]:
+        """{series: {count, mean, min, max, p50, p95, p99}}"""
+        return {name: hist.summary() for name, hist in self.histograms.items()}
+
+
+# Per-process histograms: sessions finished in this job process are merged in
+# here. LiveKit runs each job in its own process, so this is not worker-wide;
+# the worker-wide view is the registry's /metrics endpoint.
+PROCESS_LATENCY = LatencyHistograms()
+
+
+def get_process_latency_percentiles() -> dict[str, dict]:
+    """Latency percentiles across the sessions finished in this process only."""
+    return PROCESS_LATENCY.percentiles()
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import aiohttp
+from livekit import api
+
+from helpers.config import LIVEKIT_HTTP_KEEPALIVE, LIVEKIT_HTTP_POOL_SIZE
+
+logger = logging.getLogger("livekit_client")
+
+
+class LiveKitClientManager:
+    """
+    Process-wide LiveKitAPI client on a pooled keep-alive HTTP session.
+
+    Dialers, recording and the API server share one client per event loop,
+    so room/SIP/egress requests reuse warm TLS connections instead of
+    opening a new session for every call.
+    """
+
+    def __init__(self, pool_size: int = LIVEKIT_HTTP_POOL_SIZE, keepalive: float = LIVEKIT_HTTP_KEEPALIVE):
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self._client: api.LiveKitAPI | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get(self) -> api.LiveKitAPI:
+        """The shared client, created on first use in the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop or self._session.closed:
+            # a session from a finished asyncio.run() cannot be reused or closed
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.keepalive)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._client = api.LiveKitAPI(
+                os.environ["LIVEKIT_URL"],
+                os.environ["LIVEKIT_API_KEY"],
+                os.environ["LIVEKIT_API_SECRET"],
+                session=self._session,
+            )
+            self._loop = loop
+            logger.info(f"🔌 LiveKit API client created (pool={self.pool_size}, keepalive={self.keepalive:.0f}s)")
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._session is not None and not self._session.closed and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._client = self._session = self._loop = None
+
+
+LIVEKIT_CLIENTS = LiveKitClientManager()
+
+
+def get_livekit_api() -> api.LiveKitAPI:
+    return LIVEKIT_CLIENTS.get()
+
+
+@asynccontextmanager
+async def livekit_api() -> AsyncIterator[api.LiveKitAPI]:
+    """Drop-in for `async with api.LiveKitAPI(...)` that borrows the shared client (never closes it)."""
+    yield LIVEKIT_CLIENTS.get()
+
+
+async def close_livekit_api() -> None:
+    """Close the shared client's connections (process/app shutdown)."""
+    await LIVEKIT_CLIENTS.aclose()
@@ -4,35 +4,43 @@ from dataclasses import asdict
 from datetime import datetime
 
 from helpers.config import LOG_PATH
+from helpers.latency_histogram import PROCESS_LATENCY
+from helpers.session_context import SessionContext
 
 # Logger for agent/session events
 logger = logging.getLogger("agent")
 
 
-async def log_usage(usage_collector, cost_calc, SESSION_LOGS, SESSION_ID, customer_profile, TTS_PROVIDER, STT_PROVIDER, LLM_PROVIDER):  # noqa: N803
+async def log_usage(session_ctx: SessionContext):
     """
     Logs and persists session usage and cost information.
+    Registered as a job shutdown callback in helpers/entrypoint.
 
     Parameters:
-        usage_collector: Aggregates metrics from the session (LLM, STT, TTS)
-        cost_calc: CostCalculator instance for computing costs
-        SESSION_LOGS: Dict holding detailed logs of transcripts, metrics, and conversation events
-        SESSION_ID: Unique identifier for this session
-        customer_profile: Dict with customer information
-        TTS_PROVIDER: Name of the TTS provider used
-        STT_PROVIDER: Name of the STT provider used
+        session_ctx: Per-job context holding the session ID, customer profile,
+            providers, the usage collector and cost calculator attached by
+            setup_metrics, and the structured logs of transcripts, metrics and
+            conversation events
     """
+    session_logs = session_ctx.logs
+    session_id = session_ctx.session_id
+    usage_collector = session_ctx.usage_collector
+    cost_calc = session_ctx.cost_calc
+
+    if usage_collector is None or cost_calc is None:
+        logger.warning(f"No metrics attached to session {session_id}, skipping usage log")
+        return
 
     # ------------------------
     # Get usage summary and cost
     # ------------------------
     summary = usage_collector.get_summary()               # Aggregated metrics
-    cost_summary = cost_calc.summarize_usage(summary, SESSION_ID)  # Compute costs
+    cost_summary = cost_calc.summarize_usage(summary, session_id)  # Compute costs
 
     # ------------------------
     # Compute average conversation latency
     # ------------------------
-    conversation_latencies = [c["latency_seconds"] for c in SESSION_LOGS.get("conversation", [])]
+    conversation_latencies = [c["latency_seconds"] for c in session_logs.get("conversation", [])]
     avg_latency = sum(conversation_latencies) / len(conversation_latencies) if conversation_latencies else 0.0
 
     # ------------------------
@@ -40,7 +48,7 @@ async def log_usage(usage_collector, cost_calc, SESSION_LOGS, SESSION_ID, custom
     # ------------------------
     all_timestamps = []
     for section in ("stt", "tts", "llm", "eou", "conversation"):
-        for ev in SESSION_LOGS.get(section, []):
+        for ev in session_logs.get(section, []):
             try:  # noqa: SIM105
                 # Convert ISO timestamp to datetime object
                 all_timestamps.append(datetime.fromisoformat(ev["timestamp"]))
@@ -60,26 +68,36 @@ async def log_usage(usage_collector, cost_calc, SESSION_LOGS, SESSION_ID, custom
     logger.info(f"Final Cost Summary: {cost_summary}")
     logger.info(f"Average Conversation Latency: {avg_latency:.3f} sec")
 
+    # ------------------------
+    # Latency percentiles (session + this process)
+    # ------------------------
+    latency_percentiles = session_ctx.latency.percentiles()
+    PROCESS_LATENCY.merge(session_ctx.latency)
+    turn = latency_percentiles["turn_latency"]
+    logger.info(f"Turn Latency p50/p95/p99: {turn['p50']:.3f}/{turn['p95']:.3f}/{turn['p99']:.3f} sec")
+
     # Convert dataclass summary to dictionary
     usage_dict = asdict(summary)
-    usage_dict["session_id"] = SESSION_ID
+    usage_dict["session_id"] = session_id
     usage_dict["average_latency_seconds"] = avg_latency
     usage_dict["session_length_seconds"] = session_length
+    usage_dict["latency_percentiles"] = latency_percentiles
 
-    # Store metadata in SESSION_LOGS
-    SESSION_LOGS["metadata"] = {
-        "session_id": SESSION_ID,
-        "TTS provider": TTS_PROVIDER,
-        "STT provider": STT_PROVIDER,
-        "LLM provider": LLM_PROVIDER,
-        "customer_profile": customer_profile,
+    # Store metadata in session_logs
+    session_logs["metadata"] = {
+        "session_id": session_id,
+        "TTS provider": session_ctx.tts_provider,
+        "STT provider": session_ctx.stt_provider,
+        "LLM provider": session_ctx.llm_provider,
+        "customer_profile": session_ctx.customer_profile,
         "final_usage": usage_dict,
         "final_cost": cost_summary,
+        "latency_percentiles": latency_percentiles,
     }
 
     # ------------------------
     # Persist session logs to JSON file
     # ------------------------
-    file_path = LOG_PATH / f"{TTS_PROVIDER}_{STT_PROVIDER}_{LLM_PROVIDER}_session_{SESSION_ID}.json"
+    file_path = LOG_PATH / f"{session_ctx.tts_provider}_{session_ctx.stt_provider}_{session_ctx.llm_provider}_session_{session_id}.json"
     with open(file_path, "w", encoding='utf-8') as f:
-        json.dump(SESSION_LOGS, f, indent=2, ensure_ascii=False)
+        json.dump(session_logs, f, indent=2, ensure_ascii=False)
@@ -5,36 +5,79 @@ from datetime import datetime
 from livekit.agents import (
     AgentSession,
     ConversationItemAddedEvent,
+    ErrorEvent,
     MetricsCollectedEvent,
     UserInputTranscribedEvent,
     metrics,
 )
 from livekit.agents.llm import ChatMessage
 
-# from helpers.config import LLM_PROVIDER, TTS_PROVIDER, STT_PROVIDER, IST
-from helpers.config import IST, LLM_PROVIDER, STT_PROVIDER, TTS_PROVIDER
+from class_mod.tts_cache import CACHE_METRICS_LABEL
+from helpers.config import IST
+from helpers.control_client import CONTROL
+from helpers.metrics_registry import REGISTRY
+from helpers.session_context import SessionContext
 from helpers.usage_tracker import CostCalculator
 
 logger = logging.getLogger("agent")
 
 
-def setup_metrics(session: AgentSession, SESSION_LOGS: dict):  # noqa: N803
+def setup_metrics(session: AgentSession, session_ctx: SessionContext):
     """
     Sets up real-time metrics collection for a LiveKit AgentSession.
+    Must be called once, before session.start, so every turn is captured.
     Tracks LLM, STT, TTS, EOU, VAD, and conversation latencies.
-    Stores detailed event logs in SESSION_LOGS and returns:
+    Stores detailed event logs in session_ctx.logs and attaches to session_ctx
+    (also returned):
       - usage_collector: aggregates usage metrics
       - cost_calc: cost calculator for billing
     """
 
+    # Structured log buffer owned by this session only
+    session_logs = session_ctx.logs
+
+    if session_ctx.usage_collector is not None:
+        logger.warning("Metrics already attached to this session, skipping")
+        return session_ctx.usage_collector, session_ctx.cost_calc
+
     # Aggregate usage metrics across the session
     usage_collector = metrics.UsageCollector()
 
     # Billing calculator
-    cost_calc = CostCalculator(llm_provider=LLM_PROVIDER ,stt_provider=STT_PROVIDER, tts_provider=TTS_PROVIDER)
+    cost_calc = CostCalculator(
+        llm_provider=session_ctx.llm_provider,
+        stt_provider=session_ctx.stt_provider,
+        tts_provider=session_ctx.tts_provider,
+    )
+    session_ctx.usage_collector = usage_collector
+    session_ctx.cost_calc = cost_calc
 
     # Per-turn temporary store {speech_id: {...metrics...}}
     turn_metrics: dict[str, dict] = {}
+    # Turns whose latency was already recorded; a turn can emit several TTS metrics
+    recorded_turns: set[str] = set()
+
+    # Provider label per pipeline stage for the Prometheus series
+    providers = {
+        "stt": session_ctx.stt_provider,
+        "llm": session_ctx.llm_provider,
+        "tts": session_ctx.tts_provider,
+    }
+
+    # ------------------------
+    # Provider errors
+    # ------------------------
+    @session.on("error")
+    def _on_error(ev: ErrorEvent):
+        # ev.error.type is "stt_error" / "llm_error" / "tts_error"
+        stage = getattr(ev.error, "type", "").removesuffix("_error")
+        REGISTRY.inc(
+            "voice_agent_provider_errors_total",
+            provider=providers.get(stage, "unknown"),
+            stage=stage or "other",
+            kind="recoverable" if getattr(ev.error, "recoverable", False) else "fatal",
+        )
+        REGISTRY.flush()
 
     # ------------------------
     # User transcription events
@@ -42,7 +85,7 @@ def setup_metrics(session: AgentSession, SESSION_LOGS: dict):  # noqa: N803
     @session.on("user_input_transcribed")
     def _on_user_transcribed(ev: UserInputTranscribedEvent):
         timestamp = datetime.now(IST).isoformat()
-        SESSION_LOGS.setdefault("transcript", []).append({
+        session_logs.setdefault("transcript", []).append({
             "speech_id": ev.speaker_id or str(uuid.uuid4()),
             "role": "user",
             "text": ev.transcript.strip(),
@@ -59,7 +102,7 @@ def setup_metrics(session: AgentSession, SESSION_LOGS: dict):  # noqa: N803
             timestamp = datetime.now(IST).isoformat()
             text = ev.item.text_content
             if text:
-                SESSION_LOGS.setdefault("transcript", []).append({
+                session_logs.setdefault("transcript", []).append({
                     "speech_id": ev.item.id,
                     "role": ev.item.role,
                     "text": text.strip(),
@@ -74,15 +117,18 @@ def setup_metrics(session: AgentSession, SESSION_LOGS: dict):  # noqa: N803
     @session.on("metrics_collected")
     def _on_metrics_collected(ev: MetricsCollectedEvent):
         metrics.log_metrics(ev.metrics)  # raw log for debugging
-        usage_collector.collect(ev.metrics)
+        # audio replayed from the TTS cache is not provider usage
+        cached_audio = getattr(ev.metrics, "label", None) == CACHE_METRICS_LABEL
+        if not cached_audio:
+            usage_collector.collect(ev.metrics)
 
         timestamp = datetime.now(IST).isoformat()
-        speech_id = getattr(ev.metrics, "speech_id", str(uuid.uuid4()))
+        speech_id = getattr(ev.metrics, "speech_id", None) or str(uuid.uuid4())
         turn_metrics.setdefault(speech_id, {})
 
         # ---------------- STT ----------------
         if isinstance(ev.metrics, metrics.STTMetrics):
-            SESSION_LOGS.setdefault("stt", []).append({
+            session_logs.setdefault("stt", []).append({
                 "speech_id": speech_id,
                 "audio_duration": ev.metrics.audio_duration,
                 "duration": getattr(ev.metrics, "duration", 0.0),
@@ -90,10 +136,12 @@ def setup_metrics(session: AgentSession, SESSION_LOGS: dict):  # noqa: N803
                 "timestamp": ev.metrics.timestamp,
             })
             turn_metrics[speech_id]["stt_seconds"] = ev.metrics.audio_duration
+            REGISTRY.inc("voice_agent_audio_seconds_total", ev.metrics.audio_duration, provider=providers["stt"], direction="stt")
+            REGISTRY.inc("voice_agent_cost_total", cost_calc.stt_cost(ev.metrics.audio_duration), provider=providers["stt"], service="stt")
 
         # ---------------- LLM ----------------
         elif isinstance(ev.metrics, metrics.LLMMetrics):
-            SESSION_LOGS.setdefault("llm", []).append({
+            session_logs.setdefault("llm", []).append({
                 "speech_id": speech_id,
                 "duration": ev.metrics.duration,
                 "completion_tokens": ev.metrics.completion_tokens,
@@ -105,50 +153,95 @@ def setup_metrics(session: AgentSession, SESSION_LOGS: dict):  # noqa: N803
                 "timestamp": ev.metrics.timestamp,
             })
             turn_metrics[speech_id]["llm_ttft"] = ev.metrics.ttft
+            session_ctx.latency.record("llm_ttft", ev.metrics.ttft)
+            REGISTRY.observe_latency("llm_ttft", ev.metrics.ttft)
+            cached = ev.metrics.prompt_cached_tokens
+            REGISTRY.inc("voice_agent_llm_tokens_total", ev.metrics.prompt_tokens - cached, provider=providers["llm"], kind="prompt")
+            REGISTRY.inc("voice_agent_llm_tokens_total", cached, provider=providers["llm"], kind="prompt_cached")
+            REGISTRY.inc("voice_agent_llm_tokens_total", ev.metrics.completion_tokens, provider=providers["llm"], kind="completion")
+            REGISTRY.inc(
+                "voice_agent_cost_total",
+                cost_calc.llm_cost(ev.metrics.prompt_tokens, cached, ev.metrics.completion_tokens),
+                provider=providers["llm"],
+                service="llm",
+            )
 
         # ---------------- TTS ----------------
         elif isinstance(ev.metrics, metrics.TTSMetrics):
-            SESSION_LOGS.setdefault("tts", []).append({
+            session_logs.setdefault("tts", []).append({
                 "speech_id": speech_id,
                 "audio_duration": ev.metrics.audio_duration,
                 "characters_count": ev.metrics.characters_count,
                 "duration": ev.metrics.duration,
                 "ttfb": ev.metrics.ttfb,
                 "streamed": getattr(ev.metrics, "streamed", False),
+                "cached": cached_audio,
                 "timestamp": ev.metrics.timestamp,
             })
-            turn_metrics[speech_id]["tts_ttfb"] = ev.metrics.ttfb
-            turn_metrics[speech_id]["tts_timestamp"] = ev.metrics.timestamp
+            if not cached_audio:
+                REGISTRY.inc("voice_agent_audio_seconds_total", ev.metrics.audio_duration, provider=providers["tts"], direction="tts")
+                REGISTRY.inc("voice_agent_tts_characters_total", ev.metrics.characters_count, provider=providers["tts"])
+                REGISTRY.inc(
+                    "voice_agent_cost_total",
+                    cost_calc.tts_cost(ev.metrics.characters_count, ev.metrics.audio_duration, 0),
+                    provider=providers["tts"],
+                    service="tts",
+                )
 
-            # --- Calculate clean latency here ---
-            eou = turn_metrics[speech_id].get("eou_delay", 0.0)
-            ttft = turn_metrics[speech_id].get("llm_ttft", 0.0)
-            ttfb = ev.metrics.ttfb
-            total_latency = eou + ttft + ttfb
+            if speech_id in recorded_turns:
+                # later TTS segment of a turn already recorded: usage only
+                turn_metrics.pop(speech_id, None)
+            else:
+                recorded_turns.add(speech_id)
+                turn_metrics[speech_id]["tts_ttfb"] = ev.metrics.ttfb
+                turn_metrics[speech_id]["tts_timestamp"] = ev.metrics.timestamp
 
-            SESSION_LOGS.setdefault("conversation", []).append({
-                "speech_id": speech_id,
-                "latency_seconds": total_latency,
-                "stt_seconds": turn_metrics[speech_id].get("stt_seconds", 0.0),
-                "llm_ttft": turn_metrics[speech_id].get("llm_ttft", 0.0),
-                "tts_ttfb": ev.metrics.ttfb,
-                "tts_timestamp": ev.metrics.timestamp,
-                "raw_eou_delay": turn_metrics[speech_id].get("eou_delay", 0.0),
-                "raw_transcription_delay": turn_metrics[speech_id].get("transcription_delay", 0.0),
-                "on_user_turn_completed_delay": turn_metrics[speech_id].get("on_user_turn_completed_delay", 0.0),
-                "timestamp": timestamp,
-            })
-            # cleanup finished turn
-            del turn_metrics[speech_id]
+                # --- Calculate clean latency here ---
+                eou = turn_metrics[speech_id].get("eou_delay", 0.0)
+                ttft = turn_metrics[speech_id].get("llm_ttft", 0.0)
+                ttfb = ev.metrics.ttfb
+                total_latency = eou + ttft + ttfb
+
+                session_ctx.latency.record("tts_ttfb", ttfb)
+                session_ctx.latency.record("turn_latency", total_latency)
+                REGISTRY.observe_latency("tts_ttfb", ttfb)
+                REGISTRY.observe_latency("turn_latency", total_latency)
+
+                session_logs.setdefault("conversation", []).append({
+                    "speech_id": speech_id,
+                    "latency_seconds": total_latency,
+                    "stt_seconds": turn_metrics[speech_id].get("stt_seconds", 0.0),
+                    "llm_ttft": turn_metrics[speech_id].get("llm_ttft", 0.0),
+                    "tts_ttfb": ev.metrics.ttfb,
+                    "tts_timestamp": ev.metrics.timestamp,
+                    "raw_eou_delay": turn_metrics[speech_id].get("eou_delay", 0.0),
+                    "raw_transcription_delay": turn_metrics[speech_id].get("transcription_delay", 0.0),
+                    "on_user_turn_completed_delay": turn_metrics[speech_id].get("on_user_turn_completed_delay", 0.0),
+                    "timestamp": timestamp,
+                    **session_ctx.pop_turn_annotations(),   # e.g. thinking_sound used this turn
+                })
+                # Live per-turn latency for the control server's event stream
+                CONTROL.post_nowait("/events/turn", {
+                    "room_name": session_ctx.session_id,
+                    "speech_id": speech_id,
+                    "latency_seconds": total_latency,
+                    "eou_delay": eou,
+                    "llm_ttft": ttft,
+                    "tts_ttfb": ttfb,
+                })
+                # cleanup finished turn
+                del turn_metrics[speech_id]
 
         # ---------------- EOU ----------------
         elif isinstance(ev.metrics, metrics.EOUMetrics):
             turn_metrics[speech_id]["eou_delay"] = ev.metrics.end_of_utterance_delay
+            session_ctx.latency.record("eou_delay", ev.metrics.end_of_utterance_delay)
+            REGISTRY.observe_latency("eou_delay", ev.metrics.end_of_utterance_delay)
             turn_metrics[speech_id]["transcription_delay"] = ev.metrics.transcription_delay
             turn_metrics[speech_id]["on_user_turn_completed_delay"] = ev.metrics.on_user_turn_completed_delay
             turn_metrics[speech_id]["last_speaking_time"] = ev.metrics.last_speaking_time
 
-            SESSION_LOGS.setdefault("eou", []).append({
+            session_logs.setdefault("eou", []).append({
                 "speech_id": speech_id,
                 "end_of_utterance_delay": ev.metrics.end_of_utterance_delay,
                 "transcription_delay": ev.metrics.transcription_delay,
@@ -166,5 +259,8 @@ def setup_metrics(session: AgentSession, SESSION_LOGS: dict):  # noqa: N803
         else:
             logger.warning(f"Unknown metrics type: {type(ev.metrics)}")
 
+        # Make the update visible to the worker's /metrics endpoint (throttled)
+        REGISTRY.flush()
+
     # Return collector & cost calculator for later use
     return usage_collector, cost_calc
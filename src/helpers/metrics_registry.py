@@ -0,0 +1,299 @@
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from functools import cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import psutil
+
+from helpers.config import METRICS_DIR
+from helpers.latency_histogram import LATENCY_METRICS, LogHistogram
+
+logger = logging.getLogger("metrics_registry")
+
+# Prometheus `le` buckets for turn-latency histograms (seconds)
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+# Help text / type for every exported series
+METRIC_HELP = {
+    "voice_agent_active_sessions": ("gauge", "Sessions currently running"),
+    "voice_agent_sessions_total": ("counter", "Sessions started"),
+    "voice_agent_provider_errors_total": ("counter", "STT/LLM/TTS errors by provider"),
+    "voice_agent_llm_tokens_total": ("counter", "LLM tokens by provider and kind"),
+    "voice_agent_audio_seconds_total": ("counter", "Audio seconds processed by provider"),
+    "voice_agent_tts_characters_total": ("counter", "Characters synthesized by provider"),
+    "voice_agent_cost_total": ("counter", "Running cost by provider (units of src/costs)"),
+    "voice_agent_turn_latency_seconds": ("histogram", "Per-turn latency by stage"),
+    "voice_agent_calls_total": ("counter", "Outbound calls by final status"),
+    "voice_agent_active_calls": ("gauge", "Outbound calls in progress"),
+    "voice_agent_post_call_steps_total": ("counter", "Post-call pipeline steps by outcome"),
+    "voice_agent_loop_lag_seconds": ("gauge", "Worst recent event-loop lag of a job process"),
+    "voice_agent_worker_load": ("gauge", "Load score used for job acceptance"),
+}
+
+
+# Counters and histograms of exited processes, folded into one file
+RETIRED_FILE = "retired.json"
+RETIRE_LOCK = "retire.lock"
+
+
+@cache
+def _create_time(pid: int) -> float | None:
+    """Start time of a live process; with the pid it identifies the process across pid reuse."""
+    try:
+        return psutil.Process(pid).create_time()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+
+
+def _label_key(labels: dict) -> str:
+    return json.dumps(labels, sort_keys=True)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+# --------------------------
+#   In-process Registry
+# --------------------------
+
+class MetricsRegistry:
+    """
+    Counters, gauges and turn-latency histograms for one process.
+
+    Thread-safe (the scrape server runs in its own thread). Job processes
+    spill snapshots to METRICS_DIR so the worker's scrape endpoint can
+    aggregate every process on the host.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, str], float] = {}
+        self._gauges: dict[tuple[str, str], float] = {}
+        self._latency: dict[str, LogHistogram] = {name: LogHistogram() for name in LATENCY_METRICS}
+        self._last_flush = 0.0
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def add_gauge(self, name: str, delta: float, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0.0) + delta
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe_latency(self, stage: str, value: float | None) -> None:
+        with self._lock:
+            self._latency.setdefault(stage, LogHistogram()).record(value)
+
+    def snapshot(self) -> dict:
+        """JSON-serializable state of this process."""
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "create_time": _create_time(os.getpid()),
+                "counters": [[n, k, v] for (n, k), v in self._counters.items()],
+                "gauges": [[n, k, v] for (n, k), v in self._gauges.items()],
+                "latency": {stage: h.to_dict() for stage, h in self._latency.items()},
+            }
+
+    # --------------------------
+    #   Multi-process spill
+    # --------------------------
+
+    def flush(self, directory: Path = METRICS_DIR, min_interval: float = 2.0, force: bool = False) -> None:
+        """Write this process's snapshot for the scrape endpoint (throttled)."""
+        now = time.monotonic()
+        if not force and now - self._last_flush < min_interval:
+            return
+        self._last_flush = now
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            _write_json(directory / f"{os.getpid()}.json", self.snapshot())
+        except OSError as e:
+            logger.warning("Failed to flush metrics snapshot: %s", e)
+
+
+REGISTRY = MetricsRegistry()
+
+
+# --------------------------
+#   Aggregation / Exposition
+# --------------------------
+
+def _process_alive(snap: dict) -> bool:
+    """Whether the process that wrote `snap` still runs (same pid and same start time)."""
+    try:
+        process = psutil.Process(snap.get("pid", -1))
+        return abs(process.create_time() - (snap.get("create_time") or 0.0)) < 1e-3
+    except (psutil.NoSuchProcess, psutil.AccessDenied, ValueError):
+        return False
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(data))
+    os.replace(tmp_path, path)
+
+
+def _retire(directory: Path, path: Path) -> None:
+    """Fold an exited process's counters and histograms into RETIRED_FILE and delete its snapshot."""
+    with open(directory / RETIRE_LOCK, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)    # another collector may be retiring the same file
+        try:
+            snap = json.loads(path.read_text())
+        except FileNotFoundError:
+            return
+        except ValueError:
+            path.unlink(missing_ok=True)
+            return
+        if _process_alive(snap):
+            return
+        retired_path = directory / RETIRED_FILE
+        try:
+            retired = json.loads(retired_path.read_text())
+        except (OSError, ValueError):
+            retired = {"pid": None, "counters": [], "gauges": [], "latency": {}}
+
+        counters = {(n, k): v for n, k, v in retired["counters"]}
+        for n, k, v in snap.get("counters", []):
+            counters[(n, k)] = counters.get((n, k), 0.0) + v
+        retired["counters"] = [[n, k, v] for (n, k), v in counters.items()]
+        for stage, data in snap.get("latency", {}).items():
+            hist = LogHistogram.from_dict(retired["latency"].get(stage, LogHistogram().to_dict()))
+            hist.merge(LogHistogram.from_dict(data))
+            retired["latency"][stage] = hist.to_dict()
+
+        _write_json(retired_path, retired)
+        path.unlink(missing_ok=True)
+
+
+def collect_snapshots(directory: Path = METRICS_DIR, include_self: bool = True) -> list[dict]:
+    """
+    Snapshots of all processes on this host. Snapshots of exited processes
+    are folded into RETIRED_FILE (counters and histograms only, so totals
+    stay monotonic) and their files removed; their gauges are dropped.
+    """
+    snapshots = [REGISTRY.snapshot()] if include_self else []
+    own_pid = os.getpid()
+    if not directory.exists():
+        return snapshots
+    for path in directory.glob("*.json"):
+        if path.name == RETIRED_FILE:
+            continue
+        try:
+            snap = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if _process_alive(snap):
+            if snap.get("pid") != own_pid:
+                snapshots.append(snap)
+            continue
+        try:
+            _retire(directory, path)
+        except OSError as e:
+            logger.warning("Failed to retire metrics snapshot %s: %s", path.name, e)
+    with contextlib.suppress(OSError, ValueError):
+        snapshots.append(json.loads((directory / RETIRED_FILE).read_text()))
+    return snapshots
+
+
+def gauge_total(snapshots: list[dict], name: str) -> float:
+    """Sum of a gauge over all processes and label sets."""
+    return sum(value for snap in snapshots for n, _, value in snap.get("gauges", []) if n == name)
+
+
+def gauge_values(snapshots: list[dict], name: str) -> list[tuple[dict, float]]:
+    """(labels, value) of a gauge for every process and label set."""
+    return [(json.loads(key), value) for snap in snapshots for n, key, value in snap.get("gauges", []) if n == name]
+
+
+def gauge_max(snapshots: list[dict], name: str) -> float:
+    """Largest value of a gauge over all processes and label sets."""
+    return max((value for snap in snapshots for n, _, value in snap.get("gauges", []) if n == name), default=0.0)
+
+
+def render_openmetrics(snapshots: list[dict]) -> str:
+    """Merge snapshots and render them in the Prometheus text format."""
+    counters: dict[tuple[str, str], float] = {}
+    gauges: dict[tuple[str, str], float] = {}
+    latency: dict[str, LogHistogram] = {}
+    for snap in snapshots:
+        for name, key, value in snap.get("counters", []):
+            counters[(name, key)] = counters.get((name, key), 0.0) + value
+        for name, key, value in snap.get("gauges", []):
+            gauges[(name, key)] = gauges.get((name, key), 0.0) + value
+        for stage, data in snap.get("latency", {}).items():
+            latency.setdefault(stage, LogHistogram()).merge(LogHistogram.from_dict(data))
+
+    lines: list[str] = []
+    by_name: dict[str, list[tuple[dict, float]]] = {}
+    for (name, key), value in {**counters, **gauges}.items():
+        by_name.setdefault(name, []).append((json.loads(key), value))
+
+    for name in sorted(by_name):
+        kind, help_text = METRIC_HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in by_name[name]:
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    name = "voice_agent_turn_latency_seconds"
+    kind, help_text = METRIC_HELP[name]
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for stage in sorted(latency):
+        hist = latency[stage]
+        for bound in LATENCY_BUCKETS:
+            lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {hist.count_at_or_below(bound)}')
+        lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {hist.total}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+
+    return "\n".join(lines) + "\n"
+
+
+# --------------------------
+#   Scrape Endpoint
+# --------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_openmetrics(collect_snapshots()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        logger.debug("metrics scrape: " + format, *args)
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread (used by the agent worker)."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    logger.info("Metrics endpoint listening on http://%s:%d/metrics", host, port)
+    return server
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+from pathlib import Path
+
+from google.cloud import storage
+
+from class_mod.summary import SummaryRateLimiter, finalize_summary, generate_summary_llm
+from helpers.config import (
+    POST_CALL_CONCURRENCY,
+    POST_CALL_EVALUATION,
+    POST_CALL_GCP_BUCKET,
+    POST_CALL_MAX_ATTEMPTS,
+    POST_CALL_OUTPUT_PATH,
+)
+from helpers.metrics_registry import REGISTRY
+from helpers.post_call_queue import PostCallQueue
+
+logger = logging.getLogger("post_call")
+
+# Steps run in order for every job; results are stored per step so a retry
+# resumes at the step that failed
+POST_CALL_STEPS = ("summary", "persist", "upload", "evaluation")
+
+# Shared by all workers so a backlog drains at the summarizer's rate limit
+_summary_rate_limiter = SummaryRateLimiter()
+
+
+# --------------------------
+#   Pipeline Steps
+# --------------------------
+
+async def _step_summary(payload: dict, results: dict):
+    if "call_state" in payload:
+        # Fields were extracted during the call; only the gaps need the LLM
+        return await finalize_summary(
+            payload["call_state"],
+            payload.get("missing_fields", []),
+            payload["history_text"],
+            rate_limiter=_summary_rate_limiter,
+        )
+    summary = await generate_summary_llm(
+        payload["history_text"],
+        {"customer_profile": payload["customer_profile"]},
+        rate_limiter=_summary_rate_limiter,
+    )
+    if "error" in summary:
+        # generate_summary_llm reports failures in-band; raise so the job is retried
+        raise RuntimeError(f"Summary generation failed: {summary.get('exception')}")
+    return summary
+
+
+async def _step_persist(payload: dict, results: dict):
+    """Write the summary file the dialer looks for: temp/{session_id}_{participant_id}.json"""
+    POST_CALL_OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
+    filepath = POST_CALL_OUTPUT_PATH / f"{payload['session_id']}_{payload['participant_id']}.json"
+    data = {
+        "session_id": payload["session_id"],
+        "participant_id": payload["participant_id"],
+        "customer_profile": payload["customer_profile"],
+        "summary": results["summary"],
+    }
+    tmp_path = filepath.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=4), encoding="utf-8")
+    tmp_path.replace(filepath)
+    logger.info(f"💾 Session data saved to {filepath}")
+    return str(filepath)
+
+
+async def _step_upload(payload: dict, results: dict):
+    if not POST_CALL_GCP_BUCKET:
+        return None
+    file_path = Path(results["persist"])
+
+    def _upload():
+        blob = storage.Client().bucket(POST_CALL_GCP_BUCKET).blob(f"call_summaries/{file_path.name}")
+        blob.upload_from_filename(str(file_path))
+
+    await asyncio.to_thread(_upload)
+    uri = f"gs://{POST_CALL_GCP_BUCKET}/call_summaries/{file_path.name}"
+    logger.info(f"☁️ Uploaded summary to GCP: {uri}")
+    return uri
+
+
+async def _step_evaluation(payload: dict, results: dict):
+    if not POST_CALL_EVALUATION or not payload.get("dialogue"):
+        return None
+    # Imported lazily: ragas/langchain-openai are heavy and only needed when enabled
+    import evaluation
+
+    avg_scores, usage_info = await asyncio.to_thread(
+        evaluation.evaluate_per_turn, [{"dialogue": payload["dialogue"]}]
+    )
+    return {"scores": avg_scores, "usage": usage_info}
+
+
+STEP_HANDLERS = {
+    "summary": _step_summary,
+    "persist": _step_persist,
+    "upload": _step_upload,
+    "evaluation": _step_evaluation,
+}
+
+
+# --------------------------
+#   Worker Pool
+# --------------------------
+
+class PostCallWorkerPool:
+    """
+    Bounded pool of async workers draining the PostCallQueue.
+
+    Each job runs POST_CALL_STEPS in order; a failing step is retried with
+    exponential backoff and jitter up to `max_attempts`, after which the job
+    is marked failed (and kept in the database for inspection).
+    """
+
+    def __init__(
+        self,
+        queue: PostCallQueue,
+        concurrency: int = POST_CALL_CONCURRENCY,
+        max_attempts: int = POST_CALL_MAX_ATTEMPTS,
+        base_delay: float = 5.0,
+        poll_interval: float = 1.0,
+    ):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.poll_interval = poll_interval
+
+    async def run(self) -> None:
+        logger.info(f"Post-call workers started (concurrency={self.concurrency})")
+        await asyncio.gather(*(self._worker(i) for i in range(self.concurrency)))
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            try:
+                job = await asyncio.to_thread(self.queue.claim)
+            except sqlite3.Error as e:
+                logger.error(f"Post-call queue unavailable: {e}")
+                job = None
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self.process(job)
+
+    async def process(self, job: dict) -> None:
+        results = job["results"]
+        for step in POST_CALL_STEPS:
+            if step in results:
+                continue
+            try:
+                results[step] = await STEP_HANDLERS[step](job["payload"], results)
+            except Exception as e:
+                error = f"{step}: {e}"
+                REGISTRY.inc("voice_agent_post_call_steps_total", step=step, outcome="error")
+                if job["attempts"] >= self.max_attempts:
+                    logger.error(f"❌ Post-call job {job['id']} ({job['session_id']}) failed for good: {error}")
+                    await asyncio.to_thread(self.queue.fail, job["id"], error)
+                else:
+                    delay = self.base_delay * 2 ** (job["attempts"] - 1) * random.uniform(0.8, 1.2)
+                    logger.warning(f"⚠️ Post-call job {job['id']} attempt {job['attempts']} failed ({error}), retrying in {delay:.0f}s")
+                    await asyncio.to_thread(self.queue.retry, job["id"], error, delay)
+                return
+            REGISTRY.inc("voice_agent_post_call_steps_total", step=step, outcome="ok")
+            await asyncio.to_thread(self.queue.save_results, job["id"], results)
+
+        await asyncio.to_thread(self.queue.complete, job["id"])
+        logger.info(f"✅ Post-call job {job['id']} done for session {job['session_id']}")
+
+
+def start_post_call_workers(concurrency: int = POST_CALL_CONCURRENCY) -> threading.Thread:
+    """Run a worker pool on its own event loop in a daemon thread (used by the agent worker)."""
+    pool = PostCallWorkerPool(PostCallQueue(), concurrency=concurrency)
+    thread = threading.Thread(target=lambda: asyncio.run(pool.run()), name="post-call-workers", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+from helpers.config import POST_CALL_DB_PATH, POST_CALL_MAX_PENDING
+
+logger = logging.getLogger("post_call")
+
+# Jobs stuck in "running" this long (worker crashed mid-job) are picked up again
+STALE_RUNNING_SECONDS = 15 * 60
+
+
+# --------------------------
+#   SQLite Job Queue
+# --------------------------
+
+class PostCallQueue:
+    """
+    Durable post-call job queue in a local SQLite file.
+
+    The agent job process only enqueues (one short insert) and returns, so the
+    room is hung up before any summary LLM call. Worker pools in other
+    processes claim jobs atomically, so several workers can share one file.
+    """
+
+    def __init__(self, path: Path = POST_CALL_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    results TEXT NOT NULL DEFAULT '{}',
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_run_at REAL NOT NULL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (state, next_run_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def enqueue(self, session_id: str, payload: dict) -> int:
+        """Add a job; returns its id. Never drops work, even above the backlog limit."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "INSERT INTO jobs (session_id, payload, next_run_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (session_id, json.dumps(payload, ensure_ascii=False), now, now, now),
+            )
+            return cur.lastrowid
+
+    def claim(self) -> dict | None:
+        """Atomically mark the oldest due job as running and return it."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT id, session_id, payload, results, attempts FROM jobs
+                WHERE (state = 'pending' AND next_run_at <= ?)
+                   OR (state = 'running' AND updated_at <= ?)
+                ORDER BY next_run_at LIMIT 1
+                """,
+                (now, now - STALE_RUNNING_SECONDS),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (now, row[0]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return {
+            "id": row[0],
+            "session_id": row[1],
+            "payload": json.loads(row[2]),
+            "results": json.loads(row[3]),
+            "attempts": row[4] + 1,
+        }
+
+    def save_results(self, job_id: int, results: dict) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET results = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(results, ensure_ascii=False), time.time(), job_id),
+            )
+
+    def complete(self, job_id: int) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE jobs SET state = 'done', updated_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def retry(self, job_id: int, error: str, delay: float) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET state = 'pending', last_error = ?, next_run_at = ?, updated_at = ? WHERE id = ?",
+                (error, now + delay, now, job_id),
+            )
+
+    def fail(self, job_id: int, error: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET state = 'failed', last_error = ?, updated_at = ? WHERE id = ?",
+                (error, time.time(), job_id),
+            )
+
+    def depth(self) -> int:
+        """Jobs not finished yet (pending or running)."""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE state IN ('pending', 'running')").fetchone()[0]
+
+
+# --------------------------
+#   Backpressure
+# --------------------------
+
+async def wait_for_post_call_capacity(max_pending: int = POST_CALL_MAX_PENDING, poll_interval: float = 5.0) -> None:
+    """Block a dialer while the post-call backlog is above `max_pending`."""
+    queue = PostCallQueue()
+    warned = False
+    while (depth := await asyncio.to_thread(queue.depth)) >= max_pending:
+        if not warned:
+            logger.warning(f"⏸️ Post-call backlog at {depth} jobs, pausing new calls")
+            warned = True
+        await asyncio.sleep(poll_interval)
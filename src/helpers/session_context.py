@@ -0,0 +1,104 @@
+import logging
+from dataclasses import dataclass, field
+
+from livekit.agents import JobContext, metrics
+
+from class_mod.call_state import CallState
+from helpers.config import (
+    LLM_PROVIDER,
+    SESSION_LOG_SECTIONS,
+    STT_PROVIDER,
+    TTS_PROVIDER,
+)
+from helpers.customer_helper import (
+    CustomerProfileType,
+    decode_customer_profile,
+    load_customer_profile,
+)
+from helpers.latency_histogram import LatencyHistograms
+from helpers.usage_tracker import CostCalculator
+
+logger = logging.getLogger("agent")
+
+
+def new_session_logs() -> dict:
+    """Return an empty structured log buffer for one session."""
+    logs: dict = {"metadata": {}}
+    for section in SESSION_LOG_SECTIONS:
+        logs[section] = []
+    return logs
+
+
+# --------------------------
+#   Session Context
+# --------------------------
+
+@dataclass
+class SessionContext:
+    """
+    Per-job state for a single call.
+
+    One instance is created in helpers/entrypoint.entrypoint for every job and
+    handed to MyAssistant, setup_metrics and log_usage, so several calls can
+    share a worker process without sharing a customer or a log buffer.
+    setup_metrics attaches the usage collector and cost calculator before the
+    session starts; log_usage flushes them at job shutdown.
+    """
+
+    session_id: str
+    customer_profile: CustomerProfileType
+    logs: dict = field(default_factory=new_session_logs)
+    # Streaming per-turn latency histograms (EOU, LLM TTFT, TTS TTFB, end-to-end)
+    latency: LatencyHistograms = field(default_factory=LatencyHistograms)
+    # Extra fields merged into the next per-turn "conversation" metrics entry
+    turn_annotations: dict = field(default_factory=dict)
+    # Summary fields extracted turn by turn (class_mod/call_state.py)
+    call_state: CallState = field(default_factory=CallState)
+    tts_provider: str = TTS_PROVIDER
+    stt_provider: str = STT_PROVIDER
+    llm_provider: str = LLM_PROVIDER
+    # Set by helpers/metrics.setup_metrics
+    usage_collector: metrics.UsageCollector | None = None
+    cost_calc: CostCalculator | None = None
+
+    def pop_turn_annotations(self) -> dict:
+        """Return and clear annotations collected for the current turn."""
+        annotations, self.turn_annotations = self.turn_annotations, {}
+        return annotations
+
+    @classmethod
+    def from_profile(cls, customer_profile: CustomerProfileType, session_id: str | None = None) -> "SessionContext":
+        """Build a context for a profile; falls back to the phone number as session ID."""
+        return cls(
+            session_id=session_id or customer_profile.get("phone_number", "unknown_session"),
+            customer_profile=customer_profile,
+            call_state=CallState.from_profile(customer_profile),
+        )
+
+    @classmethod
+    def from_job(cls, ctx: JobContext) -> "SessionContext":
+        """
+        Build the context for a LiveKit job.
+        The room name is used as session ID, which is also what the dialer
+        uses to locate the call summary after hangup.
+        """
+        return cls.from_profile(profile_from_job(ctx), session_id=ctx.job.room.name or None)
+
+
+def profile_from_job(ctx: JobContext) -> CustomerProfileType:
+    """
+    Resolve the customer profile the dialer attached to this job.
+    Order: explicit dispatch metadata, then room metadata, then the local
+    customer.json (console/dev runs without a dialer).
+    """
+    for source, raw in (
+        ("job", ctx.job.metadata),
+        ("room", ctx.job.room.metadata),
+    ):
+        profile = decode_customer_profile(raw)
+        if profile is not None:
+            logger.info(f"Customer profile loaded from {source} metadata")
+            return profile
+
+    logger.warning("No customer profile in job metadata, falling back to customer.json")
+    return load_customer_profile()
@@ -1,5 +1,10 @@
+import asyncio
 import logging
+import time
+from collections.abc import Callable
+from typing import TypeVar
 
+from livekit import rtc
 from livekit.agents import (
     NOT_GIVEN,
     AgentFalseInterruptionEvent,
@@ -7,16 +12,18 @@ from livekit.agents import (
     JobContext,
     JobProcess,
 )
-from livekit.plugins import silero
+from livekit.agents.llm import ChatContext
+from livekit.plugins import noise_cancellation, silero
 from livekit.plugins.turn_detector.english import EnglishModel
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
-from helpers.config import TTS_PROVIDER
+from class_mod.thinking_sounds import load_thinking_clips
+from helpers.config import LLM_PROVIDER, STT_PROVIDER, TTS_PROVIDER
+from helpers.setup_tts_stt import setup_llm, setup_stt, setup_tts
 
 # Logger for this module
 logger = logging.getLogger("agent")
 
-thinking_track = None  # Global track for thinking sounds
 aligned_script = False
 if TTS_PROVIDER == "cartesia":
     aligned_script = True
@@ -26,17 +33,48 @@ def turn_detector_model(TTS_PROVIDER):  # noqa: N803
         return EnglishModel()
     return MultilingualModel()
 
+T = TypeVar("T")
+
 # --------------------------
 #   Prewarm Function
 # --------------------------
 
+def _timed(timings: dict[str, float], name: str, load: Callable[[], T]) -> T:
+    started = time.perf_counter()
+    try:
+        return load()
+    finally:
+        timings[name] = time.perf_counter() - started
+
+
+def _warm_up_vad(vad: silero.VAD) -> None:
+    """Run a second of silence through the VAD so the first call is not its first inference."""
+    async def _run():
+        stream = vad.stream()
+        silence = rtc.AudioFrame(data=bytes(320 * 2), sample_rate=16000, num_channels=1, samples_per_channel=320)
+        for _ in range(50):
+            stream.push_frame(silence)
+        stream.end_input()
+        async for _ in stream:
+            pass
+
+    try:
+        # prewarm runs before the process's event loop starts
+        asyncio.run(asyncio.wait_for(_run(), timeout=5.0))
+    except Exception as e:
+        logger.warning(f"VAD warm-up failed: {e}")
+
+
 def prewarm(proc: JobProcess):
     """
-    Preload resources before the agent session starts.
-    Here, we load a Voice Activity Detection (VAD) model once,
-    and store it in the process userdata for reuse.
+    Preload everything heavy before a call is assigned to this process:
+    Silero VAD (plus a warm-up inference), the turn detector, BVC noise
+    cancellation, the LLM/STT/TTS provider clients and the thinking-sound
+    clips, all kept in the process userdata for the session.
+    Logs how long each component took.
     """
-    proc.userdata["vad"] = silero.VAD.load(
+    timings: dict[str, float] = {}
+    vad = _timed(timings, "vad", lambda: silero.VAD.load(
         min_speech_duration=0.1,        # require 100ms of speech to start
         min_silence_duration=0.35,      # slightly longer pause before marking end
         prefix_padding_duration=0.2,    # small padding before speech start
@@ -44,7 +82,40 @@ def prewarm(proc: JobProcess):
         activation_threshold=0.6,       # stricter threshold = less false triggers
         sample_rate=16000,
         force_cpu=True
-    )
+    ))
+    _timed(timings, "vad_warmup", lambda: _warm_up_vad(vad))
+    proc.userdata["vad"] = vad
+    proc.userdata["turn_detector"] = _timed(timings, "turn_detector", lambda: turn_detector_model(TTS_PROVIDER))
+    proc.userdata["noise_cancellation"] = _timed(timings, "noise_cancellation", noise_cancellation.BVC)
+    proc.userdata["llm"] = _timed(timings, "llm", lambda: setup_llm(LLM_PROVIDER))
+    proc.userdata["stt"] = _timed(timings, "stt", lambda: setup_stt(STT_PROVIDER))
+    proc.userdata["tts"] = _timed(timings, "tts", lambda: setup_tts(TTS_PROVIDER))
+    proc.userdata["thinking_clips"] = _timed(timings, "thinking_clips", lambda: load_thinking_clips(TTS_PROVIDER))
+    proc.userdata["prewarm_timings"] = timings
+
+    report = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items())
+    logger.info(f"⏱️ Prewarm took {sum(timings.values()):.2f}s ({report})")
+
+
+async def warm_up_session(session: AgentSession) -> None:
+    """
+    Warm-up that needs a job context, run while the callee's phone rings:
+    provider clients open their connections and the turn detector runs one
+    inference in the worker's inference process.
+    """
+    started = time.perf_counter()
+    try:
+        for component in (session.llm, session.stt, session.tts):
+            if hasattr(component, "prewarm"):
+                component.prewarm()
+        turn_detector = session.turn_detection
+        if hasattr(turn_detector, "predict_end_of_turn"):
+            chat_ctx = ChatContext.empty()
+            chat_ctx.add_message(role="user", content="हाँ जी, बोलिए")
+            await turn_detector.predict_end_of_turn(chat_ctx)
+    except Exception as e:
+        logger.warning(f"Session warm-up failed: {e}")
+    logger.info(f"⏱️ Session warm-up took {(time.perf_counter() - started) * 1000:.0f}ms")
 
 
 # --------------------------
@@ -61,12 +132,14 @@ def setup_session(ctx: JobContext, setup_llm, setup_stt, setup_tts, LLM_PROVIDER
       - VAD (voice activity detection)
     """
 
+    # Models and provider clients come from prewarm; built here only if it did not run
+    userdata = ctx.proc.userdata
     session = AgentSession(
-        llm=setup_llm(LLM_PROVIDER),       # Use OpenAI LLM for responses
-        stt=setup_stt(STT_PROVIDER),               # Speech-to-Text provider
-        tts=setup_tts(TTS_PROVIDER),               # Text-to-Speech provider
-        turn_detection=turn_detector_model(TTS_PROVIDER),        # Handles multi-language turn-taking
-        vad=ctx.proc.userdata["vad"],              # Voice Activity Detection (loaded in prewarm)
+        llm=userdata.get("llm") or setup_llm(LLM_PROVIDER),       # Use OpenAI LLM for responses
+        stt=userdata.get("stt") or setup_stt(STT_PROVIDER),               # Speech-to-Text provider
+        tts=userdata.get("tts") or setup_tts(TTS_PROVIDER),               # Text-to-Speech provider
+        turn_detection=userdata.get("turn_detector") or turn_detector_model(TTS_PROVIDER),        # Handles multi-language turn-taking
+        vad=userdata["vad"],              # Voice Activity Detection (loaded in prewarm)
 
         # 🔽 Latency tuning — makes assistant feel more responsive
         min_endpointing_delay=0.25,        # Wait this long before deciding speech has ended
@@ -4,6 +4,12 @@ from livekit.plugins import groq, sarvam
 
 from helpers.config import LLM_PROVIDER, STT_PROVIDER, TTS_PROVIDER
 
+# Voice settings per TTS provider (also part of the TTS audio cache key)
+TTS_VOICE_SETTINGS = {
+    "sarvam_anushka": {"target_language_code": "hi-IN", "speaker": "anushka", "pace": 0.95},
+    "sarvam_manisha": {"target_language_code": "hi-IN", "speaker": "manisha", "pace": 0.95},
+}
+
 
 # --------------------------
 #   TTS (Text-to-Speech) Setup
@@ -30,20 +36,10 @@ def setup_tts(provider: str = TTS_PROVIDER):
     #         voice="bella",
     #         temperature=0.7
     #     )
-    if provider == "sarvam_anushka":
-        # Sarvam TTS with Hindi target language, speaker 'anushka'
-        return sarvam.TTS(
-            target_language_code="hi-IN",
-            speaker="anushka",
-            pace=0.95,
-            #enable_preprocessing=True,
-        )
-    elif provider == "sarvam_manisha":
-        # Sarvam TTS with Hindi target language, speaker 'manisha'
+    if provider in ("sarvam_anushka", "sarvam_manisha"):
+        # Sarvam TTS with Hindi target language, speaker 'anushka' / 'manisha'
         return sarvam.TTS(
-            target_language_code="hi-IN",
-            speaker="manisha",
-            pace=0.95,
+            **TTS_VOICE_SETTINGS[provider],
             #enable_preprocessing=True,
         )
     else:
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+from livekit import api
+from livekit.protocol.sip import (
+    CreateSIPOutboundTrunkRequest,
+    ListSIPOutboundTrunkRequest,
+    SIPOutboundTrunkInfo,
+)
+
+from helpers.config import SIP_TRUNK_CACHE_TTL
+from helpers.livekit_client import livekit_api
+
+logger = logging.getLogger("sip_trunks")
+
+
+@dataclass(frozen=True)
+class SIPTrunkSpec:
+    """An outbound carrier trunk, matched in LiveKit by `trunk_name` (created if missing)."""
+    trunk_name: str
+    address: str
+    number: str
+    auth_username: str
+    auth_password: str
+
+    def to_info(self) -> SIPOutboundTrunkInfo:
+        return SIPOutboundTrunkInfo(
+            name=self.trunk_name,
+            address=self.address,
+            numbers=[self.number],
+            auth_username=self.auth_username,
+            auth_password=self.auth_password,
+        )
+
+
+def load_trunk_specs() -> dict[str, SIPTrunkSpec]:
+    """Named trunks from the environment (read after the dialers' load_dotenv)."""
+    return {
+        "twilio": SIPTrunkSpec(
+            trunk_name=os.environ.get("TRUNK_NAME", "My outbound trunk"),
+            address=os.environ.get("TRUNK_ADDRESS", "livekit-sip-outbound-trunk.pstn.twilio.com"),
+            number=os.environ.get("TRUNK_NUMBER", "+17473503389"),
+            auth_username=os.environ.get("TRUNK_USERNAME", ""),
+            auth_password=os.environ.get("TRUNK_PASSWORD", ""),
+        ),
+        "tata": SIPTrunkSpec(
+            trunk_name=os.environ.get("TATA_TRUNK_NAME", "tata-sip"),
+            address=os.environ.get("TATA_TRUNK_ADDRESS", "27.107.220.6:5101"),
+            number=os.environ.get("TATA_TRUNK_NUMBER", "00919240908350"),
+            auth_username=os.environ.get("TATA_TRUNK_USERNAME", "00919240908350"),
+            auth_password=os.environ.get("TATA_TRUNK_PASSWORD", "1234"),
+        ),
+    }
+
+
+# --------------------------
+#   Trunk Registry
+# --------------------------
+
+class SIPTrunkRegistry:
+    """
+    Resolves named trunks to LiveKit trunk IDs once and caches them for `ttl`
+    seconds, so dials skip the list_sip_outbound_trunk round-trip. A single
+    listing fills the cache for every known trunk; a failed dial invalidates
+    its trunk so the next call re-resolves it.
+    """
+
+    def __init__(self, specs: dict[str, SIPTrunkSpec] | None = None, ttl: float = SIP_TRUNK_CACHE_TTL):
+        self._specs = specs
+        self.ttl = ttl
+        self._ids: dict[str, tuple[str, float]] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def specs(self) -> dict[str, SIPTrunkSpec]:
+        if self._specs is None:
+            self._specs = load_trunk_specs()
+        return self._specs
+
+    def spec(self, name: str) -> SIPTrunkSpec:
+        try:
+            return self.specs[name]
+        except KeyError:
+            raise KeyError(f"Unknown SIP trunk '{name}' (known: {', '.join(self.specs)})") from None
+
+    def _cached(self, name: str) -> str | None:
+        entry = self._ids.get(name)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    async def resolve(self, name: str) -> str:
+        """LiveKit trunk ID for `name`, creating the trunk if it does not exist."""
+        trunk_id = self._cached(name)
+        if trunk_id:
+            return trunk_id
+        spec = self.spec(name)
+        async with self._lock:
+            # another dial may have resolved it while we waited
+            trunk_id = self._cached(name)
+            if trunk_id:
+                return trunk_id
+
+            logger.info(f"🔄 Resolving SIP trunk '{name}'...")
+            expires = time.monotonic() + self.ttl
+            async with livekit_api() as lkapi:
+                response = await lkapi.sip.list_sip_outbound_trunk(ListSIPOutboundTrunkRequest())
+                by_name = {t.name: t.sip_trunk_id for t in getattr(response, "trunks", [])}
+                for key, other in self.specs.items():
+                    if other.trunk_name in by_name:
+                        self._ids[key] = (by_name[other.trunk_name], expires)
+
+                trunk_id = self._cached(name)
+                if trunk_id:
+                    logger.info(f"✅ Using existing trunk '{name}': {trunk_id}")
+                    return trunk_id
+
+                logger.info(f"📞 No trunk named '{spec.trunk_name}', creating it...")
+                created = await lkapi.sip.create_sip_outbound_trunk(CreateSIPOutboundTrunkRequest(trunk=spec.to_info()))
+                self._ids[name] = (created.sip_trunk_id, expires)
+                logger.info(f"✅ Created new trunk '{name}': {created.sip_trunk_id}")
+                return created.sip_trunk_id
+
+    def invalidate(self, name: str) -> None:
+        if self._ids.pop(name, None):
+            logger.info(f"♻️ Dropped cached ID for SIP trunk '{name}'")
+
+    def invalidate_on_error(self, name: str, error: Exception) -> None:
+        """
+        Invalidate after a failed dial, unless the callee's side answered with a
+        SIP status (busy, no answer, ...), which says nothing about the trunk.
+        """
+        if _sip_status(error) is None:
+            self.invalidate(name)
+
+
+def _sip_status(error: Exception) -> int | None:
+    metadata = getattr(error, "metadata", None) or {}
+    if isinstance(error, api.TwirpError) and "sip_status_code" in metadata:
+        try:
+            return int(metadata["sip_status_code"])
+        except ValueError:
+            return None
+    return None
+
+
+def dial_outcome(error: Exception) -> str:
+    """
+    Trunk-pool outcome for a dial that raised: callee-side 4xx/6xx statuses
+    (busy, declined, no answer) are "no_answer", everything else "failed".
+    """
+    status = _sip_status(error)
+    if status is not None and (400 <= status < 500 or status >= 600) and status not in (401, 403, 407):
+        return "no_answer"
+    return "failed"
+
+
+# Process-wide registry shared by all dialers and the API server
+TRUNK_REGISTRY = SIPTrunkRegistry()
@@ -0,0 +1,141 @@
+import asyncio
+import contextlib
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+logger = logging.getLogger("trunk_pool")
+
+# Health is an EWMA of dial outcomes: answered calls count fully, unanswered
+# ones partly (the carrier delivered the call), trunk/carrier errors not at all
+OUTCOME_SCORES = {"answered": 1.0, "no_answer": 0.6, "failed": 0.0}
+HEALTH_ALPHA = 0.2
+MIN_HEALTH = 0.3          # below this a trunk only gets traffic when no other trunk can take it
+HEALTH_RECOVERY = 300.0   # seconds for a degraded score to drift most of the way back to 1.0
+
+
+@dataclass
+class TrunkState:
+    """Capacity limits and live load/health of one carrier trunk."""
+    name: str
+    max_channels: int
+    max_cps: float
+    active: int = 0
+    health: float = 1.0
+    answered: int = 0
+    no_answer: int = 0
+    failed: int = 0
+    updated_at: float = 0.0
+    dials: deque = field(default_factory=deque)
+
+    def effective_health(self, now: float) -> float:
+        """Health drifting back towards 1.0 while the trunk gets no traffic, so it is retried."""
+        if not self.updated_at:
+            return self.health
+        recovered = 1.0 - math.exp(-(now - self.updated_at) / HEALTH_RECOVERY)
+        return self.health + (1.0 - self.health) * recovered
+
+    def dials_last_second(self, now: float) -> int:
+        while self.dials and now - self.dials[0] >= 1.0:
+            self.dials.popleft()
+        return len(self.dials)
+
+    def available(self, now: float) -> bool:
+        return self.active < self.max_channels and self.dials_last_second(now) < self.max_cps
+
+    def answer_rate(self) -> float | None:
+        total = self.answered + self.no_answer + self.failed
+        return self.answered / total if total else None
+
+    def failure_rate(self) -> float | None:
+        total = self.answered + self.no_answer + self.failed
+        return self.failed / total if total else None
+
+
+# --------------------------
+#   Trunk Pool
+# --------------------------
+
+class SIPTrunkPool:
+    """
+    Spreads outbound calls over several carrier trunks.
+
+    A call holds a channel on its trunk from dial to hangup (`channel()`).
+    Each dial goes to the least-loaded healthy trunk that has a free channel
+    and calls-per-second budget; dial outcomes (`record()`) update the trunk's
+    health score so traffic shifts away from a degraded carrier.
+    """
+
+    def __init__(self, limits: dict[str, dict], clock: Callable[[], float] = time.monotonic):
+        self.trunks = {name: TrunkState(name=name, **cfg) for name, cfg in limits.items()}
+        self._clock = clock
+        self._changed = asyncio.Condition()
+
+    def pick(self) -> str | None:
+        """Trunk for the next dial, or None if every trunk is at its channel/CPS limit."""
+        now = self._clock()
+        candidates = [t for t in self.trunks.values() if t.available(now)]
+        if not candidates:
+            return None
+        healthy = [t for t in candidates if t.effective_health(now) >= MIN_HEALTH] or candidates
+        best = min(healthy, key=lambda t: (t.active + 1) / (t.max_channels * max(t.effective_health(now), 0.01)))
+        return best.name
+
+    def _take(self, name: str) -> None:
+        trunk = self.trunks[name]
+        trunk.active += 1
+        trunk.dials.append(self._clock())
+
+    async def _release(self, name: str) -> None:
+        self.trunks[name].active -= 1
+        async with self._changed:
+            self._changed.notify_all()
+
+    @asynccontextmanager
+    async def channel(self, trunk: str | None = None) -> AsyncIterator[str]:
+        """
+        Hold a channel for one call (dial through hangup) and yield the trunk
+        name. Waits while every trunk is busy; `trunk` pins a specific one.
+        """
+        while True:
+            if trunk:
+                name = trunk if self.trunks[trunk].available(self._clock()) else None
+            else:
+                name = self.pick()
+            if name:
+                break
+            # released channels notify; CPS budgets free up on their own
+            async with self._changed, contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._changed.wait(), timeout=0.2)
+        self._take(name)
+        try:
+            yield name
+        finally:
+            await self._release(name)
+
+    def record(self, name: str, outcome: str) -> None:
+        """Feed a dial outcome ("answered", "no_answer", "failed") into the trunk's health."""
+        trunk = self.trunks[name]
+        now = self._clock()
+        setattr(trunk, outcome, getattr(trunk, outcome) + 1)
+        trunk.health = (1 - HEALTH_ALPHA) * trunk.effective_health(now) + HEALTH_ALPHA * OUTCOME_SCORES[outcome]
+        trunk.updated_at = now
+        if trunk.health < MIN_HEALTH and outcome == "failed":
+            logger.warning(f"⚠️ Trunk '{name}' degraded (health {trunk.health:.2f}), shifting traffic away")
+
+    def stats(self) -> dict[str, dict]:
+        now = self._clock()
+        return {
+            name: {
+                "active": t.active,
+                "max_channels": t.max_channels,
+                "health": round(t.effective_health(now), 3),
+                "answer_rate": t.answer_rate(),
+                "failure_rate": t.failure_rate(),
+            }
+            for name, t in self.trunks.items()
+        }
@@ -62,38 +62,57 @@ class CostCalculator:
         }
 
     # --------------------------
-    #   LLM Cost Calculation
+    #   Rate Lookups (no event recording)
     # --------------------------
 
-    def calculate_llm_cost(self, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
-        """
-        Calculate cost for LLM usage:
-          - prompt_tokens = tokens in the prompt
-          - cached_tokens = tokens reused from cache (cheaper)
-          - completion_tokens = tokens generated in response
-        """
-        # input_rate = self.llm_config.get(self.llm_provider, {}).get("rate", 0.0)
-
-        # # Load rates (fallbacks in case not defined)
-        # input_rate = self.llm_config.get("input_rate", 0.0)
-        # cached_rate = self.llm_config.get("cached_input_rate", input_rate)
-        # output_rate = self.llm_config.get("output_rate", 0.0)
-
+    def llm_cost(self, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+        """Raw LLM cost for a token count, without recording an event."""
         cfg = self.llm_config.get(self.llm_provider, {})
 
         input_rate = cfg.get("input_rate", 0.0)
         cached_rate = cfg.get("cached_input_rate", input_rate)
         output_rate = cfg.get("output_rate", 0.0)
 
-
-
         # Apply cost formula
-        cost = (
+        return (
             (prompt_tokens - cached_tokens) * input_rate +   # normal input
             cached_tokens * cached_rate +                   # cached input
             completion_tokens * output_rate                 # output tokens
         )
 
+    def stt_cost(self, seconds: float) -> float:
+        """Raw STT cost for seconds of audio, without recording an event."""
+        return seconds * self.stt_config.get(self.stt_provider, {}).get("rate", 0.0)
+
+    def tts_cost(self, characters: int = 0, seconds: float = 0.0, input_tokens: int = 0) -> float:
+        """Raw TTS cost, without recording an event."""
+        cfg = self.tts_config.get(self.tts_provider, {})
+        cost = 0.0
+
+        # Apply different pricing models depending on provider
+        if "rate_per_character" in cfg:
+            cost += characters * cfg["rate_per_character"]
+        if "rate_per_second" in cfg:
+            cost += seconds * cfg["rate_per_second"]
+        if "rate_per_input_token" in cfg:
+            cost += input_tokens * cfg["rate_per_input_token"]
+        if "rate_per_output_second" in cfg:
+            cost += seconds * cfg["rate_per_output_second"]
+        return cost
+
+    # --------------------------
+    #   LLM Cost Calculation
+    # --------------------------
+
+    def calculate_llm_cost(self, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+        """
+        Calculate cost for LLM usage:
+          - prompt_tokens = tokens in the prompt
+          - cached_tokens = tokens reused from cache (cheaper)
+          - completion_tokens = tokens generated in response
+        """
+        cost = self.llm_cost(prompt_tokens, cached_tokens, completion_tokens)
+
         # Record the event with timestamp
         self.events["llm"].append({
             "prompt_tokens": prompt_tokens,
@@ -116,7 +135,7 @@ class CostCalculator:
 
         # Rate depends on the provider
         rate = self.stt_config.get(self.stt_provider, {}).get("rate", 0.0)
-        cost = seconds * rate
+        cost = self.stt_cost(seconds)
 
         # Record the event with timestamp
         self.events["stt"].append({
@@ -141,18 +160,7 @@ class CostCalculator:
           - input_tokens = tokens sent for synthesis (if provider charges this way)
         """
 
-        cfg = self.tts_config.get(self.tts_provider, {})
-        cost = 0.0
-
-        # Apply different pricing models depending on provider
-        if "rate_per_character" in cfg:
-            cost += characters * cfg["rate_per_character"]
-        if "rate_per_second" in cfg:
-            cost += seconds * cfg["rate_per_second"]
-        if "rate_per_input_token" in cfg:
-            cost += input_tokens * cfg["rate_per_input_token"]
-        if "rate_per_output_second" in cfg:
-            cost += seconds * cfg["rate_per_output_second"]
+        cost = self.tts_cost(characters, seconds, input_tokens)
 
         # Record the event with UTC timestamp
         self.events["tts"].append({
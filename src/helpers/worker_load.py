@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+
+import psutil
+
+from helpers.config import (
+    AGENT_LOAD_THRESHOLD,
+    AGENT_SESSION_CAPACITY,
+    IDLE_PROCESSES_MAX,
+    IDLE_PROCESSES_MIN,
+    LOOP_LAG_BUDGET,
+)
+from helpers.metrics_registry import REGISTRY, collect_snapshots, gauge_max
+
+logger = logging.getLogger("worker_load")
+
+CPU_ALPHA = 0.3           # EWMA weight of the latest CPU sample
+LAG_SAMPLE_INTERVAL = 0.25  # seconds between event-loop lag probes in a job process
+LAG_WINDOW = 40           # probes kept for the reported lag (~10s)
+LAG_CACHE_TTL = 2.0       # seconds the worker reuses the jobs' reported lag
+
+
+# --------------------------
+#   Loop Lag (job processes)
+# --------------------------
+
+async def monitor_loop_lag(interval: float = LAG_SAMPLE_INTERVAL) -> None:
+    """
+    Measure how late this job's event loop wakes up and publish the worst
+    recent value as the `voice_agent_loop_lag_seconds` gauge.
+    """
+    recent: deque[float] = deque(maxlen=LAG_WINDOW)
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            recent.append(max(0.0, loop.time() - started - interval))
+            REGISTRY.set_gauge("voice_agent_loop_lag_seconds", max(recent))
+            REGISTRY.flush()
+    finally:
+        REGISTRY.set_gauge("voice_agent_loop_lag_seconds", 0.0)
+
+
+# --------------------------
+#   Load Score (worker)
+# --------------------------
+
+class WorkerLoad:
+    """
+    Load score for LiveKit's job acceptance (`WorkerOptions.load_fnc`).
+
+    The score is the highest of:
+      - sessions / capacity (capacity from AGENT_SESSIONS_PER_CORE x cores)
+      - CPU projected with one more session (smoothed CPU + CPU per session)
+      - worst event-loop lag across job processes / LOOP_LAG_BUDGET
+    The worker stops taking jobs once it crosses AGENT_LOAD_THRESHOLD.
+    """
+
+    def __init__(
+        self,
+        capacity: int = AGENT_SESSION_CAPACITY,
+        lag_budget: float = LOOP_LAG_BUDGET,
+        cpu_probe: Callable[[], float] | None = None,
+        lag_probe: Callable[[], float] | None = None,
+    ):
+        self.capacity = capacity
+        self.lag_budget = lag_budget
+        self._cpu_probe = cpu_probe or (lambda: psutil.cpu_percent(interval=None) / 100)
+        self._lag_probe = lag_probe or self._reported_lag
+        self._cpu: float | None = None
+        self._lag = (0.0, float("-inf"))    # (value, measured at)
+        self._accepting = True
+        self.last: dict = {}
+
+    def _reported_lag(self) -> float:
+        value, at = self._lag
+        if time.monotonic() - at > LAG_CACHE_TTL:
+            value = gauge_max(collect_snapshots(include_self=False), "voice_agent_loop_lag_seconds")
+            self._lag = (value, time.monotonic())
+        return value
+
+    def score(self, active_sessions: int) -> float:
+        sample = self._cpu_probe()
+        self._cpu = sample if self._cpu is None else (1 - CPU_ALPHA) * self._cpu + CPU_ALPHA * sample
+        per_session = self._cpu / active_sessions if active_sessions else 0.0
+        lag = self._lag_probe()
+
+        self.last = {
+            "sessions": active_sessions / self.capacity if self.capacity else 1.0,
+            "cpu": min(1.0, self._cpu + per_session),
+            "loop_lag": lag / self.lag_budget,
+        }
+        load = min(1.0, max(self.last.values()))
+        REGISTRY.set_gauge("voice_agent_worker_load", load)
+        return load
+
+    def __call__(self, worker=None) -> float:
+        """`load_fnc` entry point; LiveKit passes the Worker."""
+        active = len(worker.active_jobs) if worker is not None else 0
+        load = self.score(active)
+        accepting = load < AGENT_LOAD_THRESHOLD
+        if accepting != self._accepting:
+            self._accepting = accepting
+            if accepting:
+                logger.info(f"✅ Worker load {load:.0%}, accepting jobs again")
+            else:
+                reason = max(self.last, key=self.last.get)
+                logger.warning(f"🔥 Worker load {load:.0%} ({reason}), not accepting new jobs")
+        return load
+
+
+# --------------------------
+#   Idle Process Pool (worker)
+# --------------------------
+
+class IdlePoolTarget:
+    """
+    Prewarmed idle job processes this worker keeps, sized from dialer demand.
+
+    LiveKit's ProcPool takes `WorkerOptions.num_idle_processes` as a fixed
+    ceiling when the worker is built and never warms more than that. On every
+    load tick the worker then passes the option's current value to the pool
+    as its target (lowered further when spare load is short). So the options
+    are built with `ceiling`, and `apply` moves the option below it from the
+    load tick, once the pool exists.
+    """
+
+    def __init__(self, ceiling: int = IDLE_PROCESSES_MAX):
+        self.ceiling = ceiling
+        # LiveKit's own default until the control server reports demand
+        self.target = min(ceiling, os.cpu_count() or 1, 4)
+
+    def resize(self, target: int) -> None:
+        """Heartbeat callback with the control server's target for this worker."""
+        self.target = min(self.ceiling, max(IDLE_PROCESSES_MIN, target))
+
+    def apply(self, worker_options) -> None:
+        """Called from `load_fnc`, right before the worker reads the pool target."""
+        worker_options.num_idle_processes = self.target
@@ -0,0 +1,95 @@
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+
+from helpers.config import WORKER_STALE_AFTER
+
+
+@dataclass
+class WorkerInfo:
+    worker_id: str
+    host: str
+    pid: int
+    capacity: int
+    active_sessions: int = 0
+    agent_name: str = ""
+    last_seen: float = 0.0
+    # calls routed here whose session has not shown up yet: call_id -> room name
+    reserved: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def free_slots(self) -> int:
+        return max(0, self.capacity - self.active_sessions - len(self.reserved))
+
+    @property
+    def load(self) -> float:
+        return (self.active_sessions + len(self.reserved)) / self.capacity if self.capacity else 1.0
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "load": round(self.load, 3)}
+
+
+class WorkerRegistry:
+    """
+    Agent workers known to the control server, kept from their heartbeats.
+    Answers liveness and capacity from memory; workers silent for longer
+    than `stale_after` are treated as gone.
+    """
+
+    def __init__(self, stale_after: float = WORKER_STALE_AFTER, clock: Callable[[], float] = time.time):
+        self.stale_after = stale_after
+        self._clock = clock
+        self._workers: dict[str, WorkerInfo] = {}
+
+    def heartbeat(
+        self,
+        worker_id: str,
+        host: str,
+        pid: int,
+        capacity: int,
+        active_sessions: int,
+        agent_name: str = "",
+        rooms: list[str] | None = None,
+    ) -> WorkerInfo:
+        """Record a heartbeat; reservations are kept until their room shows up in `rooms`."""
+        previous = self._workers.get(worker_id)
+        live_rooms = set(rooms or ())
+        reserved = {
+            call_id: room
+            for call_id, room in (previous.reserved.items() if previous else ())
+            if room not in live_rooms
+        }
+        self._workers[worker_id] = WorkerInfo(
+            worker_id=worker_id,
+            host=host,
+            pid=pid,
+            capacity=capacity,
+            active_sessions=active_sessions,
+            agent_name=agent_name,
+            last_seen=self._clock(),
+            reserved=reserved,
+        )
+        return self._workers[worker_id]
+
+    def alive(self) -> list[WorkerInfo]:
+        cutoff = self._clock() - self.stale_after
+        for worker_id in [w.worker_id for w in self._workers.values() if w.last_seen < cutoff]:
+            del self._workers[worker_id]
+        return list(self._workers.values())
+
+    def total_capacity(self) -> int:
+        return sum(w.capacity for w in self.alive())
+
+    def least_loaded(self) -> WorkerInfo | None:
+        """Alive worker with a free slot and the lowest load, or None."""
+        candidates = [w for w in self.alive() if w.free_slots > 0]
+        return min(candidates, key=lambda w: w.load, default=None)
+
+    def reserve(self, worker_id: str, call_id: str, room_name: str) -> None:
+        """Count a call routed to this worker until its session is reported or the call ends."""
+        if worker_id in self._workers:
+            self._workers[worker_id].reserved[call_id] = room_name
+
+    def release(self, worker_id: str | None, call_id: str) -> None:
+        if worker_id in self._workers:
+            self._workers[worker_id].reserved.pop(call_id, None)
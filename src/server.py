@@ -118,15 +118,33 @@
 
 
 import asyncio
+import contextlib
 import logging
 import os
+import uuid
 from typing import Optional
 
-import psutil
-from fastapi import BackgroundTasks, Depends, FastAPI, Header, HTTPException, status
+from fastapi import (
+    BackgroundTasks,
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    status,
+)
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
-from custom_call import run_calls_api  # Your actual call logic here
+from custom_call import DIAL_PACER, run_calls_api  # Your actual call logic here
+from helpers.call_lifecycle import CALL_TRACKER
+from helpers.call_registry import FINAL_STATES, CallRegistry
+from helpers.dial_demand import DialerDemand
+from helpers.event_stream import EventBroadcaster, format_sse
+from helpers.livekit_client import close_livekit_api
+from helpers.metrics_registry import REGISTRY, render_openmetrics
+from helpers.worker_registry import WorkerRegistry
 
 # ==============================
 # APP CONFIG
@@ -138,17 +156,32 @@ logging.basicConfig(level=logging.INFO)
 
 API_KEY = os.getenv("VOICE_AGENT_API_KEY", "supersecret123")
 AGENT_SCRIPT_NAME = "src/agent.py"
-MAX_CONCURRENT_CALLS = 2
+MAX_BATCH_SIZE = 500
 
-# Semaphore for limiting concurrent calls
-call_semaphore = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+# Point the LiveKit project's webhook URL at /livekit/webhook and set this,
+# so call completion comes from webhooks instead of room observers/polling
+LIVEKIT_WEBHOOKS_ENABLED = os.getenv("LIVEKIT_WEBHOOKS_ENABLED", "0") == "1"
+if LIVEKIT_WEBHOOKS_ENABLED:
+    CALL_TRACKER.enable_webhooks()
 
-# In-memory storage for latest call status
-latest_call_status = {
-    "status": "idle",  # idle, initiated, in_progress, completed, failed
-    "number": None,
-    "name": None,
-}
+# Status of every call placed through this server, keyed by call ID
+CALLS = CallRegistry()
+
+# Agent workers, from their heartbeats (liveness, capacity, live sessions)
+WORKERS = WorkerRegistry()
+
+# Pending and recent dials from every dialer, for the workers' warm process pools
+DEMAND = DialerDemand()
+
+# Call transitions and live turn latency pushed to /events subscribers
+EVENTS = EventBroadcaster()
+CALLS.add_listener(lambda call: EVENTS.publish("call", call.to_dict()))
+
+# Woken whenever a call finishes, so queued calls can take its slot
+call_slot_freed = asyncio.Condition()
+
+# Batch calls run as plain tasks (BackgroundTasks would run them one by one)
+_background_calls: set[asyncio.Task] = set()
 
 
 # ==============================
@@ -166,23 +199,65 @@ def verify_api_key(x_api_key: str = Header(None)):
 # ==============================
 # AGENT STATUS CHECK
 # ==============================
+class WorkerHeartbeat(BaseModel):
+    worker_id: str
+    host: str
+    pid: int
+    capacity: int
+    active_sessions: int = 0
+    agent_name: str = ""
+    rooms: list[str] = []
+
+
+@app.post("/workers/heartbeat", dependencies=[Depends(verify_api_key)])
+async def worker_heartbeat(hb: WorkerHeartbeat):
+    """
+    Liveness, capacity and live sessions reported by agent workers (helpers/heartbeat).
+    Replies with how many prewarmed idle processes the worker should keep.
+    """
+    worker = WORKERS.heartbeat(**hb.dict())
+    # this server's own queue: calls waiting for a worker slot or for dial pacing
+    queued, _ = CALLS.list(status="initiated", limit=0)
+    DEMAND.report("server", pending=queued + DIAL_PACER.waiting, dialed=DIAL_PACER.dialed)
+    idle = min(DEMAND.idle_target(len(WORKERS.alive())), worker.capacity)
+    return {"status": "ok", "idle_processes": idle}
+
+
+class DialerReport(BaseModel):
+    dialer_id: str
+    pending: int
+    dialed: int
+
+
+@app.post("/dialer/demand", dependencies=[Depends(verify_api_key)])
+async def dialer_demand(report: DialerReport):
+    """Queue depth and running dial count from CLI campaign dialers (custom_call.py)."""
+    DEMAND.report(report.dialer_id, report.pending, report.dialed)
+    return {"status": "ok"}
+
+
 def _is_agent_running() -> Optional[int]:
-    """Check if agent.py is running and return PID if found."""
-    for proc in psutil.process_iter(["pid", "cmdline"]):
-        try:
-            cmdline = proc.info["cmdline"]
-            if cmdline and "agent.py" in " ".join(cmdline):
-                return proc.info["pid"]
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-    return None
+    """PID of a live agent worker (answered from heartbeats, no process scan)."""
+    workers = WORKERS.alive()
+    return workers[0].pid if workers else None
+
+
+def _call_capacity() -> int:
+    """Concurrent calls the live agent workers can take."""
+    return WORKERS.total_capacity()
 
 
 @app.get("/agent-status", dependencies=[Depends(verify_api_key)])
 async def agent_status():
-    """Return whether the agent is running."""
-    pid = _is_agent_running()
-    return {"running": pid is not None, "pid": pid}
+    """Return whether an agent worker is running, plus every live worker's load."""
+    workers = WORKERS.alive()
+    return {
+        "running": bool(workers),
+        "pid": workers[0].pid if workers else None,
+        "capacity": sum(w.capacity for w in workers),
+        "workers": [w.to_dict() for w in workers],
+        "demand": DEMAND.stats(),
+    }
 
 
 # ==============================
@@ -196,60 +271,149 @@ class CallRequest(BaseModel):
     room_name: Optional[str] = "voice_agent_room"
 
 
-@app.post("/call", dependencies=[Depends(verify_api_key)])
-async def start_call(req: CallRequest, background_tasks: BackgroundTasks):
-    """Initiate a call if agent is running and concurrency limit allows."""
-    pid = _is_agent_running()
-    if not pid:
+class BatchCallRequest(BaseModel):
+    calls: list[CallRequest]
+
+
+def _call_room(req: CallRequest, call_id: str) -> str:
+    """Each call gets its own room unless the client named one explicitly."""
+    if req.room_name and "room_name" in req.__fields_set__:
+        return req.room_name
+    return f"call-{call_id}"
+
+
+def _require_agent() -> None:
+    if not _is_agent_running():
         raise HTTPException(
             status_code=400, detail="Agent not running. Please start agent manually."
         )
 
-    # Check concurrency limit
-    if call_semaphore.locked() and call_semaphore._value <= 0:
+
+@app.post("/call", dependencies=[Depends(verify_api_key)])
+async def start_call(req: CallRequest, background_tasks: BackgroundTasks):
+    """Initiate a call if agent is running and worker capacity allows."""
+    _require_agent()
+
+    # Check concurrency limit (sessions the agent workers can carry)
+    capacity = _call_capacity()
+    if CALLS.active_count() >= capacity:
         raise HTTPException(
             status_code=429,
-            detail=f"Maximum {MAX_CONCURRENT_CALLS} concurrent calls allowed. Try again later.",
+            detail=f"Maximum {capacity} concurrent calls allowed. Try again later.",
         )
 
-    latest_call_status.update(
-        {"status": "initiated", "number": req.number, "name": req.name}
-    )
-    background_tasks.add_task(_run_call_background, req.dict())
-    return {"status": "initiated", "details": req.dict()}
+    # Every worker reports itself full (e.g. campaign calls from the CLI dialers)
+    if WORKERS.least_loaded() is None:
+        raise HTTPException(status_code=429, detail="All agent workers are busy. Try again later.")
 
+    # Shared dial pacing (also used by campaign runs in this process) is backing off
+    if DIAL_PACER.saturated():
+        raise HTTPException(
+            status_code=429,
+            detail=f"Dialing is paced at {int(DIAL_PACER.limit)} concurrent calls right now. Try again later.",
+        )
 
-async def _run_call_background(payload: dict):
-    """Run the call asynchronously with concurrency control."""
-    async with call_semaphore:
-        # Safely extract values with defaults
-        number = str(payload.get("number", ""))
-        name = str(payload.get("name", "Unknown"))
-        gender = str(payload.get("gender", "male"))  # default to male
-        room_name = str(payload.get("room_name", number))
-        do_record = bool(payload.get("record", False))
+    call = CALLS.create(req.number, req.name, gender=req.gender or "male", record=bool(req.record))
+    call.room_name = _call_room(req, call.call_id)
+    background_tasks.add_task(_run_call_background, call.call_id)
+    return {"status": "initiated", "call_id": call.call_id, "room_name": call.room_name, "details": req.dict()}
+
+
+@app.post("/calls/batch", dependencies=[Depends(verify_api_key)])
+async def start_batch(req: BatchCallRequest):
+    """Queue many calls at once; they start as worker capacity and dial pacing allow."""
+    _require_agent()
+    if not req.calls or len(req.calls) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=422, detail=f"A batch takes 1 to {MAX_BATCH_SIZE} calls.")
+
+    batch_id = uuid.uuid4().hex[:12]
+    call_ids = []
+    for item in req.calls:
+        call = CALLS.create(item.number, item.name, batch_id=batch_id, gender=item.gender or "male", record=bool(item.record))
+        call.room_name = _call_room(item, call.call_id)
+        task = asyncio.create_task(_run_call_background(call.call_id))
+        _background_calls.add(task)
+        task.add_done_callback(_background_calls.discard)
+        call_ids.append(call.call_id)
+
+    logger.info(f"📦 Batch {batch_id} queued with {len(call_ids)} calls")
+    return {"status": "queued", "batch_id": batch_id, "call_ids": call_ids}
+
+
+async def _wait_for_call_slot() -> None:
+    """Block until fewer calls are active than the workers can carry."""
+    while CALLS.active_count() >= _call_capacity() or WORKERS.least_loaded() is None:
+        # capacity can also change without a call finishing (workers start/stop)
+        async with call_slot_freed, contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(call_slot_freed.wait(), timeout=1.0)
+
+
+async def _run_call_background(call_id: str):
+    """Run the call asynchronously once a worker slot is free."""
+    call = CALLS.get(call_id)
+    await _wait_for_call_slot()
+    # Route to the least-loaded worker; explicit dispatch needs workers started with AGENT_NAME
+    worker = WORKERS.least_loaded()
+    WORKERS.reserve(worker.worker_id, call_id, call.room_name)
+    call.worker_id = worker.worker_id
+    CALLS.transition(call_id, "dialing")
+
+    REGISTRY.add_gauge("voice_agent_active_calls", 1)
+    try:
+        logger.info(f"📞 Starting call {call_id}: {call.number} for {call.name}")
+
+        result = await run_calls_api(
+            name=call.name,
+            gender=call.gender,
+            phone_number=call.number,
+            room_name=call.room_name,
+            do_record=call.record,
+            on_answered=lambda: CALLS.transition(call_id, "in_progress"),
+            agent_name=worker.agent_name or None,
+        )
 
-        try:
-            logger.info(f"📞 Starting call: {number} for {name}")
-            latest_call_status.update({"status": "in_progress", "number": number, "name": name})
+        final = "completed" if result.get("status") == "completed" else "failed"
+        logger.info(f"✅ Call {call_id} {final}: {result}")
+        CALLS.transition(call_id, final, result=result, error=result.get("reason") or result.get("exception"))
+        REGISTRY.inc("voice_agent_calls_total", status=final)
 
-            result = await run_calls_api(
-                name=name,
-                gender=gender,
-                phone_number=number,
-                room_name=room_name,
-                do_record=do_record,
-            )
+    except Exception as e:
+        logger.exception(f"❌ Call {call_id} failed for {call.number}: {e}")
+        if call.status not in FINAL_STATES:
+            CALLS.transition(call_id, "failed", error=str(e))
+        REGISTRY.inc("voice_agent_calls_total", status="failed")
 
-            logger.info(f"✅ Call completed: {result}")
-            latest_call_status.update({"status": "completed", "number": number, "name": name})
+    finally:
+        WORKERS.release(call.worker_id, call_id)
+        REGISTRY.add_gauge("voice_agent_active_calls", -1)
+        async with call_slot_freed:
+            call_slot_freed.notify_all()
+        logger.info(f"🔚 Call {call_id} finished for {call.number}")
 
-        except Exception as e:
-            logger.exception(f"❌ Call failed for {number}: {e}")
-            latest_call_status.update({"status": "failed", "number": number, "name": name})
 
-        finally:
-            logger.info(f"🔚 Call finished for {number}")
+# ==============================
+# CALL STATUS
+# ==============================
+@app.get("/calls", dependencies=[Depends(verify_api_key)])
+async def list_calls(
+    status: Optional[str] = Query(None, description="initiated, dialing, in_progress, completed or failed"),
+    batch_id: Optional[str] = None,
+    number: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Calls placed through this server, newest first."""
+    calls, total = CALLS.list(status=status, batch_id=batch_id, number=number, offset=offset, limit=limit)
+    return {"total": total, "offset": offset, "limit": limit, "items": [c.to_dict() for c in calls]}
+
+
+@app.get("/calls/{call_id}", dependencies=[Depends(verify_api_key)])
+async def get_call(call_id: str):
+    """One call's state, timestamps and result."""
+    call = CALLS.get(call_id)
+    if call is None:
+        raise HTTPException(status_code=404, detail="Unknown call ID.")
+    return call.to_dict()
 
 
 # ==============================
@@ -257,8 +421,75 @@ async def _run_call_background(payload: dict):
 # ==============================
 @app.get("/latest-call-status", dependencies=[Depends(verify_api_key)])
 async def latest_call():
-    """Return the latest call status for frontend polling."""
-    return latest_call_status
+    """Return the most recently updated call (kept for the frontend)."""
+    call = CALLS.latest()
+    if call is None:
+        return {"status": "idle", "number": None, "name": None}
+    return {"status": call.status, "number": call.number, "name": call.name, "call_id": call.call_id}
+
+
+# ==============================
+# EVENT STREAM
+# ==============================
+class TurnReport(BaseModel):
+    room_name: str
+    speech_id: Optional[str] = None
+    latency_seconds: float
+    eou_delay: Optional[float] = None
+    llm_ttft: Optional[float] = None
+    tts_ttfb: Optional[float] = None
+
+
+@app.get("/events", dependencies=[Depends(verify_api_key)])
+async def event_stream(recent: int = Query(20, ge=0, le=200)):
+    """
+    Server-sent events: `call` on every state transition, `turn` with live
+    per-turn latency. The `recent` latest calls are sent first as a snapshot.
+    """
+    calls, _ = CALLS.list(limit=recent)
+    initial = [format_sse("call", call.to_dict()) for call in reversed(calls)]
+    return StreamingResponse(
+        EVENTS.stream(initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/events/turn", dependencies=[Depends(verify_api_key)])
+async def report_turn(report: TurnReport):
+    """Per-turn latency reported by agent jobs (helpers/control_client)."""
+    turn = report.dict()
+    call = CALLS.find_by_room(report.room_name)
+    if call is not None:
+        call.last_turn = turn
+    EVENTS.publish("turn", {"call_id": call.call_id if call else None, **turn})
+    return {"status": "ok"}
+
+
+# ==============================
+# LIVEKIT WEBHOOKS
+# ==============================
+@app.post("/livekit/webhook")
+async def livekit_webhook(request: Request):
+    """Receive LiveKit room events (signed with the project's API secret)."""
+    if not LIVEKIT_WEBHOOKS_ENABLED:
+        raise HTTPException(status_code=404, detail="Webhooks are not enabled.")
+    body = (await request.body()).decode("utf-8")
+    try:
+        CALL_TRACKER.handle_webhook(body, request.headers.get("Authorization", ""))
+    except Exception as e:
+        logger.warning(f"⚠️ Rejected LiveKit webhook: {e}")
+        raise HTTPException(status_code=401, detail="Invalid webhook signature.") from e
+    return {"status": "ok"}
+
+
+# ==============================
+# METRICS
+# ==============================
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint for the dialer API (call counts, active calls)."""
+    return render_openmetrics([REGISTRY.snapshot()])
 
 
 # ==============================
@@ -268,3 +499,12 @@ async def latest_call():
 async def health_check():
     """Simple health check for load balancers / monitoring."""
     return {"status": "ok", "uptime_check": True}
+
+
+# ==============================
+# SHUTDOWN
+# ==============================
+@app.on_event("shutdown")
+async def close_livekit_client():
+    """Close the shared LiveKit API client's pooled connections."""
+    await close_livekit_api()
@@ -3,20 +3,17 @@ import os
 import uuid
 
 from dotenv import load_dotenv
-from livekit import api
 from livekit.api import (
     EncodedFileOutput,
     GCPUpload,
     RoomCompositeEgressRequest,
     StopEgressRequest,
 )
-from livekit.protocol.room import ListParticipantsRequest
-from livekit.protocol.sip import (
-    CreateSIPOutboundTrunkRequest,
-    CreateSIPParticipantRequest,
-    ListSIPOutboundTrunkRequest,
-    SIPOutboundTrunkInfo,
-)
+from livekit.protocol.sip import CreateSIPParticipantRequest
+
+from helpers.call_lifecycle import CALL_TRACKER
+from helpers.livekit_client import close_livekit_api, livekit_api
+from helpers.sip_trunks import TRUNK_REGISTRY
 
 # --------------------------
 # Load environment variables
@@ -28,11 +25,7 @@ LIVEKIT_API_SECRET = os.environ["LIVEKIT_API_SECRET"]
 LIVEKIT_URL = os.environ["LIVEKIT_URL"]
 GCP_BUCKET = os.environ["GCP_BUCKET"]
 
-TRUNK_NAME = os.environ.get("TRUNK_NAME", "My outbound trunk")
-TRUNK_ADDRESS = os.environ.get("TRUNK_ADDRESS", "livekit-sip-outbound-trunk.pstn.twilio.com")
-TRUNK_NUMBER = os.environ.get("TRUNK_NUMBER", "+17473503389")
-TRUNK_USERNAME = os.environ["TRUNK_USERNAME"]
-TRUNK_PASSWORD = os.environ["TRUNK_PASSWORD"]
+SIP_TRUNK = "tata"   # named trunk from helpers/sip_trunks
 CALL_TO_NUMBER = os.environ["CALL_TO_NUMBER"]
 
 # participant_identity = f"sip-{uuid.uuid4().hex[:4]}"
@@ -41,38 +34,20 @@ CALL_TO_NUMBER = os.environ["CALL_TO_NUMBER"]
 # Create or Get SIP Trunk
 # --------------------------
 async def create_or_get_trunk():
-    """Get existing SIP trunk or create a new one if not found."""
-    async with api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET) as lkapi:
-        request = ListSIPOutboundTrunkRequest()
-        trunks_response = await lkapi.sip.list_sip_outbound_trunk(request)
-
-        for t in getattr(trunks_response, "trunks", []):
-            if t.name == TRUNK_NAME:
-                print(f"✅ Using existing trunk: {t.sip_trunk_id}")
-                return t.sip_trunk_id
-
-        trunk = SIPOutboundTrunkInfo(
-            name="tata-sip",
-            address="27.107.220.6:5101",
-            numbers=["00919240908350"],
-            auth_username="00919240908350",
-            auth_password="1234",
-        )
-        create_request = CreateSIPOutboundTrunkRequest(trunk=trunk)
-        created_trunk = await lkapi.sip.create_sip_outbound_trunk(create_request)
-
-        print(f"✅ Created new trunk: {created_trunk.sip_trunk_id}")
-        return created_trunk.sip_trunk_id
+    """Get existing SIP trunk or create a new one if not found (cached per process)."""
+    trunk_id = await TRUNK_REGISTRY.resolve(SIP_TRUNK)
+    print(f"✅ Using trunk: {trunk_id}")
+    return trunk_id
 
 # --------------------------
 # Make SIP Call
 # --------------------------
 async def make_call(phone_number: str, sip_trunk_id: str, room_name: str, participant_identity: str):
     """Dial the phone number via SIP trunk and join to LiveKit room."""
-    async with api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET) as lkapi:
+    async with livekit_api() as lkapi:
         request = CreateSIPParticipantRequest(
             sip_trunk_id=sip_trunk_id,
-            sip_number="00919240908350",
+            sip_number=TRUNK_REGISTRY.spec(SIP_TRUNK).number,
             sip_call_to=phone_number,
             room_name=room_name,
             participant_identity=participant_identity,
@@ -90,13 +65,14 @@ async def make_call(phone_number: str, sip_trunk_id: str, room_name: str, partic
             return None
         except Exception as e:
             print(f"❌ Failed to call {phone_number}: {e}")
+            TRUNK_REGISTRY.invalidate_on_error(SIP_TRUNK, e)
             return None
 
 # --------------------------
 # Start Audio Recording
 # --------------------------
 async def start_audio_recording(room_name: str):
-    async with api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET) as lkapi:
+    async with livekit_api() as lkapi:
         # Keyless GCP upload using VM-attached service account
         file_output = EncodedFileOutput(
             gcp=GCPUpload(bucket=GCP_BUCKET)
@@ -118,7 +94,7 @@ async def start_audio_recording(room_name: str):
 # --------------------------
 async def stop_audio_recording(egress_id: str):
     """Stop an active egress recording."""
-    async with api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET) as lkapi:
+    async with livekit_api() as lkapi:
         try:
             await lkapi.egress.stop_egress(StopEgressRequest(egress_id=egress_id))
             print(f"🛑 Recording stopped for egress {egress_id}")
@@ -149,20 +125,20 @@ async def run_calls():
         if participant:
             # Start recording
             egress_info = await start_audio_recording(participant.room_name)
-            async with api.LiveKitAPI(LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET) as lkapi:
-                while True:
-                    participants_resp = await lkapi.room.list_participants(
-                        ListParticipantsRequest(room=room_name)
-                    )
-                    identities = [p.identity for p in participants_resp.participants]
-                    if participant_identity not in identities:
-                        print("📴 Participant left, stopping recording.")
-                        await stop_audio_recording(egress_info.egress_id)
-                        break
-
+            async with livekit_api() as lkapi:
+                await CALL_TRACKER.wait_for_call_end(lkapi, room_name, participant_identity)
+            print("📴 Participant left, stopping recording.")
+            await stop_audio_recording(egress_info.egress_id)
 
 # --------------------------
 # Main
 # --------------------------
+async def main():
+    try:
+        await run_calls()
+    finally:
+        await close_livekit_api()
+
+
 if __name__ == "__main__":
-    asyncio.run(run_calls())
+    asyncio.run(main())
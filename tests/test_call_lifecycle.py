@@ -0,0 +1,90 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("livekit.api")
+
+from helpers.call_lifecycle import CallLifecycleTracker
+
+
+class FakeReceiver:
+    """Stands in for api.WebhookReceiver: the body is the event itself."""
+
+    def receive(self, body, auth_header):
+        return body
+
+
+def _webhook(event: str, room: str, sid: str, identity: str = "") -> SimpleNamespace:
+    return SimpleNamespace(
+        event=event,
+        room=SimpleNamespace(name=room, sid=sid),
+        participant=SimpleNamespace(identity=identity),
+    )
+
+
+def _tracker() -> CallLifecycleTracker:
+    tracker = CallLifecycleTracker()
+    tracker._webhook_receiver = FakeReceiver()
+    tracker.webhooks_enabled = True
+    return tracker
+
+
+def test_webhooks_from_other_room_instances_are_ignored() -> None:
+    """After begin(), only events carrying the current room sid resolve the call."""
+    tracker = _tracker()
+
+    async def main():
+        tracker.begin("room-1", "RM_new")
+        fut = tracker.expect("room-1", "sip-1")
+        tracker.handle_webhook(_webhook("room_finished", "room-1", "RM_old"), "")
+        assert not fut.done()
+        tracker.handle_webhook(_webhook("participant_left", "room-1", "RM_new", "sip-1"), "")
+        return await fut
+
+    assert asyncio.run(main()) == "participant_left"
+
+
+def test_end_before_wait_is_remembered_until_the_next_begin() -> None:
+    """An early webhook resolves a later expect(); begin() for a new call forgets it."""
+    tracker = _tracker()
+
+    async def main():
+        tracker.begin("room-1", "RM_a")
+        tracker.handle_webhook(_webhook("participant_left", "room-1", "RM_a", "sip-1"), "")
+        fut = tracker.expect("room-1", "sip-1")
+        assert fut.done() and fut.result() == "participant_left"
+
+        tracker.handle_webhook(_webhook("room_finished", "room-1", "RM_a"), "")
+        tracker.begin("room-1", "RM_b")    # the room name is reused for a new call
+        fut = tracker.expect("room-1", "sip-1")
+        assert not fut.done()
+        tracker.resolve("room-1", "sip-1")
+
+    asyncio.run(main())
+
+
+def test_first_source_wins_and_the_others_are_cancelled() -> None:
+    """wait_for_call_end returns the first reason and stops the remaining sources."""
+    tracker = CallLifecycleTracker()
+    cancelled = []
+
+    async def poll(lkapi, room_name, identity):
+        await asyncio.sleep(0)
+        tracker.resolve(room_name, identity, reason="poll")
+
+    async def observe(room_name, identity):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("observer")
+            raise
+        tracker.resolve(room_name, identity, reason="participant_left")
+
+    tracker._poll = poll
+    tracker._observe = observe
+
+    reason = asyncio.run(asyncio.wait_for(tracker.wait_for_call_end(None, "room-1", "sip-1"), timeout=5))
+    assert reason == "poll"
+    assert cancelled == ["observer"]
+    assert not tracker._waiters
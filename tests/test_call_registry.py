@@ -0,0 +1,32 @@
+import pytest
+
+from helpers.call_registry import CallRegistry
+
+
+def test_registry_tracks_transitions_and_filters() -> None:
+    """Calls move through validated states and can be listed by batch and status."""
+    now = [1000.0]
+    registry = CallRegistry(max_records=3, clock=lambda: now[0])
+    updates = []
+    registry.add_listener(lambda call: updates.append((call.call_id, call.status)))
+
+    first = registry.create("+911", "A", batch_id="b1")
+    second = registry.create("+912", "B", batch_id="b1")
+    now[0] += 5
+    registry.transition(first.call_id, "dialing")
+    registry.transition(first.call_id, "in_progress")
+    assert registry.active_count() == 1 and registry.latest() is first
+    with pytest.raises(ValueError):
+        registry.transition(second.call_id, "completed")
+
+    registry.transition(first.call_id, "completed", result={"status": "completed"})
+    assert [h["status"] for h in first.history] == ["initiated", "dialing", "in_progress", "completed"]
+    assert updates[-1] == (first.call_id, "completed")
+
+    page, total = registry.list(batch_id="b1", limit=1)
+    assert total == 2 and page == [second]
+    assert registry.list(status="completed")[0] == [first]
+
+    registry.create("+913", "C")
+    registry.create("+914", "D")  # over max_records: the finished call is evicted
+    assert registry.get(first.call_id) is None and registry.get(second.call_id) is not None
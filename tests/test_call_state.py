@@ -0,0 +1,93 @@
+from class_mod.call_state import CallState, parse_amounts
+
+
+def test_parse_amounts_handles_hindi_numbers_and_multipliers() -> None:
+    """Spoken amounts in either script are normalized to rupees."""
+    assert parse_amounts("मुझे पाँच लाख का लोन चाहिए") == [500_000]
+    assert parse_amounts("सैलरी ४० हज़ार है") == [40_000]
+    assert parse_amounts("around 2.5 lakh") == [250_000]
+    assert parse_amounts("450000 chahiye") == [450_000]
+
+
+def test_call_state_fills_fields_turn_by_turn() -> None:
+    """User turns fill vehicle, finance and intent fields; agent turns are only counted."""
+    state = CallState.from_profile({"customer_name": "Rahul", "gender": "Male", "age": 30, "city": "Pune"})
+    state.update("assistant", "आपको पाँच लाख का लोन मिल सकता है")
+    assert state.financial_information["loan_amount_requested"] is None
+
+    for text in (
+        "जी हाँ, मेरे पास मारुति की कार है, 2019 मॉडल",
+        "मैं नौकरी करता हूँ, सैलरी 45 हज़ार है",
+        "मुझे तीन लाख का लोन चाहिए दो साल के लिए",
+        "पैन और आधार व्हाट्सएप पर भेज दिया",
+    ):
+        state.update("user", text)
+
+    summary = state.to_summary({"session_id": "room-1"})
+    assert summary["customer_profile"]["name"] == "Rahul"
+    assert summary["vehicle_information"]["make_model"] == "Maruti"
+    assert summary["vehicle_information"]["registration_year"] == 2019
+    assert summary["financial_information"]["monthly_income_bracket"] == "25k-50k"
+    assert summary["financial_information"]["loan_amount_requested"] == 300_000
+    assert summary["financial_information"]["tenure_requested_months"] == 24
+    assert summary["intent_and_qualification"]["documents_mentioned"] == ["PAN", "Aadhaar"]
+    assert summary["intent_and_qualification"]["shared_documents_on_whatsapp"] == "Yes"
+    assert summary["call_metadata"] == {"session_id": "room-1", "user_turns": 4, "agent_turns": 1}
+    assert state.missing_fields() == []
+
+
+def test_not_interested_overrides_earlier_intent() -> None:
+    """A later refusal wins over an earlier positive answer."""
+    state = CallState()
+    state.update("user", "हाँ लोन चाहिए")
+    state.update("user", "नहीं, अभी ज़रूरत नहीं है")
+    assert state.intent_and_qualification["interested_in_loan"] == "No"
+    assert state.intent_and_qualification["reason_if_not_interested"] == "नहीं, अभी ज़रूरत नहीं है"
+
+
+def test_extractors_ignore_lookalike_words_and_numbers() -> None:
+    """Substrings, vehicle age, PIN codes and "time chahiye" fill nothing."""
+    state = CallState()
+    state.update("user", "मैं सरकारी नौकरी करता हूँ")
+    assert state.vehicle_information["vehicle_type"] == "Unknown"
+
+    state.update("user", "गाड़ी 5 साल पुरानी है")
+    assert state.financial_information["tenure_requested_months"] is None
+
+    state.update("assistant", "आपके एरिया का पिन कोड क्या है?")
+    state.update("user", "411001")
+    state.update("user", "मेरा पिनकोड 411001 है, लोन के लिए")
+    assert state.financial_information["loan_amount_requested"] is None
+
+    state.update("assistant", "क्या आप लोन लेना चाहेंगे?")
+    state.update("user", "सोचने के लिए टाइम चाहिए")
+    assert state.intent_and_qualification["interested_in_loan"] == "Maybe"
+
+
+def test_bare_answers_are_read_against_the_agents_question() -> None:
+    """"डेढ़ लाख" or "नहीं" mean different things depending on what was asked."""
+    state = CallState()
+    state.update("assistant", "आपकी गाड़ी की कीमत कितनी होगी?")
+    state.update("user", "डेढ़ लाख")
+    assert state.financial_information["loan_amount_requested"] is None
+
+    state.update("assistant", "आपकी महीने की सैलरी कितनी है?")
+    state.update("user", "डेढ़ लाख")
+    assert state.financial_information["monthly_income_bracket"] == "Above 1L"
+    assert state.financial_information["loan_amount_requested"] is None
+
+    state.update("assistant", "आपको कितना लोन अमाउंट चाहिए?")
+    state.update("user", "डेढ़ लाख")
+    assert state.financial_information["loan_amount_requested"] == 150_000
+
+    state.update("assistant", "लोन कितने महीने के लिए चाहिए?")
+    state.update("user", "36 महीने")
+    assert state.financial_information["tenure_requested_months"] == 36
+
+    state.update("assistant", "क्या आपकी गाड़ी पर कोई लोन चल रहा है?")
+    state.update("user", "नहीं")
+    assert "intent_and_qualification.interested_in_loan" not in state.filled
+
+    state.update("assistant", "क्या आप लोन लेना चाहेंगे?")
+    state.update("user", "नहीं अभी नहीं")
+    assert state.intent_and_qualification["interested_in_loan"] == "No"
@@ -0,0 +1,85 @@
+import asyncio
+
+from helpers.campaign import CampaignCheckpoint, iter_customers_csv, run_campaign
+
+
+def test_campaign_streams_rows_and_resumes(tmp_path) -> None:
+    """Rows are dialed with bounded concurrency; a rerun skips finished rows."""
+    leads = tmp_path / "leads.csv"
+    leads.write_text(
+        "customer_name,phone_number,age\n"
+        + "".join(f"Lead {i},+9190000000{i:02d},3{i % 10}\n" for i in range(20))
+        + "No Phone,,40\n",
+        encoding="utf-8",
+    )
+    checkpoint = CampaignCheckpoint(tmp_path / "leads.db")
+    in_flight = peak = 0
+
+    async def dial(customer):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if customer["customer_id"] == "cust_3":
+            raise RuntimeError("trunk down")
+        return "answered" if customer["age"] % 2 else "not_connected"
+
+    totals = asyncio.run(run_campaign(iter_customers_csv(leads), dial, max_in_flight=3, checkpoint=checkpoint))
+    assert peak <= 3
+    assert totals == {"answered": 9, "not_connected": 10, "error": 1, "invalid": 1}
+    assert checkpoint.counts() == totals
+
+    totals = asyncio.run(run_campaign(iter_customers_csv(leads), dial, max_in_flight=3, checkpoint=checkpoint))
+    assert totals == {"skipped": 21}
+
+
+def test_checkpoint_is_per_file_and_checks_the_row(tmp_path, monkeypatch) -> None:
+    """Same-named or edited lead files never share finished rows."""
+    monkeypatch.setattr("helpers.campaign.CAMPAIGN_DIR", tmp_path / "campaigns")
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first, second = tmp_path / "a" / "leads.csv", tmp_path / "b" / "leads.csv"
+    first.write_text("customer_name,phone_number\nAsha,+919000000001\n", encoding="utf-8")
+    second.write_text("customer_name,phone_number\nAsha,+919000000001\n", encoding="utf-8")
+    checkpoint = CampaignCheckpoint.for_source(first)
+    assert checkpoint.path != CampaignCheckpoint.for_source(second).path
+
+    async def dial(customer):
+        return "answered"
+
+    asyncio.run(run_campaign(iter_customers_csv(first), dial, max_in_flight=1, checkpoint=checkpoint))
+    first.write_text("customer_name,phone_number\nRavi,+919000000002\n", encoding="utf-8")
+    assert CampaignCheckpoint.for_source(first).path != checkpoint.path
+
+    # row 0 is now another customer: dial it even with the old checkpoint
+    totals = asyncio.run(run_campaign(iter_customers_csv(first), dial, max_in_flight=1, checkpoint=checkpoint))
+    assert totals == {"answered": 1}
+
+
+def test_producer_failure_cancels_workers() -> None:
+    """A lead source that fails mid-run stops the dials still in progress."""
+    cancelled = []
+
+    def customers():
+        yield {"customer_id": "cust_0", "phone_number": "+919000000000"}
+        yield {"customer_id": "cust_1", "phone_number": "+919000000001"}
+        raise ValueError("bad row")
+
+    async def dial(customer):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(customer["customer_id"])
+            raise
+        return "answered"
+
+    async def main():
+        try:
+            await asyncio.wait_for(run_campaign(customers(), dial, max_in_flight=1), timeout=5)
+        except ValueError:
+            return True
+        return False
+
+    assert asyncio.run(main())
+    assert cancelled == ["cust_0"]
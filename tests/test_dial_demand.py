@@ -0,0 +1,31 @@
+from helpers.dial_demand import DialerDemand
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_idle_target_follows_queue_and_arrivals_then_shrinks():
+    clock = FakeClock()
+    demand = DialerDemand(window=60.0, stale_after=15.0, clock=clock)
+    assert demand.idle_target(workers=2) == 1       # IDLE_PROCESSES_MIN
+
+    demand.report("campaign", pending=0, dialed=0)
+    clock.now += 10
+    demand.report("campaign", pending=6, dialed=30)  # 0.5 dials/s -> 3 more during warm-up
+    assert demand.pending() == 6
+    assert demand.idle_target(workers=2) == 5        # ceil((6 + 3) / 2)
+
+    # campaign drained: its report goes stale and the arrivals age out
+    clock.now += 61
+    assert demand.pending() == 0
+    assert demand.idle_target(workers=2) == 1
+
+    # a restarted dialer's counter starts over instead of going negative
+    demand.report("campaign", pending=0, dialed=30)
+    demand.report("campaign", pending=0, dialed=4)
+    assert demand.rate() == 4 / 60.0
@@ -0,0 +1,47 @@
+import pytest
+
+from helpers.dial_pacer import DECREASE_COOLDOWN, DialPacer, TokenBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_paces_calls_per_second() -> None:
+    """One token per 1/rate seconds, never more than the burst."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=1.0, clock=clock)
+    assert bucket.try_take() == 0.0
+    assert bucket.try_take() == 0.5
+    clock.now += 0.5
+    assert bucket.try_take() == 0.0
+    clock.now += 60
+    assert bucket.try_take() == 0.0 and bucket.try_take() > 0
+
+
+def test_aimd_grows_on_answers_and_backs_off_on_errors() -> None:
+    """Answered calls raise the limit additively; failures and load halve it once per cooldown."""
+    clock = FakeClock()
+    pacer = DialPacer(max_cps=2.0, min_concurrency=1, max_concurrency=10, initial_concurrency=4, clock=clock)
+    pacer.bucket.rate = 1.0
+    for _ in range(4):
+        pacer.record("answered")
+    assert 4.9 < pacer.limit < 5.0
+    assert pacer.bucket.rate == pytest.approx(1.4)
+
+    pacer.record("failed")
+    assert 2.4 < pacer.limit < 2.5 and pacer.bucket.rate == pytest.approx(0.7)
+    pacer.record("failed")
+    pacer.observe_load(0.95)
+    assert 2.4 < pacer.limit < 2.5  # still in cooldown
+
+    clock.now += DECREASE_COOLDOWN
+    pacer.observe_load(0.95)
+    assert 1.2 < pacer.limit < 1.3 and pacer.bucket.rate == pytest.approx(0.35)
+    clock.now += DECREASE_COOLDOWN
+    pacer.record("failed")
+    assert pacer.limit == 1.0 and pacer.bucket.rate == pytest.approx(0.2)  # floors
@@ -0,0 +1,23 @@
+import asyncio
+
+from helpers.event_stream import EventBroadcaster, format_sse
+
+
+def test_broadcaster_fans_out_and_drops_oldest_for_slow_clients() -> None:
+    """Each subscriber gets every event; a full queue keeps only the newest."""
+
+    async def scenario():
+        events = EventBroadcaster(max_queue=2)
+        stream = events.stream(initial=[format_sse("call", {"call_id": "a"})])
+        assert await stream.__anext__() == 'event: call\ndata: {"call_id": "a"}\n\n'
+
+        assert events.subscriber_count == 1
+        for i in range(3):
+            events.publish("turn", {"n": i})
+        assert await stream.__anext__() == format_sse("turn", {"n": 1})
+        assert await stream.__anext__() == format_sse("turn", {"n": 2})
+
+        await stream.aclose()
+        assert events.subscriber_count == 0
+
+    asyncio.run(scenario())
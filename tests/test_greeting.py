@@ -0,0 +1,54 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+pytest.importorskip("livekit.agents")
+
+from class_mod import assistant_helpers
+from class_mod.assistant import MyAssistant
+from class_mod.greeting import build_greeting_text
+
+
+def test_greeting_text_uses_salutation_name_and_bank() -> None:
+    """Female customers get "मैम", everyone else "सर"; missing fields stay blank."""
+    text = build_greeting_text({"customer_name": "Priya", "gender": "Female", "bank_name": "HDFC"})
+    assert text.startswith("नमस्ते मैम,")
+    assert "HDFC से" in text and "Priya जी" in text
+    assert build_greeting_text({"gender": "Male"}).startswith("नमस्ते सर,")
+
+
+def test_on_enter_falls_back_to_the_llm_without_rendered_frames() -> None:
+    """No greeting, or a render that failed, means an LLM-generated greeting."""
+    for greeting in (None, SimpleNamespace(frames=AsyncMock(return_value=None))):
+        agent = SimpleNamespace(
+            greeting=greeting,
+            session_ref=SimpleNamespace(generate_reply=AsyncMock(), say=AsyncMock()),
+            call_started=False,
+        )
+        asyncio.run(MyAssistant.on_enter(agent))
+        agent.session_ref.generate_reply.assert_awaited_once()
+        agent.session_ref.say.assert_not_awaited()
+        assert agent.call_started
+
+
+def test_wait_for_call_answered_has_one_deadline(monkeypatch) -> None:
+    """Joining late leaves only the remaining time to wait for the answer."""
+    room = SimpleNamespace(on=lambda *_: None, off=lambda *_: None)
+    ringing = SimpleNamespace(
+        kind=assistant_helpers.rtc.ParticipantKind.PARTICIPANT_KIND_SIP,
+        attributes={"sip.callStatus": "ringing"},
+    )
+
+    async def wait_for_participant():
+        await asyncio.sleep(0.15)
+        return ringing
+
+    ctx = SimpleNamespace(room=room, wait_for_participant=wait_for_participant)
+    monkeypatch.setattr(assistant_helpers, "get_job_context", lambda: ctx)
+
+    started = time.monotonic()
+    assert asyncio.run(assistant_helpers.wait_for_call_answered(timeout=0.2)) is None
+    assert time.monotonic() - started < 0.3
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from helpers.latency_histogram import LatencyHistograms, LogHistogram
+
+
+def test_percentiles_within_precision() -> None:
+    """Percentiles match exact values within the configured relative error."""
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(-0.5, 0.6) for _ in range(20000)]
+    hist = LogHistogram(precision=0.02)
+    for value in samples:
+        hist.record(value)
+
+    ordered = sorted(samples)
+    for p in (50, 95, 99):
+        exact = ordered[int(p / 100 * len(ordered)) - 1]
+        assert hist.percentile(p) == pytest.approx(exact, rel=0.03)
+    assert hist.count == len(samples)
+    assert hist.max == max(samples)
+
+
+def test_memory_is_fixed() -> None:
+    """Recording more samples does not grow the bucket array."""
+    hist = LogHistogram()
+    buckets = len(hist.counts)
+    for i in range(10000):
+        hist.record(i / 1000)
+    assert len(hist.counts) == buckets
+
+
+def test_merge_combines_sessions() -> None:
+    """Merging per-session histograms equals recording everything in one."""
+    a, b, combined = LatencyHistograms(), LatencyHistograms(), LatencyHistograms()
+    for value in (0.2, 0.4, 0.6):
+        a.record("turn_latency", value)
+        combined.record("turn_latency", value)
+    for value in (1.5, 3.0):
+        b.record("turn_latency", value)
+        combined.record("turn_latency", value)
+
+    a.merge(b)
+    assert a.percentiles() == combined.percentiles()
+    assert a.percentiles()["turn_latency"]["count"] == 5
+
+
+def test_empty_and_invalid_values() -> None:
+    """Empty histograms report zeros; None/negative samples are ignored."""
+    hist = LogHistogram()
+    hist.record(None)
+    hist.record(-1.0)
+    assert hist.summary() == {"count": 0, "mean": 0.0, "min": 0.0, "max": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+
+def test_snapshot_round_trip_and_prometheus_buckets() -> None:
+    """Serialized histograms merge losslessly and render cumulative `le` buckets."""
+    from helpers.metrics_registry import MetricsRegistry, render_openmetrics
+
+    a, b = MetricsRegistry(), MetricsRegistry()
+    for value in (0.2, 0.4, 0.8):
+        a.observe_latency("turn_latency", value)
+    b.observe_latency("turn_latency", 4.0)
+    a.inc("voice_agent_cost_total", 1.5, provider="sarvam", service="stt")
+    b.inc("voice_agent_cost_total", 0.5, provider="sarvam", service="stt")
+
+    text = render_openmetrics([a.snapshot(), b.snapshot()])
+    assert 'voice_agent_cost_total{provider="sarvam",service="stt"} 2.0' in text
+    assert 'voice_agent_turn_latency_seconds_bucket{stage="turn_latency",le="0.5"} 2' in text
+    assert 'voice_agent_turn_latency_seconds_bucket{stage="turn_latency",le="1.0"} 3' in text
+    assert 'voice_agent_turn_latency_seconds_bucket{stage="turn_latency",le="+Inf"} 4' in text
+    assert 'voice_agent_turn_latency_seconds_count{stage="turn_latency"} 4' in text
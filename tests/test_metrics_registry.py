@@ -0,0 +1,32 @@
+import json
+import os
+
+from helpers.metrics_registry import RETIRED_FILE, collect_snapshots, gauge_total
+
+
+def _snapshot(pid, create_time, calls):
+    return {
+        "pid": pid,
+        "create_time": create_time,
+        "counters": [["voice_agent_calls_total", "{}", calls]],
+        "gauges": [["voice_agent_active_sessions", "{}", 1.0]],
+        "latency": {},
+    }
+
+
+def _calls_total(snapshots):
+    return sum(v for snap in snapshots for n, _, v in snap["counters"] if n == "voice_agent_calls_total")
+
+
+def test_exited_processes_are_folded_into_one_file(tmp_path):
+    # a long-gone pid, and a file claiming our pid from an earlier process (pid reuse)
+    (tmp_path / "999999.json").write_text(json.dumps(_snapshot(999999, 1.0, 2)))
+    (tmp_path / f"{os.getpid()}.json").write_text(json.dumps(_snapshot(os.getpid(), 1.0, 3)))
+
+    snapshots = collect_snapshots(tmp_path, include_self=False)
+    assert _calls_total(snapshots) == 5
+    assert gauge_total(snapshots, "voice_agent_active_sessions") == 0
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == [RETIRED_FILE]
+
+    # collecting again does not count the retired totals twice
+    assert _calls_total(collect_snapshots(tmp_path, include_self=False)) == 5
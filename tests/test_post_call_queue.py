@@ -0,0 +1,25 @@
+from helpers.post_call_queue import PostCallQueue
+
+
+def test_claim_retry_and_complete(tmp_path) -> None:
+    """Jobs are claimed once, retried after their backoff, and leave the backlog when done."""
+    queue = PostCallQueue(tmp_path / "queue.db")
+    job_id = queue.enqueue("room-1", {"history_text": "user: हाँ"})
+    assert queue.depth() == 1
+
+    job = queue.claim()
+    assert job is not None and job["id"] == job_id and job["attempts"] == 1
+    assert job["payload"] == {"history_text": "user: हाँ"}
+    assert queue.claim() is None  # already running
+
+    queue.save_results(job_id, {"summary": {"summary_text": "ok"}})
+    queue.retry(job_id, "persist: disk full", delay=3600)
+    assert queue.claim() is None  # backoff not elapsed
+    queue.retry(job_id, "persist: disk full", delay=0)
+
+    job = queue.claim()
+    assert job["attempts"] == 2
+    assert job["results"] == {"summary": {"summary_text": "ok"}}
+
+    queue.complete(job_id)
+    assert queue.depth() == 0
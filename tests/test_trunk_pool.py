@@ -0,0 +1,55 @@
+from helpers.trunk_pool import MIN_HEALTH, SIPTrunkPool
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_pool_balances_load_and_respects_limits() -> None:
+    """Dials go to the least-loaded trunk and stop at channel and CPS limits."""
+    clock = FakeClock()
+    pool = SIPTrunkPool(
+        {"tata": {"max_channels": 2, "max_cps": 1}, "twilio": {"max_channels": 4, "max_cps": 10}},
+        clock=clock,
+    )
+    picks = []
+    for _ in range(5):
+        name = pool.pick()
+        pool._take(name)
+        picks.append(name)
+        clock.now += 2  # outside every CPS window
+    assert picks.count("tata") == 2 and picks.count("twilio") == 3
+    assert pool.pick() == "twilio"
+    pool._take("twilio")
+    assert pool.pick() is None  # all six channels busy
+
+    pool.trunks["tata"].active = 0
+    pool._take("tata")
+    pool.trunks["tata"].active = 0
+    assert not pool.trunks["tata"].available(clock.now)  # 1 call/s already used
+    clock.now += 1
+    assert pool.trunks["tata"].available(clock.now)
+
+
+def test_failures_shift_traffic_and_health_recovers() -> None:
+    """A failing carrier drops below MIN_HEALTH, loses traffic, and is retried later."""
+    clock = FakeClock()
+    pool = SIPTrunkPool(
+        {"tata": {"max_channels": 10, "max_cps": 5}, "twilio": {"max_channels": 10, "max_cps": 5}},
+        clock=clock,
+    )
+    for _ in range(8):
+        pool.record("tata", "failed")
+        pool.record("twilio", "answered")
+    assert pool.trunks["tata"].health < MIN_HEALTH
+    assert pool.stats()["tata"]["failure_rate"] == 1.0
+    pool._take("twilio")
+    assert pool.pick() == "twilio"
+
+    clock.now += 3600
+    assert pool.trunks["tata"].effective_health(clock.now) > 0.99
+    assert pool.pick() == "tata"
@@ -0,0 +1,82 @@
+import asyncio
+import os
+
+import pytest
+
+rtc = pytest.importorskip("livekit.rtc")
+
+from class_mod.tts_cache import TTSAudioCache  # noqa: E402
+
+VOICE = {"speaker": "anushka", "pace": 1.0}
+
+
+def _frames(n: int, sample_rate: int = 16000) -> list:
+    """n 20ms frames of a constant non-zero sample."""
+    samples = sample_rate // 50
+    return [
+        rtc.AudioFrame(data=b"\x01\x00" * samples, sample_rate=sample_rate, num_channels=1, samples_per_channel=samples)
+        for _ in range(n)
+    ]
+
+
+def test_key_normalizes_text_and_separates_voices(tmp_path) -> None:
+    """Whitespace and case do not matter; provider, voice and length do."""
+    cache = TTSAudioCache(tmp_path, max_chars=20)
+    key = cache.key("जी सर -- ", "sarvam", VOICE)
+    assert key == cache.key("  जी   सर --", "sarvam", VOICE)
+    assert cache.key("OK Sir", "sarvam", VOICE) == cache.key("ok sir", "sarvam", VOICE)
+    assert key != cache.key("जी सर -- ", "cartesia", VOICE)
+    assert key != cache.key("जी सर -- ", "sarvam", {**VOICE, "pace": 1.2})
+    assert cache.key("   ", "sarvam", VOICE) is None
+    assert cache.key("x" * 21, "sarvam", VOICE) is None
+
+
+def test_put_get_round_trip(tmp_path) -> None:
+    """Stored audio comes back as the same PCM, shared with other instances."""
+    cache = TTSAudioCache(tmp_path)
+    key = cache.key("धन्यवाद सर।", "sarvam", VOICE)
+    frames = _frames(5)
+
+    async def main():
+        assert await cache.get(key) is None
+        await cache.put(key, frames)
+        return await TTSAudioCache(tmp_path).get(key)
+
+    cached = asyncio.run(main())
+    assert b"".join(bytes(f.data) for f in cached) == b"".join(bytes(f.data) for f in frames)
+    assert cached[0].sample_rate == 16000
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_lru_eviction_under_max_bytes(tmp_path) -> None:
+    """The least recently used entries go first once the directory is too big."""
+    probe = TTSAudioCache(tmp_path / "probe")
+    asyncio.run(probe.put("probe", _frames(10)))
+    entry_size = (tmp_path / "probe" / "probe.wav").stat().st_size
+
+    cache = TTSAudioCache(tmp_path / "cache", max_bytes=entry_size * 2)
+    keys = [cache.key(f"phrase {i}", "sarvam", VOICE) for i in range(3)]
+
+    async def main():
+        await cache.put(keys[0], _frames(10))
+        await cache.put(keys[1], _frames(10))
+        os.utime(cache._path(keys[0]), (1, 1))
+        os.utime(cache._path(keys[1]), (2, 2))
+        assert await cache.get(keys[0]) is not None    # now the most recent
+        await cache.put(keys[2], _frames(10))
+
+    asyncio.run(main())
+    assert cache.contains(keys[0])
+    assert not cache.contains(keys[1])
+    assert cache.contains(keys[2])
+
+
+def test_unreadable_entry_is_dropped(tmp_path) -> None:
+    """A corrupt file is a miss and is deleted so it can be rendered again."""
+    cache = TTSAudioCache(tmp_path)
+    key = cache.key("ठीक है सर।", "sarvam", VOICE)
+    cache._path(key).write_bytes(b"not a wav file")
+
+    assert asyncio.run(cache.get(key)) is None
+    assert not cache.contains(key)
+    assert cache.load(key) is None
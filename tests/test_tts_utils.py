@@ -0,0 +1,89 @@
+import asyncio
+
+from class_mod.tts_utils import (
+    PronunciationRewriter,
+    adjust_text_for_tts,
+    get_pronunciation_rewriter,
+    get_pronunciations,
+    split_leading_phrase,
+)
+
+
+async def _stream(*chunks: str):
+    for chunk in chunks:
+        yield chunk
+
+
+def test_rewriter_replaces_terms_case_insensitively() -> None:
+    """Dictionary terms are replaced regardless of case, in a single pass."""
+    rewriter = PronunciationRewriter(get_pronunciations("sarvam_anushka"))
+
+    assert rewriter.rewrite("HDFC की emi") == "एच-डी-एफ-सी की ई-एम-आई"
+    assert rewriter.rewrite("Hdfc") == "एच-डी-एफ-सी"
+
+
+def test_rewriter_respects_word_boundaries() -> None:
+    """Terms embedded in longer words are left alone."""
+    rewriter = PronunciationRewriter({"ah": "आह", "Car": "कार"})
+
+    assert rewriter.rewrite("Yeah carpet ah") == "Yeah carpet आह"
+
+
+def test_rewriter_prefers_longest_term() -> None:
+    """Multi-word terms win over the single words they contain."""
+    rewriter = PronunciationRewriter(get_pronunciations("sarvam_anushka"))
+
+    assert rewriter.rewrite("Personal Loan") == "पर्सनल लोन"
+    assert rewriter.rewrite("Loan") == "लोन"
+
+
+def test_rewriter_is_cached_per_provider() -> None:
+    """The compiled rewriter is built once per provider."""
+    assert get_pronunciation_rewriter("sarvam_anushka") is get_pronunciation_rewriter("sarvam_anushka")
+
+
+async def test_adjust_text_for_tts_strips_think_and_rewrites() -> None:
+    """Reasoning sections are dropped and spoken text is rewritten."""
+    rewriter = get_pronunciation_rewriter("sarvam_anushka")
+    chunks = [c async for c in adjust_text_for_tts(_stream("¤hid", "den¶आपकी", " EMI"), rewriter)]
+
+    assert "".join(chunks) == "आपकी ई-एम-आई"
+
+
+async def test_adjust_text_for_tts_handles_terms_split_across_chunks() -> None:
+    """Terms split across LLM deltas are still replaced."""
+    rewriter = get_pronunciation_rewriter("sarvam_anushka")
+    chunks = [c async for c in adjust_text_for_tts(_stream("आपकी Bal", "ance Trans", "fer पर HD", "FC"), rewriter)]
+
+    assert "".join(chunks) == "आपकी बैलेंस ट्रांसफर पर एच-डी-एफ-सी"
+
+
+async def test_adjust_text_for_tts_flushes_at_pauses() -> None:
+    """Tiny deltas are grouped into pause/sentence-sized TTS requests."""
+    rewriter = get_pronunciation_rewriter("sarvam_anushka")
+    deltas = ("जी", " सर", " --", " आपकी", " Car", " Loan", " की", " बात", " है।", " ठीक", " है?")
+    chunks = [c async for c in adjust_text_for_tts(_stream(*deltas), rewriter)]
+
+    assert chunks == ["जी सर --", " आपकी कार लोन की बात है।", " ठीक है?"]
+
+
+def test_split_leading_phrase_finds_the_cacheable_opener() -> None:
+    """The first pause-bounded phrase is split off even from 3-character LLM deltas."""
+    text = "जी सर -- मैं समझ रही हूँ -- देखिए हमारा इंटरेस्ट रेट अच्छा है।"
+    rewriter = get_pronunciation_rewriter("sarvam_anushka")
+
+    async def collect():
+        return [s async for s in adjust_text_for_tts(_stream(*(text[i:i + 3] for i in range(0, len(text), 3))), rewriter)]
+
+    segments = asyncio.run(collect())
+    assert len(segments) > 1
+
+    head = ""
+    for segment in segments:
+        head += segment
+        if split_leading_phrase(head, 80):
+            break
+    assert split_leading_phrase(head, 80)[0] == "जी सर -- "
+    assert split_leading_phrase("धन्यवाद सर, आपका दिन शुभ हो।", 80) == ("धन्यवाद सर, आपका दिन शुभ हो।", "")
+    assert split_leading_phrase("जी सर", 80) is None
+    assert split_leading_phrase("बहुत लंबा वाक्य " * 10 + "।", 80) is None
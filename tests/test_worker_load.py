@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+import pytest
+
+from helpers.config import IDLE_PROCESSES_MAX, IDLE_PROCESSES_MIN
+from helpers.worker_load import IdlePoolTarget, WorkerLoad
+
+
+def test_load_score_takes_the_tightest_resource():
+    cpu = [0.2]
+    lag = [0.0]
+    load = WorkerLoad(capacity=10, lag_budget=0.1, cpu_probe=lambda: cpu[0], lag_probe=lambda: lag[0])
+
+    # 2 sessions at 20% CPU: one more projects to 30%, sessions at 20% of capacity
+    assert load.score(2) == pytest.approx(0.3)
+
+    # a lagging job loop dominates even with spare CPU and slots
+    lag[0] = 0.08
+    assert load.score(2) == pytest.approx(0.8)
+    assert max(load.last, key=load.last.get) == "loop_lag"
+
+    lag[0] = 0.0
+    assert load.score(10) == 1.0
+
+
+def test_idle_pool_keeps_its_ceiling_and_moves_the_target_below_it():
+    """The option starts at the ceiling; demand only changes it from the load tick."""
+    idle_pool = IdlePoolTarget()
+    options = SimpleNamespace(num_idle_processes=idle_pool.ceiling)
+    assert options.num_idle_processes == IDLE_PROCESSES_MAX
+    assert 1 <= idle_pool.target <= 4
+
+    # a heartbeat reply before the worker exists must not lower the pool's ceiling
+    idle_pool.resize(IDLE_PROCESSES_MIN)
+    assert options.num_idle_processes == IDLE_PROCESSES_MAX
+
+    idle_pool.apply(options)
+    assert options.num_idle_processes == IDLE_PROCESSES_MIN
+    idle_pool.resize(IDLE_PROCESSES_MAX + 10)
+    idle_pool.apply(options)
+    assert options.num_idle_processes == IDLE_PROCESSES_MAX
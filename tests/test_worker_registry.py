@@ -0,0 +1,52 @@
+from helpers.worker_registry import WorkerRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_stale_workers_drop_out_and_least_loaded_routing():
+    clock = FakeClock()
+    workers = WorkerRegistry(stale_after=15.0, clock=clock)
+    workers.heartbeat("a", "host-a", 1, capacity=4, active_sessions=3)
+    workers.heartbeat("b", "host-b", 2, capacity=4, active_sessions=1)
+
+    assert workers.total_capacity() == 8
+    assert workers.least_loaded().worker_id == "b"
+
+    # calls routed to b count against it until their sessions show up
+    for n in range(3):
+        workers.reserve("b", f"call-{n}", f"room-{n}")
+    assert workers.least_loaded().worker_id == "a"
+    workers.reserve("a", "call-3", "room-3")
+    assert workers.least_loaded() is None
+
+    clock.now += 10
+    workers.heartbeat("a", "host-a", 1, capacity=4, active_sessions=0)
+    clock.now += 10
+    assert [w.worker_id for w in workers.alive()] == ["a"]
+    assert workers.least_loaded().worker_id == "a"
+
+
+def test_reservations_survive_heartbeats_until_the_session_shows_up():
+    workers = WorkerRegistry(stale_after=15.0, clock=FakeClock())
+    workers.heartbeat("a", "host-a", 1, capacity=2, active_sessions=0)
+    workers.reserve("a", "call-1", "room-1")
+    workers.reserve("a", "call-2", "room-2")
+
+    # still ringing: a heartbeat without their sessions keeps both reservations
+    workers.heartbeat("a", "host-a", 1, capacity=2, active_sessions=0, rooms=[])
+    assert workers.least_loaded() is None
+
+    # room-1's session is now counted by the worker itself
+    worker = workers.heartbeat("a", "host-a", 1, capacity=2, active_sessions=1, rooms=["room-1"])
+    assert list(worker.reserved) == ["call-2"]
+    assert workers.least_loaded() is None
+
+    # call-2 ended without a session (not answered)
+    workers.release("a", "call-2")
+    assert workers.least_loaded().worker_id == "a"